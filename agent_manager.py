@@ -1,25 +1,142 @@
 # agent_manager.py
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+import os
+import numpy as np
 from memory_module import MemoriaCompartilhada
 import pandas as pd
 import xml.etree.ElementTree as ET
 from llm_utils import gerar_resposta_llm as llm_resposta
-from file_reader import FileReader
+from file_reader import FileReader, VERSAO_LEITOR
+from parse_cache import chave_conteudo
+from data_profile import fingerprint_dataframe, registrar_perfil
 from data_validator import DataValidator
+from data_normalizer import VERSAO_NORMALIZACAO, normalizar_dataframe
+from anomaly_detector import detectar_anomalias
+from partition_index import IndiceParticoes
+from kpi_rollup import CuboKPI
+from instrumentation import etapa
 import logging
+import multiprocessing
 
 
 # Configurar logging
 logging.basicConfig(level=logging.DEBUG)
 
 
+# Pool de leitura criado por forkserver (ou spawn): um fork do servidor do
+# Streamlit copiaria locks (logging, caches) presos por outras threads, e o
+# processo filho poderia travar
+CONTEXTO_POOL = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _ler_arquivo_fiscal(nome, origem, arrow=False):
+    """
+    Lê um arquivo CSV, XML ou PDF (DANFE) e devolve o DataFrame correspondente,
+    já na representação compacta (ver data_normalizer).
+    Executada nos processos do pool de ingestão, por isso é uma função de módulo.
+    :param nome: Nome do arquivo (define o formato pela extensão).
+    :param origem: Caminho do arquivo ou seu conteúdo em bytes.
+    :param arrow: Se True, usa tipos pyarrow nas colunas não categóricas.
+    :return: DataFrame com os dados do arquivo.
+    """
+    arquivo = BytesIO(origem) if isinstance(origem, bytes) else origem
+    extensao = nome.lower()
+    if extensao.endswith(".csv"):
+        df = FileReader.carregar_csv(arquivo)
+    elif extensao.endswith(".xml"):
+        df = FileReader.carregar_xml(arquivo)
+    elif extensao.endswith(".pdf"):
+        df = FileReader.carregar_pdf_notas(arquivo)
+    else:
+        raise ValueError("Formato de arquivo não suportado.")
+    resultado = normalizar_dataframe(df, arrow=arrow)
+    logging.debug("%s normalizado. %s", nome, resultado.relatorio())
+    return resultado.df
+
+
+def _alinhar_tipos(dfs):
+    """
+    Converte, em cada DataFrame, as colunas cujo tipo diverge entre os arquivos
+    para um tipo comum, de forma que a concatenação não caia em `object`.
+    :param dfs: Lista de DataFrames a concatenar.
+    :return: Lista de DataFrames com os tipos alinhados.
+    """
+    tipos = {}
+    for df in dfs:
+        for coluna, dtype in df.dtypes.items():
+            tipos.setdefault(coluna, set()).add(dtype)
+
+    alvos = {}
+    for coluna, dtypes in tipos.items():
+        if len(dtypes) == 1:
+            continue
+        if all(
+            pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d)
+            for d in dtypes
+        ):
+            inteiros = all(isinstance(d, np.dtype) and d.kind in "iu" for d in dtypes)
+            alvos[coluna] = np.result_type(*dtypes) if inteiros else "float64"
+        elif all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            # Categorias de todos os arquivos, para a concatenação manter o tipo
+            categorias = pd.Index([])
+            for d in dtypes:
+                categorias = categorias.union(d.categories)
+            alvos[coluna] = pd.CategoricalDtype(categorias)
+        elif all(pd.api.types.is_datetime64_dtype(d) for d in dtypes):
+            alvos[coluna] = "datetime64[ns]"
+        else:
+            alvos[coluna] = pd.StringDtype()
+
+    if not alvos:
+        return dfs
+    return [
+        df.astype({c: t for c, t in alvos.items() if c in df.columns}) for df in dfs
+    ]
+
+
+class ResultadoIngestao:
+    """
+    Resultado da ingestão de vários arquivos: o DataFrame consolidado (`df`),
+    os nomes dos arquivos lidos com sucesso, na ordem de envio (`arquivos`), as
+    falhas por arquivo (`erros`, {nome: mensagem}) e a posição da primeira
+    linha de cada arquivo no consolidado (`inicios`).
+    """
+
+    def __init__(self, df, arquivos, erros, inicios=None):
+        self.df = df
+        self.arquivos = arquivos
+        self.erros = erros
+        self.inicios = inicios if inicios is not None else []
+
+
 class AgentManager:
     """
     Classe responsável por coordenar os módulos filhos e gerenciar o fluxo de dados.
     """
 
-    def __init__(self):
+    def __init__(self, cache=None, arrow=None):
+        """
+        :param cache: CacheLeitura opcional, compartilhável entre instâncias,
+            para não reprocessar arquivos com o mesmo conteúdo.
+        :param arrow: Usa tipos pyarrow nos dados carregados; se None, segue a
+            variável de ambiente CHATFISCAL_ARROW.
+        """
         self.memoria = MemoriaCompartilhada()
+        self.cache = cache
+        if arrow is None:
+            arrow = os.getenv("CHATFISCAL_ARROW", "0") == "1"
+        self.arrow = arrow
+        # Versão das entradas de cache: leitor, normalização e modo de tipos
+        self._versao_cache = f"{VERSAO_LEITOR}n{VERSAO_NORMALIZACAO}{'a' if arrow else ''}"
+        self._ultimo_lote = (None, None, None, None)  # (chaves, arquivos, erros, inicios)
+        # Arquivos do último lote, com perfil, validação, índices de duplicidade e KPIs
+        self.particoes = IndiceParticoes(cache)
+        self._versao_lote = None  # versão de "arquivo_carregado" gravada pelo lote
+        self._cubo_avulso = (None, None)  # (versão de "arquivo_carregado", CuboKPI)
 
     def processar_entrada(self, entrada, tipo):
         """
@@ -83,43 +200,238 @@ class AgentManager:
 
     def carregar_arquivo(self, arquivo):
         """
-        Carrega e processa arquivos CSV ou XML.
+        Carrega e processa arquivos CSV, XML ou PDF (DANFE).
         :param arquivo: Arquivo carregado pelo usuário.
         :return: DataFrame com os dados processados.
         """
         nome = arquivo.name.lower()
-        if nome.endswith(".csv"):
-            try:
-                df = pd.read_csv(arquivo, encoding="utf-8", sep=None, engine="python")
-                self.memoria.salvar("arquivo_carregado", df)
-                return df
-            except Exception as e:
-                return f"Erro ao carregar arquivo CSV: {e}"
-        elif nome.endswith(".xml"):
+        with etapa("carregar_arquivo", formato=os.path.splitext(nome)[1].lstrip(".")) as medida:
+            if nome.endswith(".csv"):
+                try:
+                    return self._ler_e_salvar(nome, arquivo, medida)
+                except Exception as e:
+                    return f"Erro ao carregar arquivo CSV: {e}"
+            elif nome.endswith(".xml"):
+                try:
+                    # Use o FileReader em vez de duplicar a lógica
+                    return self._ler_e_salvar(nome, arquivo, medida)
+                except Exception as e:
+                    return f"Erro ao carregar arquivo XML: {e}"
+            elif nome.endswith(".pdf"):
+                try:
+                    return self._ler_e_salvar(nome, arquivo, medida)
+                except Exception as e:
+                    return f"Erro ao carregar arquivo PDF: {e}"
+            else:
+                return "Formato de arquivo não suportado."
+
+    def _ler_e_salvar(self, nome, arquivo, medida):
+        df = _ler_arquivo_fiscal(nome, arquivo, self.arrow)
+        self.memoria.salvar("arquivo_carregado", df)
+        medida.registrar(linhas=len(df), tamanho_bytes=getattr(arquivo, "size", None))
+        return df
+
+    def carregar_arquivos(self, arquivos, max_workers=None, ao_progredir=None):
+        """
+        Carrega vários arquivos CSV/XML/PDF em paralelo (pool de processos) e
+        consolida o resultado em um único DataFrame, salvo na memória compartilhada.
+        Um arquivo com erro não interrompe os demais: a falha é registrada em
+        `ResultadoIngestao.erros`. Com `self.cache`, arquivos já lidos (mesmo
+        conteúdo) não são reprocessados, e repetir o mesmo conjunto de arquivos
+        devolve o resultado anterior sem nova concatenação.
+        :param arquivos: Arquivos enviados (objetos com `name` e `read`) ou caminhos.
+        :param max_workers: Número de processos; 1 lê tudo no processo atual.
+        :param ao_progredir: Callback opcional chamado a cada arquivo concluído,
+            com (nome, concluidos, total, erro), onde erro é None em caso de sucesso.
+        :return: ResultadoIngestao.
+        """
+        with etapa("carregar_arquivos") as medida:
+            resultado = self._carregar_arquivos(arquivos, max_workers, ao_progredir, medida)
+            medida.registrar(
+                linhas=len(resultado.df), arquivos=len(resultado.arquivos), erros=len(resultado.erros)
+            )
+            return resultado
+
+    def _carregar_arquivos(self, arquivos, max_workers, ao_progredir, medida):
+        tarefas, chaves = [], []
+        for arquivo in arquivos:
+            conteudo = None
+            if isinstance(arquivo, (str, os.PathLike)):
+                nome, origem = os.path.basename(arquivo), os.fspath(arquivo)
+                if self.cache and os.path.isfile(origem):
+                    with open(origem, "rb") as f:
+                        conteudo = f.read()
+            else:
+                arquivo.seek(0)
+                nome = arquivo.name
+                origem = conteudo = arquivo.read()
+                if isinstance(conteudo, str):
+                    origem = conteudo = conteudo.encode("utf-8")
+            tarefas.append((nome, origem))
+            chaves.append(
+                chave_conteudo(nome, conteudo, self._versao_cache)
+                if self.cache and conteudo is not None
+                else None
+            )
+
+        medida.registrar(
+            tamanho_bytes=sum(
+                len(origem) if isinstance(origem, bytes) else os.path.getsize(origem)
+                for _, origem in tarefas
+                if isinstance(origem, bytes) or os.path.isfile(origem)
+            )
+        )
+
+        # Mesmo conjunto de arquivos da chamada anterior: nada a reprocessar
+        if self.cache and None not in chaves and self._ultimo_lote[0] == chaves:
+            medida.registrar(reutilizado=True)
+            _, arquivos_lidos, erros_lote, inicios = self._ultimo_lote
+            df = self.memoria.obter("ultimo_lote")
+            if df is None:
+                df = pd.DataFrame()
+            else:
+                self._versao_lote = self.memoria.salvar("arquivo_carregado", df)
+            return ResultadoIngestao(df, arquivos_lidos, erros_lote, inicios)
+
+        total = len(tarefas)
+        dfs, erros = {}, {}
+        concluidos = 0
+
+        def registrar(posicao, nome, obter_df):
+            nonlocal concluidos
             try:
-                # Use o FileReader em vez de duplicar a lógica
-                df = FileReader.carregar_xml(arquivo)
-                self.memoria.salvar("arquivo_carregado", df)
-                return df
+                df = obter_df()
+                if not isinstance(df, pd.DataFrame) or df.empty:
+                    raise ValueError("Arquivo sem dados.")
+                dfs[posicao] = df
+                erro = None
             except Exception as e:
-                return f"Erro ao carregar arquivo XML: {e}"
+                erro = erros[nome] = str(e)
+                logging.warning("Falha ao carregar %s: %s", nome, e)
+            concluidos += 1
+            if ao_progredir:
+                ao_progredir(nome, concluidos, total, erro)
+
+        pendentes = []
+        for posicao, (nome, origem) in enumerate(tarefas):
+            df_cache = self.cache.obter(chaves[posicao]) if chaves[posicao] else None
+            if df_cache is not None:
+                registrar(posicao, nome, lambda: df_cache)
+            else:
+                pendentes.append((posicao, nome, origem))
+
+        def ler_e_guardar(posicao, obter_df, no_pool=False):
+            # No pool, a leitura ocorre no outro processo: mede-se só o recebimento
+            with etapa("ler_arquivo", arquivo=tarefas[posicao][0], no_pool=no_pool) as leitura:
+                df = obter_df()
+                if isinstance(df, pd.DataFrame):
+                    leitura.registrar(linhas=len(df))
+            if chaves[posicao] and isinstance(df, pd.DataFrame) and not df.empty:
+                self.cache.salvar(chaves[posicao], df)
+            return df
+
+        if max_workers is None:
+            max_workers = min(len(pendentes), os.cpu_count() or 1)
+        if max_workers <= 1 or len(pendentes) <= 1:
+            for posicao, nome, origem in pendentes:
+                registrar(
+                    posicao,
+                    nome,
+                    lambda: ler_e_guardar(
+                        posicao, lambda: _ler_arquivo_fiscal(nome, origem, self.arrow)
+                    ),
+                )
         else:
-            return "Formato de arquivo não suportado."
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=CONTEXTO_POOL) as pool:
+                futuros = {
+                    pool.submit(
+                        _ler_arquivo_fiscal, nome, origem, self.arrow
+                    ): (posicao, nome)
+                    for posicao, nome, origem in pendentes
+                }
+                for futuro in as_completed(futuros):
+                    posicao, nome = futuros[futuro]
+                    registrar(
+                        posicao, nome, lambda: ler_e_guardar(posicao, futuro.result, True)
+                    )
+
+        ordem = sorted(dfs)
+        # Só os arquivos novos no lote têm perfil, validação e índices calculados
+        with etapa("indexar_particoes", arquivos=len(ordem)):
+            self.particoes.sincronizar(
+                [(chaves[p] or fingerprint_dataframe(dfs[p]), dfs[p]) for p in ordem]
+            )
+        inicios = self.particoes.inicios
+        if ordem:
+            with etapa("concatenar", arquivos=len(ordem)) as concatenacao:
+                df = pd.concat(_alinhar_tipos([dfs[p] for p in ordem]), ignore_index=True)
+                concatenacao.registrar(linhas=len(df))
+            registrar_perfil(df, self.particoes.perfil(df))
+            # Mesmo conteúdo nas duas chaves: o armazém guarda uma única cópia
+            self._versao_lote = self.memoria.salvar("arquivo_carregado", df)
+            self.memoria.salvar("ultimo_lote", df)
+        else:
+            df = pd.DataFrame()
+        resultado = ResultadoIngestao(df, [tarefas[p][0] for p in ordem], erros, inicios)
+        self._ultimo_lote = (chaves, resultado.arquivos, erros, inicios)
+        return resultado
+
+    def _dados_do_lote(self):
+        """
+        :return: (DataFrame carregado, True se ele é o consolidado do último lote).
+        """
+        df, versao = self.memoria.obter_com_versao("arquivo_carregado")
+        return df, versao is not None and versao == self._versao_lote
 
     def validar_arquivo(self):
         """
         Valida os dados do arquivo carregado na memória compartilhada.
         :return: Relatório de erros ou mensagem de sucesso.
         """
-        df = self.memoria.obter("arquivo_carregado")
+        df, do_lote = self._dados_do_lote()
         if df is None or df.empty:
             return "Nenhum arquivo carregado para validação."
 
-        erros = DataValidator.validar_dados(df)
+        with etapa("validar_arquivo", do_lote=do_lote) as medida:
+            if do_lote:
+                resultado = self.particoes.validacao(df)
+            else:
+                resultado = DataValidator.validar_dados_vetorizado(df)
+            erros = resultado.mensagens()
+            medida.registrar(linhas=len(df), erros=len(erros))
         if erros:
             return "Erros encontrados na validação:\n" + "\n".join(erros)
         return "Arquivo validado com sucesso, sem erros encontrados."
 
+    def detectar_anomalias(self):
+        """
+        Duplicidades e valores atípicos nos dados carregados; para o lote de
+        arquivos, combina os índices e achados já calculados de cada arquivo.
+        :return: Lista de Achado, do mais grave para o menos grave.
+        """
+        df, do_lote = self._dados_do_lote()
+        if df is None or df.empty:
+            return []
+        if do_lote:
+            return self.particoes.achados()
+        return detectar_anomalias(df)
+
+    def kpis(self):
+        """
+        Cubo de KPIs fiscais dos dados carregados. Para o lote de arquivos, é a
+        soma dos cubos já materializados de cada arquivo; para dados carregados
+        de outra forma, o cubo é calculado uma vez por versão dos dados.
+        :return: CuboKPI ou None se não há dados carregados.
+        """
+        df, versao = self.memoria.obter_com_versao("arquivo_carregado")
+        if df is None or df.empty:
+            return None
+        if versao is not None and versao == self._versao_lote:
+            return self.particoes.cubo()
+        if versao is None or self._cubo_avulso[0] != versao:
+            self._cubo_avulso = (versao, CuboKPI.de_dataframe(df))
+        return self._cubo_avulso[1]
+
     def gerar_resposta(self, pergunta):
         """
         Gera uma resposta com base nos dados carregados e na pergunta fornecida.
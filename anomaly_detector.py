@@ -0,0 +1,448 @@
+# anomaly_detector.py
+
+import itertools
+import numpy as np
+import pandas as pd
+from conversores import converter_data_br, converter_decimal_br
+from query_planner import ALTERNATIVAS_COLUNAS, ALTERNATIVAS_ITEM, detectar_coluna
+
+
+# Valor da nota inteira tem preferência sobre o valor do item
+ALTERNATIVAS_VALOR_NOTA = ["valor_total_nota", "valor_total", "vNF"] + ALTERNATIVAS_COLUNAS["valor"]
+
+# Diferença máxima (em reais) entre valores de notas quase duplicadas
+TOLERANCIA_VALOR = 0.01
+
+# Escore robusto (mediana e MAD do logaritmo do valor) a partir do qual o valor é atípico
+LIMIAR_ATIPICO = 3.5
+
+# Grupos (emitente ou CFOP) menores que isso não são avaliados quanto a valores atípicos
+MINIMO_GRUPO = 10
+
+# Peso de cada tipo de achado na ordenação das dicas
+GRAVIDADE = {
+    "chave_duplicada": 3,
+    "numero_duplicado": 3,
+    "quase_duplicada": 2,
+    "valor_atipico_emitente": 1,
+    "valor_atipico_cfop": 1,
+}
+
+_PRIMO = np.uint64(0x100000001B3)
+
+# Base dos identificadores de notas sem chave de acesso, única por análise
+_analises = itertools.count(1)
+
+
+def _plural(n, singular, plural):
+    return f"{n} {singular if n == 1 else plural}"
+
+
+class Achado:
+    """
+    Inconsistência encontrada nos dados: tipo (chave de GRAVIDADE), posições
+    (iloc) das linhas envolvidas e quantidade de grupos (chaves repetidas,
+    pares de notas ou linhas atípicas), usada na mensagem.
+    """
+
+    def __init__(self, tipo, linhas, grupos=None):
+        self.tipo = tipo
+        self.linhas = linhas
+        self.grupos = len(linhas) if grupos is None else grupos
+        self.gravidade = GRAVIDADE[tipo]
+
+    @property
+    def quantidade(self):
+        return len(self.linhas)
+
+    @property
+    def mensagem(self):
+        grupos = self.grupos
+        if self.tipo == "chave_duplicada":
+            return (
+                f"📌 {_plural(grupos, 'chave de acesso aparece', 'chaves de acesso aparecem')} "
+                f"em mais de uma nota ({self.quantidade - grupos} cópia(s) a mais). "
+                "Verifique se o mesmo arquivo foi carregado mais de uma vez."
+            )
+        if self.tipo == "numero_duplicado":
+            return (
+                f"📌 {_plural(grupos, 'número de nota se repete', 'números de nota se repetem')} "
+                "para a mesma série e emitente em notas diferentes. "
+                "Pode haver nota emitida em duplicidade."
+            )
+        if self.tipo == "quase_duplicada":
+            return (
+                f"🔍 {_plural(grupos, 'par de notas', 'pares de notas')} do mesmo emitente, "
+                "na mesma data e com o mesmo valor, mas com número ou chave diferentes. "
+                "Pode haver emissão em duplicidade."
+            )
+        if self.tipo == "valor_atipico_emitente":
+            return (
+                f"📉 {_plural(grupos, 'nota tem', 'notas têm')} valor muito diferente "
+                "do habitual para o emitente. Confira se não há erro de digitação ou de cálculo."
+            )
+        return (
+            f"📉 {_plural(grupos, 'item tem', 'itens têm')} valor muito diferente "
+            "do habitual para o CFOP. Verifique se o CFOP está correto."
+        )
+
+    def __repr__(self):
+        return f"Achado({self.tipo!r}, {self.quantidade} linhas)"
+
+
+def ordenar_achados(achados) -> list:
+    """
+    Remove achados vazios e ordena do mais grave para o menos grave.
+    """
+    achados = [achado for achado in achados if achado is not None and achado.quantidade]
+    return sorted(achados, key=lambda a: (a.gravidade, a.quantidade), reverse=True)
+
+
+def combinar_achados(listas, deslocamentos) -> list:
+    """
+    Junta os achados calculados separadamente em partes de um mesmo conjunto.
+    :param listas: Lista de achados de cada parte.
+    :param deslocamentos: Posição da primeira linha de cada parte no conjunto.
+    :return: Um Achado por tipo, com as linhas já no conjunto inteiro.
+    """
+    linhas, grupos = {}, {}
+    for achados, deslocamento in zip(listas, deslocamentos):
+        for achado in achados:
+            linhas.setdefault(achado.tipo, []).append(achado.linhas + deslocamento)
+            grupos[achado.tipo] = grupos.get(achado.tipo, 0) + achado.grupos
+    return ordenar_achados(
+        Achado(tipo, np.concatenate(partes), grupos[tipo]) for tipo, partes in linhas.items()
+    )
+
+
+def _hash_coluna(serie: pd.Series) -> np.ndarray:
+    """
+    Hash uint64 de cada valor. Textos são comparados sem espaços nas pontas e
+    sem diferenciar maiúsculas; categóricas são calculadas só nas categorias.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = _hash_coluna(pd.Series(serie.cat.categories))
+        return np.append(categorias, np.uint64(0))[serie.cat.codes.to_numpy()]
+    if serie.dtype == object or pd.api.types.is_string_dtype(serie.dtype):
+        serie = serie.astype("string").str.strip().str.upper()
+    # categorize=False: chaves quase sempre distintas não compensam a fatoração
+    return pd.util.hash_pandas_object(serie, index=False, categorize=False).to_numpy()
+
+
+def _combinar(hashes):
+    resultado = np.zeros(len(hashes[0]), dtype=np.uint64)
+    for h in hashes:
+        resultado = resultado * _PRIMO ^ h
+    return resultado
+
+
+def indice_hash(df: pd.DataFrame, colunas) -> np.ndarray:
+    """
+    Índice hash das linhas: um uint64 por linha combinando as colunas, para
+    comparar chaves compostas sem comparar os textos.
+    :param df: DataFrame carregado.
+    :param colunas: Colunas que formam a chave.
+    :return: Array uint64 com len(df) posições.
+    """
+    return _combinar([_hash_coluna(df[coluna]) for coluna in colunas])
+
+
+class IndiceChaves:
+    """
+    Chaves (hash uint64) das notas de um conjunto, ordenadas para busca binária.
+
+    Cada entrada guarda a posição da linha e, opcionalmente, o identificador
+    da nota: com identificadores, uma chave só conta como repetida quando
+    aparece em notas diferentes (ex.: mesmo número com chaves de acesso
+    diferentes); sem eles, toda entrada é uma nota distinta.
+    """
+
+    def __init__(self, chaves, posicoes, notas=None):
+        ordem = np.argsort(chaves, kind="stable")
+        self.chaves = chaves[ordem]
+        self.posicoes = posicoes[ordem]
+        self.notas = None if notas is None else notas[ordem]
+
+    def __len__(self):
+        return len(self.chaves)
+
+    def _intervalos(self, chaves):
+        return (
+            np.searchsorted(self.chaves, chaves, side="left"),
+            np.searchsorted(self.chaves, chaves, side="right"),
+        )
+
+    def repetidas(self) -> np.ndarray:
+        """
+        :return: Chaves (ordenadas, sem repetição) presentes em mais de uma nota.
+        """
+        if self.notas is None:
+            return np.unique(self.chaves[1:][self.chaves[1:] == self.chaves[:-1]])
+        # Conta as notas distintas de cada chave
+        pares = pd.DataFrame({"chave": self.chaves, "nota": self.notas}).drop_duplicates()
+        contagem = pares["chave"].value_counts()
+        return np.sort(contagem.index[contagem.to_numpy() > 1].to_numpy(dtype=np.uint64))
+
+    def em_conflito(self, outro) -> np.ndarray:
+        """
+        Chaves de outro índice que também aparecem neste, em outra nota.
+        :param outro: IndiceChaves de outra parte do conjunto.
+        :return: Chaves ordenadas, sem repetição.
+        """
+        inicio, fim = self._intervalos(outro.chaves)
+        if self.notas is None:
+            return np.unique(outro.chaves[fim > inicio])
+        chaves, notas = self.entradas(outro.chaves)
+        candidatas = np.concatenate([chaves, outro.chaves[fim > inicio]])
+        identificadores = np.concatenate([notas, outro.notas[fim > inicio]])
+        return repetidas_nas_entradas(candidatas, identificadores)
+
+    def entradas(self, chaves):
+        """
+        Entradas cujas chaves estão em `chaves` (sem repetição).
+        :return: (chaves, notas) das entradas; notas é None sem identificadores.
+        """
+        inicio, fim = self._intervalos(np.unique(chaves))
+        quantidade = fim - inicio
+        deslocamento = np.arange(quantidade.sum()) - np.repeat(
+            np.cumsum(quantidade) - quantidade, quantidade
+        )
+        posicoes = np.repeat(inicio, quantidade) + deslocamento
+        notas = None if self.notas is None else self.notas[posicoes]
+        return self.chaves[posicoes], notas
+
+    def posicoes_de(self, chaves) -> np.ndarray:
+        """
+        :param chaves: Chaves ordenadas.
+        :return: Posições (ordenadas) das linhas cujas chaves estão em `chaves`.
+        """
+        if not len(chaves):
+            return np.array([], dtype=np.intp)
+        lugar = np.minimum(np.searchsorted(chaves, self.chaves), len(chaves) - 1)
+        return np.sort(self.posicoes[chaves[lugar] == self.chaves])
+
+
+def repetidas_nas_entradas(chaves, notas=None) -> np.ndarray:
+    """
+    Chaves que aparecem em mais de uma nota, dadas entradas de várias partes.
+    :return: Chaves ordenadas, sem repetição.
+    """
+    return IndiceChaves(chaves, np.zeros(len(chaves), dtype=np.intp), notas).repetidas()
+
+
+def _preenchidas(df, colunas):
+    return df[colunas].notna().all(axis=1).to_numpy()
+
+
+def _inicios_nota(hashes, identificadas, inicios_arquivos=None, itens=None):
+    """
+    Marca a primeira linha de cada nota. Linhas consecutivas com a mesma chave,
+    no mesmo arquivo, só são itens da mesma nota (o cabeçalho é repetido em
+    cada item) quando há uma coluna de item e o item ainda não apareceu na
+    sequência; um item repetido começa outra cópia da nota. Sem coluna de
+    item, e em linhas sem chave ou sem item, cada linha é uma nota.
+    :param itens: (hashes dos itens, linhas com item preenchido) ou None.
+    """
+    inicio = np.ones(len(hashes), dtype=bool)
+    if itens is None:
+        return inicio
+    hash_item, com_item = itens
+    continua = identificadas & com_item
+    inicio[1:] = (hashes[1:] != hashes[:-1]) | ~continua[1:] | ~continua[:-1]
+    if inicios_arquivos is not None:
+        inicio[np.asarray(inicios_arquivos, dtype=np.intp)] = True
+    # Ocorrência de cada item na sequência: 0 na primeira cópia, 1 na segunda...
+    ocorrencia = (
+        pd.Series(hash_item).groupby([np.cumsum(inicio), hash_item]).cumcount().to_numpy()
+    )
+    inicio[1:] |= ocorrencia[1:] > ocorrencia[:-1]
+    return inicio
+
+
+def _numerica(df, coluna):
+    return converter_decimal_br(df[coluna]).to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _atipicos(valores, grupos):
+    """
+    Posições com valor atípico dentro do grupo: escore robusto
+    0,6745 * |log(v) - mediana| / MAD acima de LIMIAR_ATIPICO.
+    """
+    validos = np.flatnonzero(valores > 0)
+    if not len(validos):
+        return validos
+    logs = pd.Series(np.log(valores[validos]))
+    chaves = grupos[validos]
+    agrupado = logs.groupby(chaves)
+    desvio = (logs - agrupado.transform("median")).abs()
+    mad = desvio.groupby(chaves).transform("median")
+    tamanho = agrupado.transform("size")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        escore = 0.6745 * desvio / mad
+    atipico = (tamanho >= MINIMO_GRUPO) & (mad > 0) & (escore > LIMIAR_ATIPICO)
+    return validos[atipico.to_numpy()]
+
+
+class AnaliseNotas:
+    """
+    Hashes e notas de um DataFrame fiscal, calculados uma única vez e usados
+    pelos índices de duplicidade e pelas buscas de quase duplicatas e de
+    valores atípicos.
+    """
+
+    def __init__(self, df: pd.DataFrame, inicios_arquivos=None):
+        """
+        :param df: DataFrame carregado.
+        :param inicios_arquivos: Posições da primeira linha de cada arquivo do
+            lote consolidado; uma nota nunca continua de um arquivo para o seguinte.
+        """
+        self.df = df
+        colunas = {nome: detectar_coluna(df, alt) for nome, alt in ALTERNATIVAS_COLUNAS.items()}
+        self.chave, self.numero, self.emitente, self.data, self.cfop = (
+            colunas[nome] for nome in ("chave", "numero", "emitente", "data", "cfop")
+        )
+        self.coluna_valor_nota = detectar_coluna(df, ALTERNATIVAS_VALOR_NOTA)
+        self.coluna_valor_item = detectar_coluna(df, ALTERNATIVAS_COLUNAS["valor"])
+        item = detectar_coluna(df, ALTERNATIVAS_ITEM)
+        self.itens = (_hash_coluna(df[item]), _preenchidas(df, [item])) if item else None
+
+        # Hash de cada coluna usada, calculado uma única vez
+        self.composta = [c for c in (self.numero, colunas["serie"], self.emitente) if c]
+        usadas = {self.chave, self.emitente, self.cfop, *self.composta} - {None}
+        self.hashes = {c: _hash_coluna(df[c]) for c in usadas}
+        nenhum = np.zeros(len(df), dtype=np.uint64)
+        nenhuma = np.zeros(len(df), dtype=bool)
+
+        # Chave de acesso e número + série + emitente
+        self.hash_chave = self.hashes[self.chave] if self.chave else nenhum
+        self.hash_numero = (
+            _combinar([self.hashes[c] for c in self.composta]) if self.numero else nenhum
+        )
+        self.com_chave = _preenchidas(df, [self.chave]) if self.chave else nenhuma
+        self.com_numero = _preenchidas(df, self.composta) if self.numero else nenhuma
+
+        # Identificação da nota: chave quando houver, senão número; sem nenhum
+        # dos dois, a linha recebe um identificador próprio
+        self.hash_nota = np.where(
+            self.com_chave,
+            self.hash_chave,
+            np.where(self.com_numero, self.hash_numero, np.arange(len(df), dtype=np.uint64)),
+        )
+        self.inicios_arquivos = inicios_arquivos
+        self.inicios = _inicios_nota(
+            self.hash_nota, self.com_chave | self.com_numero, inicios_arquivos, self.itens
+        )
+
+    def indice_chaves(self):
+        """
+        :return: IndiceChaves das chaves de acesso (uma entrada por nota) ou None.
+        """
+        if not self.chave:
+            return None
+        notas = np.flatnonzero(self.inicios & self.com_chave)
+        return IndiceChaves(self.hash_chave[notas], notas)
+
+    def indice_numeros(self):
+        """
+        :return: IndiceChaves de número + série + emitente, identificando cada
+            nota pela chave de acesso (uma entrada por combinação), ou None.
+        """
+        if not self.numero:
+            return None
+        combinado = self.hash_numero * _PRIMO ^ self.hash_chave
+        notas = np.flatnonzero(
+            _inicios_nota(combinado, self.com_numero, self.inicios_arquivos, self.itens)
+            & self.com_numero
+        )
+        # A mesma nota com a mesma chave já é contada como chave duplicada
+        repetida = pd.Series(combinado[notas]).duplicated().to_numpy() & self.com_chave[notas]
+        notas = notas[~repetida]
+        # Sem chave de acesso, cada nota recebe um identificador próprio, que não
+        # coincide com o de outras análises (outros arquivos)
+        proprios = (np.uint64(next(_analises)) << np.uint64(40)) | notas.astype(np.uint64)
+        identificadores = np.where(self.com_chave[notas], self.hash_chave[notas], proprios)
+        return IndiceChaves(self.hash_numero[notas], notas, identificadores)
+
+    def achados_exatos(self) -> list:
+        """
+        Chaves de acesso e números repetidos (duplicidade exata).
+        """
+        achados = []
+        for tipo, indice in (
+            ("chave_duplicada", self.indice_chaves()),
+            ("numero_duplicado", self.indice_numeros()),
+        ):
+            if indice is not None:
+                repetidas = indice.repetidas()
+                achados.append(Achado(tipo, indice.posicoes_de(repetidas), len(repetidas)))
+        return achados
+
+    def quase_duplicadas(self):
+        """
+        Blocos por emitente e dia; dentro de cada bloco as notas são ordenadas
+        pelo valor e só vizinhas são comparadas (O(n log n) em vez de O(n²)).
+        """
+        df, data, coluna_valor = self.df, self.data, self.coluna_valor_nota
+        if not (self.emitente and data and coluna_valor):
+            return None
+        validas = _preenchidas(df, [self.emitente, data, coluna_valor])
+        notas = np.flatnonzero(self.inicios & validas)
+        dias = converter_data_br(df[data].iloc[notas]).dt.floor("D")
+        notas = notas[dias.notna().to_numpy()]
+        dias = dias.dropna().to_numpy().astype("int64").astype(np.uint64)
+        valores = _numerica(df, coluna_valor)[notas]
+        blocos = self.hashes[self.emitente][notas] * _PRIMO ^ dias
+
+        ordem = np.lexsort((valores, blocos))
+        blocos, valores, notas = blocos[ordem], valores[ordem], notas[ordem]
+        vizinhas = (
+            (blocos[1:] == blocos[:-1])
+            & (np.abs(valores[1:] - valores[:-1]) <= TOLERANCIA_VALOR)
+            # Mesma chave (ou número) já é duplicidade exata
+            & (self.hash_nota[notas[1:]] != self.hash_nota[notas[:-1]])
+        )
+        pares = np.flatnonzero(vizinhas)
+        linhas = np.unique(np.concatenate([notas[pares], notas[pares + 1]]))
+        return Achado("quase_duplicada", linhas, len(pares))
+
+    def valores_atipicos(self) -> list:
+        """
+        Valores atípicos por emitente (valor da nota) e por CFOP (valor do item).
+        """
+        df, achados = self.df, []
+        if self.emitente and self.coluna_valor_nota:
+            notas = np.flatnonzero(self.inicios & _preenchidas(df, [self.emitente]))
+            valores = _numerica(df, self.coluna_valor_nota)[notas]
+            atipicas = notas[_atipicos(valores, self.hashes[self.emitente][notas])]
+            achados.append(Achado("valor_atipico_emitente", atipicas))
+        if self.cfop and self.coluna_valor_item:
+            linhas = np.flatnonzero(_preenchidas(df, [self.cfop]))
+            valores = _numerica(df, self.coluna_valor_item)[linhas]
+            atipicas = linhas[_atipicos(valores, self.hashes[self.cfop][linhas])]
+            achados.append(Achado("valor_atipico_cfop", atipicas))
+        return achados
+
+    def achados_aproximados(self) -> list:
+        """
+        Quase duplicatas e valores atípicos.
+        """
+        return [self.quase_duplicadas()] + self.valores_atipicos()
+
+
+def detectar_anomalias(df: pd.DataFrame, inicios_arquivos=None) -> list:
+    """
+    Procura notas duplicadas, quase duplicadas e valores atípicos usando
+    índices hash e ordenação, em tempo próximo de linear:
+    - chave de acesso repetida em notas diferentes;
+    - mesmo número, série e emitente em notas diferentes;
+    - mesmo emitente, mesma data e mesmo valor com número ou chave diferentes;
+    - valores atípicos por emitente (valor da nota) e por CFOP (valor do item).
+    :param df: DataFrame carregado.
+    :param inicios_arquivos: Posições da primeira linha de cada arquivo do lote
+        consolidado; uma nota nunca continua de um arquivo para o seguinte.
+    :return: Lista de Achado, do mais grave para o menos grave.
+    """
+    if df is None or df.empty:
+        return []
+    analise = AnaliseNotas(df, inicios_arquivos)
+    return ordenar_achados(analise.achados_exatos() + analise.achados_aproximados())
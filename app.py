@@ -1,6 +1,13 @@
+import os
+from functools import partial
 import streamlit as st
 import pandas as pd
 from agent_manager import AgentManager
+from chart_data import MAX_CATEGORIAS, dados_grafico, dimensoes_disponiveis, espec_por_dimensao
+from exporter import Exporter, FORMATOS
+from instrumentation import INSTRUMENTACAO, evento_para_dict
+from parse_cache import CacheLeitura
+from report_writer import historico_para_word
 from llm_utils import gerar_resposta_llm
 from main.dicas_corujito import gerar_dica_corujito
 from main.interface import (
@@ -19,12 +26,39 @@ from main.interface import (
 st.set_page_config(page_title="ChatFiscal", layout="wide")
 montar_interface()
 
-# Inicialização do agente pai
-manager = AgentManager()
+
+@st.cache_resource
+def obter_cache_leitura():
+    """
+    Cache de arquivos lidos, compartilhado por todas as sessões do servidor.
+    """
+    return CacheLeitura(
+        limite_bytes=int(os.getenv("CHATFISCAL_CACHE_MB", "512")) * 2**20,
+        diretorio=os.getenv("CHATFISCAL_CACHE_DIR"),
+    )
+
+
+@st.cache_resource
+def iniciar_servidor_metricas():
+    """
+    Servidor HTTP das métricas (formato Prometheus), um por processo, se
+    CHATFISCAL_METRICAS_PORTA estiver definida.
+    """
+    porta = os.getenv("CHATFISCAL_METRICAS_PORTA")
+    if porta:
+        INSTRUMENTACAO.configurar(ativa=True)
+        return INSTRUMENTACAO.servir_prometheus(int(porta), os.getenv("CHATFISCAL_METRICAS_ENDERECO", "127.0.0.1"))
+    return None
+
+
+iniciar_servidor_metricas()
+
+# Inicialização do agente pai (um por sessão, preservado entre reruns)
+if "manager" not in st.session_state:
+    st.session_state["manager"] = AgentManager(cache=obter_cache_leitura())
+manager = st.session_state["manager"]
 
 # Inicialização da sessão
-if "df" not in st.session_state:
-    st.session_state["df"] = None
 if "historico" not in st.session_state:
     st.session_state["historico"] = []
 if "arquivo_carregado" not in st.session_state:
@@ -44,42 +78,67 @@ abas = st.tabs([
 # 🧩 Aba 1 — Upload de Arquivos e Perguntas ao Agente
 with abas[0]:
     st.subheader("📊 Dados & Perguntas")
-    st.markdown("Envie um ou mais arquivos fiscais para análise. Aceitamos arquivos CSV ou XML.")
+    st.markdown("Envie um ou mais arquivos fiscais para análise. Aceitamos arquivos CSV, XML ou PDF (DANFE).")
 
     arquivos = st.file_uploader(
         "📎 Escolha os arquivos",
-        type=["csv", "xml"],
+        type=["csv", "xml", "pdf"],
         accept_multiple_files=True,
         key="upload_arquivos_fiscais",
     )
 
-    dfs = []
-    for arquivo in arquivos:
-        df_individual = manager.carregar_arquivo(arquivo)
-        if isinstance(df_individual, pd.DataFrame) and not df_individual.empty:
-            dfs.append(df_individual)
+    resultado = None
+    if arquivos:
+        progresso = st.progress(0.0, text="Carregando arquivos...")
+
+        def atualizar_progresso(nome, concluidos, total, erro):
+            progresso.progress(concluidos / total, text=f"{concluidos}/{total}: {nome}")
 
-    if dfs:
-        df = pd.concat(dfs, ignore_index=True)
-        st.session_state["df"] = df
+        resultado = manager.carregar_arquivos(arquivos, ao_progredir=atualizar_progresso)
+        progresso.empty()
+        for nome, erro in resultado.erros.items():
+            mostrar_erro(f"{nome}: {erro}")
+
+    if resultado is not None and resultado.arquivos:
+        # O DataFrame fica apenas no armazém da sessão (manager.memoria)
+        df = resultado.df
         st.session_state["arquivo_carregado"] = True
         st.session_state["dica_exibida"] = False
 
-        mostrar_sucesso(f"{len(dfs)} arquivo(s) carregado(s) com sucesso!")
+        mostrar_sucesso(f"{len(resultado.arquivos)} arquivo(s) carregado(s) com sucesso!")
         st.dataframe(df)
 
+        with st.expander("📥 Exportar dados"):
+            formato = st.selectbox("Formato", list(FORMATOS), key="formato_exportacao")
+            extensao, mime = FORMATOS[formato]
+            # Gerado em arquivo temporário, só quando o botão é clicado
+            st.download_button(
+                label=f"Baixar dados ({extensao})",
+                data=partial(Exporter.arquivo_temporario, df, formato),
+                file_name=f"dados_chatfiscal{extensao}",
+                mime=mime,
+                key="botao_exportar_dados",
+            )
+
         if not st.session_state["dica_exibida"]:
-            dica = gerar_dica_corujito(df)
+            dica = gerar_dica_corujito(df, achados=manager.detectar_anomalias())
             exibir_dica_corujito(dica)
             st.session_state["dica_exibida"] = True
 
         pergunta = st.text_input("Digite uma pergunta fiscal para o agente:", key="campo_pergunta_agente")
 
+        tempo_real = st.toggle("Mostrar a resposta enquanto é gerada", value=True, key="resposta_tempo_real")
+
         if pergunta and st.button("Enviar", key="botao_enviar_pergunta"):
-            with st.spinner("Analisando sua pergunta..."):
-                resposta = gerar_resposta_llm(pergunta, df)
+            if tempo_real:
+                st.markdown(f"**Pergunta:** {pergunta}")
+                resposta = st.write_stream(gerar_resposta_llm(pergunta, df, stream=True))
                 st.session_state["historico"].append((pergunta, resposta))
-                exibir_resposta_agente(pergunta, resposta)
+            else:
+                with st.spinner("Analisando sua pergunta..."):
+                    resposta = gerar_resposta_llm(pergunta, df)
+                    st.session_state["historico"].append((pergunta, resposta))
+                    exibir_resposta_agente(pergunta, resposta)
     else:
         mostrar_alerta("Nenhum arquivo carregado ainda. Você pode simular dados ou enviar arquivos reais.")
 
@@ -97,31 +156,14 @@ with abas[1]:
             st.session_state["historico"] = []
             mostrar_sucesso("Histórico limpo com sucesso!")
 
-        try:
-            from docx import Document
-            from io import BytesIO
-
-            doc = Document()
-            doc.add_heading("Relatório de Perguntas e Respostas", level=1)
-
-            for i, (p, r) in enumerate(st.session_state["historico"], 1):
-                doc.add_paragraph(f"{i}. Pergunta: {p}")
-                doc.add_paragraph(f"   Resposta: {r}")
-                doc.add_paragraph("")
-
-            buffer = BytesIO()
-            doc.save(buffer)
-            buffer.seek(0)
-
-            st.download_button(
-                label="📤 Exportar histórico como relatório (.docx)",
-                data=buffer,
-                file_name="relatorio_chatfiscal.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                key="botao_exportar_docx",
-            )
-        except Exception as e:
-            mostrar_erro(f"Erro ao gerar relatório: {e}")
+        # O documento só é gerado quando o botão é clicado, não a cada rerun
+        st.download_button(
+            label="📤 Exportar histórico como relatório (.docx)",
+            data=partial(historico_para_word, list(st.session_state["historico"])),
+            file_name="relatorio_chatfiscal.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            key="botao_exportar_docx",
+        )
     else:
         mostrar_alerta("Nenhuma pergunta registrada ainda. Faça uma análise para começar.")
 
@@ -135,15 +177,100 @@ with abas[2]:
 # 🧩 Aba 4 — Visualizações
 with abas[3]:
     st.header("📈 Visualizações")
+    dados_carregados = manager.memoria.obter("arquivo_carregado")
+    dimensoes = dimensoes_disponiveis(dados_carregados) if dados_carregados is not None else {}
+    if dimensoes:
+        coluna_dimensao, coluna_metrica = st.columns(2)
+        dimensao = coluna_dimensao.selectbox("Agrupar por", list(dimensoes), key="dimensao_grafico")
+        por_quantidade = coluna_metrica.radio(
+            "Métrica", ["Valor total", "Quantidade de notas"], horizontal=True, key="metrica_grafico"
+        ) == "Quantidade de notas"
+        # Dados agregados e limitados a ORCAMENTO_PONTOS, guardados por conjunto de dados
+        espec = espec_por_dimensao(dados_carregados, dimensao, por_quantidade)
+        dados_grafico_aba = dados_grafico(dados_carregados, espec)
+        eixo_y = dados_grafico_aba.columns[1]
+        if espec.periodo is not None:
+            st.line_chart(dados_grafico_aba, x=espec.x, y=eixo_y)
+        else:
+            st.bar_chart(dados_grafico_aba, x=espec.x, y=eixo_y, sort=False)
+    elif dados_carregados is not None:
+        mostrar_alerta("Os dados carregados não têm colunas de emitente, CFOP, UF ou data para gráficos.")
+
     pergunta = st.text_input("Faça uma pergunta sobre os dados carregados")
     if st.button("Gerar Resposta"):
         resposta = manager.gerar_resposta(pergunta)
         st.text(resposta)
 
-# 🧩 Aba 5 — Painel Inteligente (placeholder)
+# 🧩 Aba 5 — Painel Inteligente
+ROTULOS_KPI = {
+    "emitente": "Emitente",
+    "cfop": "CFOP",
+    "uf": "UF",
+    "mes": "Mês",
+    "linhas": "Notas (linhas)",
+    "valor": "Valor total",
+}
+
 with abas[4]:
     st.header("🧠 Painel Inteligente")
-    st.info("Em breve: KPIs fiscais, gráficos e insights inteligentes.")
+    # Cubo materializado por arquivo: as fatias abaixo não releem as notas
+    cubo = manager.kpis()
+    if cubo is None:
+        st.info("Carregue arquivos na aba Upload para ver os KPIs fiscais.")
+    else:
+        filtros = {}
+        seletores = st.columns(len(cubo.dimensoes) or 1)
+        for seletor, dimensao in zip(seletores, cubo.dimensoes):
+            opcoes = ["Todos"] + cubo.valores(dimensao, filtros)
+            escolha = seletor.selectbox(ROTULOS_KPI[dimensao], opcoes, key=f"kpi_{dimensao}")
+            if escolha != "Todos":
+                filtros[dimensao] = escolha
+
+        totais = cubo.totais(filtros)
+        formato_br = str.maketrans(",.", ".,")
+        cartoes = st.columns(len(cubo.medidas))
+        for cartao, medida in zip(cartoes, cubo.medidas):
+            rotulo = ROTULOS_KPI.get(medida, medida.upper())
+            if medida == "linhas":
+                cartao.metric(rotulo, f"{int(totais[medida]):,}".translate(formato_br))
+            else:
+                cartao.metric(rotulo, f"R$ {totais[medida]:,.2f}".translate(formato_br))
+
+        abertas = [d for d in cubo.dimensoes if d not in filtros]
+        if abertas:
+            detalhe = st.selectbox(
+                "Detalhar por", abertas, format_func=ROTULOS_KPI.get, key="kpi_detalhe"
+            )
+            tabela_kpi = cubo.fatiar(detalhe, filtros, limite=MAX_CATEGORIAS)
+            st.dataframe(tabela_kpi.rename(columns=ROTULOS_KPI), hide_index=True)
+
+# 🛠️ Diagnóstico: tempo, volume e memória de cada etapa do pipeline.
+# Somente leitura: a coleta vale para o processo inteiro (todas as sessões) e
+# é ligada na inicialização por CHATFISCAL_INSTRUMENTACAO e
+# CHATFISCAL_INSTRUMENTACAO_MEMORIA, nunca por um visitante.
+if INSTRUMENTACAO.ativa:
+    with st.sidebar.expander("🛠️ Diagnóstico"):
+        if INSTRUMENTACAO.memoria:
+            st.caption("Medição de memória ligada (tracemalloc).")
+        agregados = INSTRUMENTACAO.agregados()
+        if agregados:
+            resumo_etapas = pd.DataFrame.from_dict(agregados, orient="index").drop(columns="medidas")
+            resumo_etapas["segundos_medio"] = resumo_etapas["segundos"] / resumo_etapas["chamadas"]
+            st.caption("Totais por etapa")
+            st.dataframe(resumo_etapas.sort_values("segundos", ascending=False))
+            st.caption("Etapas recentes")
+            st.dataframe(
+                pd.DataFrame([evento_para_dict(e) for e in reversed(INSTRUMENTACAO.eventos(50))]),
+                hide_index=True,
+            )
+            st.download_button(
+                "Baixar métricas (Prometheus)",
+                data=INSTRUMENTACAO.texto_prometheus(),
+                file_name="chatfiscal_metricas.prom",
+                mime="text/plain",
+            )
+        else:
+            st.caption("Nenhuma etapa medida ainda: carregue arquivos ou faça uma pergunta.")
 
 # 🧩 Rodapé institucional
 exibir_rodape()
@@ -0,0 +1,65 @@
+# benchmarks/bench_anomalias.py
+#
+# Mede o tempo da busca de duplicidades e valores atípicos em lotes crescentes,
+# para conferir o crescimento próximo de linear, e compara a busca de quase
+# duplicatas com a comparação de todos os pares (O(n²)) num lote pequeno.
+# Uso: python -m benchmarks.bench_anomalias [--linhas 10000 100000 1000000]
+
+import argparse
+import time
+
+import numpy as np
+
+from anomaly_detector import detectar_anomalias
+from benchmarks.dados_sinteticos import gerar_notas_com_chaves
+
+
+def pares_ingenuos(df):
+    """
+    Quase duplicatas comparando todas as notas entre si.
+    """
+    emitente = df["emitente"].to_numpy()
+    dia = df["data_emissao"].to_numpy()
+    valor = df["valor_total_nota"].to_numpy()
+    chave = df["chave_acesso"].to_numpy()
+    pares = 0
+    for i in range(len(df)):
+        iguais = (
+            (emitente[i + 1:] == emitente[i])
+            & (dia[i + 1:] == dia[i])
+            & (np.abs(valor[i + 1:] - valor[i]) <= 0.01)
+            & (chave[i + 1:] != chave[i])
+        )
+        pares += int(iguais.sum())
+    return pares
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detecção de duplicidades e anomalias")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--linhas-ingenuo", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for linhas in args.linhas:
+        df = gerar_notas_com_chaves(linhas)
+        inicio = time.perf_counter()
+        achados = detectar_anomalias(df)
+        duracao = time.perf_counter() - inicio
+        resumo = ", ".join(f"{a.tipo}={a.quantidade}" for a in achados)
+        print(f"linhas={len(df):>10,}  {duracao:7.2f}s  {len(df) / duracao:12,.0f} linhas/s  {resumo}")
+
+    df = gerar_notas_com_chaves(args.linhas_ingenuo)
+    inicio = time.perf_counter()
+    pares = pares_ingenuos(df)
+    t_ingenuo = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    achados = detectar_anomalias(df)
+    t_blocos = time.perf_counter() - inicio
+    print(
+        f"todos os pares ({len(df):,} linhas): {t_ingenuo:.2f}s, {pares} pares | "
+        f"blocos: {t_blocos:.2f}s | speedup {t_ingenuo / t_blocos:.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
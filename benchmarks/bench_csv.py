@@ -0,0 +1,61 @@
+# benchmarks/bench_csv.py
+#
+# Compara o caminho antigo de leitura de CSV (engine="python", sep=None) com
+# FileReader.carregar_csv (amostra + engine C/pyarrow) e com a leitura em blocos.
+# Uso: python -m benchmarks.bench_csv [--linhas 1200000]
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_notas
+from file_reader import FileReader
+
+
+def medir(nome, funcao):
+    inicio = time.perf_counter()
+    linhas = funcao()
+    print(f"{nome:<28} {time.perf_counter() - inicio:7.2f}s  linhas {linhas:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leitura de CSV fiscal")
+    parser.add_argument("--linhas", type=int, default=1_200_000)
+    args = parser.parse_args()
+
+    df = gerar_notas(args.linhas)
+    df["numero_nfse"] = range(1_000_000, 1_000_000 + len(df))
+    df["chave_acesso"] = df["numero_nfse"].map(lambda n: f"4113205120255897500016{n:024d}")
+    df["observacao"] = "MENSALIDADE EAD"
+    df["valor"] = df["valor"].map(lambda v: f"{v:.2f}".replace(".", ","))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "notas.csv")
+        df.to_csv(caminho, sep=";", index=False, encoding="latin1")
+        print(f"Arquivo: {len(df):,} linhas, {os.path.getsize(caminho) / 2**20:.1f} MB")
+
+        medir(
+            "antigo (python, sep=None)",
+            lambda: len(pd.read_csv(caminho, encoding="latin1", sep=None, engine="python")),
+        )
+        medir("carregar_csv (c)", lambda: len(FileReader.carregar_csv(caminho)))
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("pyarrow não instalado; engine pyarrow ignorada")
+        else:
+            medir(
+                "carregar_csv (pyarrow)",
+                lambda: len(FileReader.carregar_csv(caminho, motor="pyarrow")),
+            )
+        medir(
+            "carregar_csv_em_blocos",
+            lambda: sum(len(b) for b in FileReader.carregar_csv_em_blocos(caminho)),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_exportacao.py
+#
+# Compara a exportação em uma única chamada (pandas) com a exportação em blocos
+# do Exporter: tempo e, com --memoria, o pico de memória alocada durante a
+# gravação (tracemalloc, que deixa a execução bem mais lenta; por isso é medido
+# em uma segunda passada).
+# Uso: python -m benchmarks.bench_exportacao [--linhas 1000000] [--memoria]
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.dados_sinteticos import gerar_notas
+from exporter import Exporter
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def pico_memoria(funcao):
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportação única x em blocos")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--memoria", action="store_true")
+    args = parser.parse_args()
+
+    df = gerar_notas(args.linhas)
+    print(f"Linhas: {len(df):,}")
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "saida")
+        casos = [
+            ("json (to_json único)", lambda: df.to_json(caminho, orient="records", force_ascii=False)),
+            ("json (blocos)", lambda: Exporter.exportar_para_json(df, caminho)),
+            ("jsonl (blocos)", lambda: Exporter.exportar_para_jsonl(df, caminho)),
+            ("jsonl.gz (blocos)", lambda: Exporter.exportar_para_jsonl(df, caminho, "gzip")),
+            ("csv (to_csv único)", lambda: df.to_csv(caminho, index=False)),
+            ("csv (blocos)", lambda: Exporter.exportar_para_csv(df, caminho)),
+            ("csv.zst (blocos)", lambda: Exporter.exportar_para_csv(df, caminho, "zstd")),
+            ("parquet zstd (blocos)", lambda: Exporter.exportar_para_parquet(df, caminho)),
+            ("feather zstd (blocos)", lambda: Exporter.exportar_para_feather(df, caminho)),
+        ]
+        for nome, exportar in casos:
+            tempo = medir(exportar)
+            tamanho = os.path.getsize(caminho) / 2**20
+            linha = f"{nome:<24} {tempo:6.2f}s  arquivo {tamanho:7.1f} MB"
+            if args.memoria:
+                linha += f"  pico {pico_memoria(exportar):7.1f} MB"
+            print(linha)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_graficos.py
+#
+# Dados de gráficos: agregação + LTTB (chart_data) x linhas brutas.
+# Mede a primeira montagem, a consulta memoizada e o tamanho do que é enviado
+# ao gráfico; com --seaborn, também o tempo de desenhar o barplot (backend Agg)
+# a partir das linhas brutas (intervalos de confiança por bootstrap) e dos agregados.
+# Uso: python -m benchmarks.bench_graficos [--linhas 100000 1000000] [--seaborn]
+
+import argparse
+import time
+
+from benchmarks.dados_sinteticos import gerar_notas
+from chart_data import EspecGrafico, dados_grafico
+from data_profile import obter_perfil
+
+
+def medir(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def desenhar_barras(dados, x, y):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 6))
+    sns.barplot(data=dados, x=x, y=y)
+    plt.close("all")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregação e redução de dados de gráficos")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--seaborn", action="store_true")
+    args = parser.parse_args()
+
+    especs = {
+        "valor por emitente": EspecGrafico("emitente", "valor"),
+        "notas por cfop": EspecGrafico("cfop", None, "count"),
+        "valor por dia": EspecGrafico("data", "valor", "sum", "D"),
+        "valor por mês": EspecGrafico("data", "valor", "sum", "M"),
+        "série de valores": EspecGrafico("data_hora", "valor", "sum", None),
+    }
+    for linhas in args.linhas:
+        df = gerar_notas(linhas)
+        df["data_hora"] = (
+            df["data"].astype("datetime64[ns]") + (df.index.to_series() % 86_400).astype("timedelta64[s]")
+        )
+        obter_perfil(df)  # Como no lote carregado, que já tem perfil registrado
+        print(f"Linhas: {linhas:,}")
+        for nome, espec in especs.items():
+            dados, t_primeira = medir(dados_grafico, df, espec)
+            _, t_memo = medir(dados_grafico, df, espec)
+            print(
+                f"  {nome:<20} primeira {t_primeira:6.3f}s  memoizada {t_memo * 1000:6.2f} ms"
+                f"  pontos {len(dados):>5,} (de {linhas:,} linhas)"
+            )
+        if args.seaborn:
+            _, t_bruto = medir(desenhar_barras, df, "cfop", "valor")
+            agregados = dados_grafico(df, especs["valor por emitente"])
+            _, t_agregado = medir(desenhar_barras, agregados, "emitente", agregados.columns[1])
+            print(f"  barplot linhas brutas {t_bruto:6.2f}s | agregado {t_agregado:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
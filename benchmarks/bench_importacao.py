@@ -0,0 +1,87 @@
+# benchmarks/bench_importacao.py
+#
+# Mede o custo de importar os módulos do ChatFiscal em um processo novo
+# (`python -X importtime`): tempo total, pico de memória (RSS) e quais
+# bibliotecas pesadas foram carregadas. Termina com código 1 se alguma delas
+# for carregada na importação (devem ser importadas só no primeiro uso).
+# Uso: python -m benchmarks.bench_importacao [--modulos agent_manager ...] [--detalhar 10]
+
+import argparse
+import subprocess
+import sys
+
+# Bibliotecas que nenhum módulo deve carregar só por ser importado
+PESADAS = (
+    "PyPDF2",
+    "pytesseract",
+    "PIL",
+    "google.generativeai",
+    "docx",
+    "matplotlib",
+    "seaborn",
+    "plotly",
+)
+
+MODULOS = [
+    "agent_manager",
+    "llm_utils",
+    "file_reader",
+    "exporter",
+    "report_writer",
+    "visualization",
+    "main.dicas_corujito",
+]
+
+_SONDA = """
+import resource, sys
+import {modulo}
+pesadas = [m for m in {pesadas!r} if m in sys.modules]
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ",".join(pesadas))
+"""
+
+
+def medir_importacao(modulo):
+    """
+    Importa o módulo em um interpretador novo.
+    :return: Tupla (segundos, RSS máximo em MB, bibliotecas pesadas carregadas,
+        lista de (segundos próprios, nome) de cada import).
+    """
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SONDA.format(modulo=modulo, pesadas=PESADAS)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports, total = [], 0
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        imports.append((int(proprio) / 1e6, nome.strip()))
+        if not nome.startswith("  "):
+            total += int(acumulado)  # Imports de primeiro nível
+    rss, pesadas = (processo.stdout.strip().split(" ") + [""])[:2]
+    return total / 1e6, int(rss) / 1024, [p for p in pesadas.split(",") if p], imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo de importação dos módulos")
+    parser.add_argument("--modulos", nargs="+", default=MODULOS)
+    parser.add_argument("--detalhar", type=int, default=0, help="Imports mais caros por módulo")
+    args = parser.parse_args()
+
+    base, rss_base, _, _ = medir_importacao("sys")
+    print(f"{'interpretador':<22} {base:6.2f}s  RSS {rss_base:6.0f} MB")
+    falhou = False
+    for modulo in args.modulos:
+        tempo, rss, pesadas, imports = medir_importacao(modulo)
+        aviso = f"  carregou: {', '.join(pesadas)}" if pesadas else ""
+        print(f"{modulo:<22} {tempo:6.2f}s  RSS {rss:6.0f} MB{aviso}")
+        for proprio, nome in sorted(imports, reverse=True)[:args.detalhar]:
+            print(f"    {proprio * 1000:8.1f} ms  {nome.strip()}")
+        falhou |= bool(pesadas)
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
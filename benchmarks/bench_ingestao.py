@@ -0,0 +1,44 @@
+# benchmarks/bench_ingestao.py
+#
+# Mede a escalabilidade de AgentManager.carregar_arquivos com o número de
+# processos, sobre um diretório de XMLs sintéticos.
+# Uso: python -m benchmarks.bench_ingestao [--arquivos 300] [--notas 200] [--workers 1 2 4 8]
+
+import argparse
+import os
+import tempfile
+import time
+
+from agent_manager import AgentManager
+from benchmarks.dados_sinteticos import gerar_xml_nfse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão paralela de XMLs")
+    parser.add_argument("--arquivos", type=int, default=300)
+    parser.add_argument("--notas", type=int, default=200, help="Notas por arquivo")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = []
+        for i in range(args.arquivos):
+            caminho = os.path.join(pasta, f"lote_{i:04d}.xml")
+            gerar_xml_nfse(caminho, args.notas, semente=i)
+            caminhos.append(caminho)
+        print(f"{args.arquivos} arquivos x {args.notas} notas | CPUs: {os.cpu_count()}")
+
+        base = None
+        for workers in args.workers:
+            inicio = time.perf_counter()
+            resultado = AgentManager().carregar_arquivos(caminhos, max_workers=workers)
+            duracao = time.perf_counter() - inicio
+            base = base or duracao
+            print(
+                f"workers={workers:<3} {duracao:7.2f}s  speedup {base / duracao:4.1f}x"
+                f"  linhas {len(resultado.df):,}  erros {len(resultado.erros)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_instrumentacao.py
+#
+# Custo da instrumentação: uma etapa vazia desligada, ligada e ligada com
+# medição de memória (tracemalloc), e o carregamento + validação de um CSV
+# nas três situações.
+# Uso: python -m benchmarks.bench_instrumentacao [--linhas 100000] [--etapas 100000]
+
+import argparse
+import os
+import tempfile
+import time
+
+from agent_manager import AgentManager
+from benchmarks.dados_sinteticos import gerar_conjunto, gravar_csv
+from instrumentation import INSTRUMENTACAO, etapa
+
+
+def medir_etapas_vazias(quantidade):
+    inicio = time.perf_counter()
+    for _ in range(quantidade):
+        with etapa("vazia") as medida:
+            medida.registrar(linhas=1)
+    return (time.perf_counter() - inicio) / quantidade
+
+
+def medir_pipeline(caminho):
+    inicio = time.perf_counter()
+    manager = AgentManager()
+    manager.carregar_arquivos([caminho], max_workers=1)
+    manager.validar_arquivo()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo da instrumentação por etapa")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--etapas", type=int, default=100_000, help="Etapas vazias medidas")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "notas.csv")
+        gravar_csv(gerar_conjunto(args.linhas), caminho)
+        medir_pipeline(caminho)  # aquece importações e caches de módulo
+
+        situacoes = [("desligada", False, False), ("ligada", True, False), ("ligada + memória", True, True)]
+        print(f"{'instrumentação':<20}{'etapa vazia':>14}{'carregar + validar':>20}")
+        for nome, ativa, memoria in situacoes:
+            INSTRUMENTACAO.configurar(ativa=ativa, memoria=memoria)
+            INSTRUMENTACAO.limpar()
+            por_etapa = medir_etapas_vazias(args.etapas)
+            pipeline = medir_pipeline(caminho)
+            print(f"{nome:<20}{por_etapa * 1e6:>11.2f} µs{pipeline:>19.3f}s")
+        INSTRUMENTACAO.configurar(ativa=False, memoria=False)
+
+
+if __name__ == "__main__":
+    main()
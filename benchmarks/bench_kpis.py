@@ -0,0 +1,82 @@
+# benchmarks/bench_kpis.py
+#
+# KPIs do painel: agrupar as notas a cada rerun x consultar o cubo
+# materializado (kpi_rollup). Mede a materialização por arquivo, a soma dos
+# cubos ao acrescentar um arquivo ao lote e a latência das fatias do painel.
+# Uso: python -m benchmarks.bench_kpis [--arquivos 10] [--linhas 100000]
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_notas_com_chaves
+from kpi_rollup import CuboKPI
+
+UFS = ["SP", "RJ", "MG", "PR", "RS", "BA", "SC", "GO"]
+
+
+def medir(funcao, *args, repeticoes=1, **kwargs):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao(*args, **kwargs)
+    return resultado, (time.perf_counter() - inicio) / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cubo de KPIs x agrupamento das notas")
+    parser.add_argument("--arquivos", type=int, default=10)
+    parser.add_argument("--linhas", type=int, default=100_000, help="Linhas por arquivo")
+    args = parser.parse_args()
+
+    todas = gerar_notas_com_chaves(args.arquivos * args.linhas)
+    todas["uf"] = pd.Series(UFS).sample(len(todas), replace=True, random_state=1).to_numpy()
+    for tributo, aliquota in [("iss", 0.05), ("pis", 0.0065), ("cofins", 0.03), ("ir", 0.015), ("inss", 0.11)]:
+        todas[f"valor_{tributo}"] = (todas["valor_total_nota"] * aliquota).round(2)
+    arquivos = [todas.iloc[i * args.linhas:(i + 1) * args.linhas] for i in range(args.arquivos)]
+
+    cubos, t_materializar = [], 0.0
+    for arquivo in arquivos:
+        cubo, tempo = medir(CuboKPI.de_dataframe, arquivo)
+        cubos.append(cubo)
+        t_materializar += tempo
+    cubo, t_combinar = medir(CuboKPI.combinar, cubos)
+    anterior = CuboKPI.combinar(cubos[:-1])
+    _, t_acrescentar = medir(CuboKPI.combinar, [anterior, cubos[-1]])
+    print(
+        f"Notas: {len(todas):,} em {args.arquivos} arquivos; cubo com {len(cubo.tabela):,} linhas\n"
+        f"  materializar (todos os arquivos)   {t_materializar:8.3f}s\n"
+        f"  somar os cubos do lote             {t_combinar * 1000:8.2f} ms\n"
+        f"  acrescentar o último arquivo       {t_acrescentar * 1000:8.2f} ms"
+    )
+
+    emitente = todas["emitente"].iloc[0]
+    mes = todas["data_emissao"].iloc[0].strftime("%Y-%m")
+    consultas = {
+        "totais": ((), None),
+        "por emitente": ("emitente", None),
+        "por mês de um emitente": ("mes", {"emitente": emitente}),
+        "por cfop em um mês": ("cfop", {"mes": mes}),
+    }
+    notas_mes = todas["data_emissao"].dt.strftime("%Y-%m")
+    agrupamentos = {
+        "totais": lambda: todas[["valor_total_nota", "valor_iss"]].sum(),
+        "por emitente": lambda: todas.groupby("emitente")[["valor_total_nota", "valor_iss"]].sum(),
+        "por mês de um emitente": lambda: todas[todas["emitente"] == emitente]
+        .groupby(todas["data_emissao"].dt.to_period("M"))[["valor_total_nota", "valor_iss"]].sum(),
+        "por cfop em um mês": lambda: todas[notas_mes == mes]
+        .groupby("cfop")[["valor_total_nota", "valor_iss"]].sum(),
+    }
+    for nome, (por, filtros) in consultas.items():
+        _, t_notas = medir(agrupamentos[nome], repeticoes=3)
+        # Primeira consulta (sem memória) e repetida, como em um rerun do Streamlit
+        _, t_cubo = medir(CuboKPI(cubo.tabela).fatiar, por, filtros)
+        _, t_rerun = medir(cubo.fatiar, por, filtros, repeticoes=100)
+        print(
+            f"  {nome:<24} notas {t_notas * 1000:8.2f} ms  cubo {t_cubo * 1000:6.2f} ms"
+            f"  rerun {t_rerun * 1000:6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
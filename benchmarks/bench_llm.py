@@ -0,0 +1,66 @@
+# benchmarks/bench_llm.py
+#
+# Mede vazão e latência do ClienteLLM com o backend falso (sem rede), variando
+# o limite de chamadas simultâneas, e o tempo até o primeiro trecho no streaming.
+# Uso: python -m benchmarks.bench_llm [--perguntas 100] [--latencia 0.2] [--concorrencia 1 4 16]
+#      [--trechos 40] [--latencia-trecho 0.05]
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from llm_client import BackendFalso, ClienteLLM
+
+
+async def _medir(cliente, prompts):
+    async def cronometrar(prompt):
+        inicio = time.perf_counter()
+        await cliente.gerar(prompt)
+        return time.perf_counter() - inicio
+
+    return await asyncio.gather(*(cronometrar(p) for p in prompts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente LLM com backend falso")
+    parser.add_argument("--perguntas", type=int, default=100)
+    parser.add_argument("--latencia", type=float, default=0.2, help="Segundos por chamada")
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--trechos", type=int, default=40, help="Palavras da resposta em streaming")
+    parser.add_argument("--latencia-trecho", type=float, default=0.05)
+    args = parser.parse_args()
+
+    prompts = [f"Pergunta {i}" for i in range(args.perguntas)]
+    for limite in args.concorrencia:
+        cliente = ClienteLLM(BackendFalso(latencia=args.latencia), max_concorrentes=limite)
+        inicio = time.perf_counter()
+        latencias = sorted(asyncio.run(_medir(cliente, prompts)))
+        duracao = time.perf_counter() - inicio
+        cliente.fechar()
+        p95 = latencias[int(0.95 * (len(latencias) - 1))]
+        print(
+            f"concorrencia={limite:<3} {duracao:6.2f}s  {args.perguntas / duracao:7.1f} perguntas/s"
+            f"  latência p50 {statistics.median(latencias):5.2f}s  p95 {p95:5.2f}s"
+        )
+
+    resposta = " ".join(["palavra"] * args.trechos)
+    backend = BackendFalso(
+        latencia=args.latencia,
+        latencia_trecho=args.latencia_trecho,
+        responder=lambda prompt: resposta,
+    )
+    cliente = ClienteLLM(backend)
+    inicio = time.perf_counter()
+    trechos = cliente.gerar_stream_sync("Pergunta")
+    next(trechos)
+    primeiro = time.perf_counter() - inicio
+    for _ in trechos:
+        pass
+    total = time.perf_counter() - inicio
+    cliente.fechar()
+    print(f"streaming: primeiro trecho {primeiro:5.2f}s  resposta completa {total:5.2f}s")
+
+
+if __name__ == "__main__":
+    main()
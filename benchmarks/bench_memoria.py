@@ -0,0 +1,114 @@
+# benchmarks/bench_memoria.py
+#
+# Compara a disputa entre threads de leitura na memória compartilhada: o
+# dicionário com lock exclusivo (implementação anterior) contra o armazém com
+# leituras sem lock por snapshot. Uma thread escritora salva continuamente
+# enquanto as leitoras consultam o valor e a versão.
+# Uso: python -m benchmarks.bench_memoria [--threads 1 4 8] [--leituras 20000]
+
+import argparse
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import ArmazemDados
+
+
+class MemoriaComLock:
+    """
+    Implementação anterior: dicionário protegido por um único lock exclusivo.
+    """
+
+    def __init__(self):
+        self.dados = {}
+        self.lock = threading.Lock()
+
+    def salvar(self, chave, valor):
+        with self.lock:
+            self.dados[chave] = valor
+
+    def obter(self, chave):
+        with self.lock:
+            return self.dados.get(chave)
+
+
+def _medir(ler, escrever, threads, leituras):
+    parar = threading.Event()
+    latencias = []
+
+    def leitora():
+        minhas = []
+        for _ in range(leituras):
+            inicio = time.perf_counter()
+            ler()
+            minhas.append(time.perf_counter() - inicio)
+        latencias.extend(minhas)
+
+    def escritora():
+        while not parar.is_set():
+            escrever()
+
+    escritor = threading.Thread(target=escritora)
+    leitoras = [threading.Thread(target=leitora) for _ in range(threads)]
+    escritor.start()
+    inicio = time.perf_counter()
+    for t in leitoras:
+        t.start()
+    for t in leitoras:
+        t.join()
+    duracao = time.perf_counter() - inicio
+    parar.set()
+    escritor.join()
+    latencias.sort()
+    return threads * leituras / duracao, latencias[int(0.99 * (len(latencias) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Disputa de leitura na memória compartilhada")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--leituras", type=int, default=20_000, help="Leituras por thread")
+    args = parser.parse_args()
+
+    quadros = [
+        pd.DataFrame({"valor": np.random.default_rng(s).random(10_000)}) for s in range(2)
+    ]
+    for threads in args.threads:
+        antiga = MemoriaComLock()
+        antiga.salvar("dados", quadros[0])
+        estado = {"i": 0}
+
+        def escrever_antiga():
+            estado["i"] += 1
+            antiga.salvar("dados", quadros[estado["i"] % 2])
+            time.sleep(0)
+
+        armazem = ArmazemDados()
+        armazem.salvar("s", "dados", quadros[0])
+
+        def escrever_nova():
+            estado["i"] += 1
+            armazem.salvar("s", "dados", quadros[estado["i"] % 2])
+            time.sleep(0)
+
+        resultados = {
+            "lock exclusivo": _medir(
+                lambda: antiga.obter("dados"), escrever_antiga, threads, args.leituras
+            ),
+            "snapshot (versão)": _medir(
+                lambda: armazem.versao("s", "dados"), escrever_nova, threads, args.leituras
+            ),
+            "snapshot (visão)": _medir(
+                lambda: armazem.obter("s", "dados"), escrever_nova, threads, args.leituras
+            ),
+        }
+        for nome, (vazao, p99) in resultados.items():
+            print(
+                f"threads={threads:<3} {nome:<18} {vazao:12,.0f} leituras/s"
+                f"  p99 {p99 * 1e6:8.1f} µs"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_particoes.py
+#
+# Custo de acrescentar um arquivo a um lote que cresce: reprocessar o
+# consolidado inteiro (perfil, validação e achados) contra registrar só a
+# partição nova e combinar as contribuições já calculadas.
+# Uso: python -m benchmarks.bench_particoes [--arquivos 10] [--linhas 100000]
+
+import argparse
+import time
+
+import pandas as pd
+
+from anomaly_detector import detectar_anomalias
+from benchmarks.dados_sinteticos import gerar_notas_com_chaves
+from data_profile import PerfilDados
+from data_validator import DataValidator
+from partition_index import IndiceParticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lote incremental x reprocessamento completo")
+    parser.add_argument("--arquivos", type=int, default=10)
+    parser.add_argument("--linhas", type=int, default=100_000, help="Linhas por arquivo")
+    args = parser.parse_args()
+
+    todas = gerar_notas_com_chaves(args.arquivos * args.linhas).rename(
+        columns={"valor_total_nota": "valor", "data_emissao": "data"}
+    )
+    todas["data"] = todas["data"].dt.strftime("%Y-%m-%d")
+    arquivos = [
+        (f"arquivo-{i}", todas.iloc[i * args.linhas:(i + 1) * args.linhas])
+        for i in range(args.arquivos)
+    ]
+
+    indice = IndiceParticoes()
+    for i in range(1, args.arquivos + 1):
+        lote = arquivos[:i]
+        df = pd.concat([parte for _, parte in lote], ignore_index=True)
+
+        inicio = time.perf_counter()
+        PerfilDados.de_dataframe(df)
+        DataValidator.validar_dados_vetorizado(df)
+        detectar_anomalias(df, [j * args.linhas for j in range(i)])
+        completo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        indice.sincronizar(lote)
+        indice.perfil(df)
+        indice.validacao(df)
+        indice.achados()
+        incremental = time.perf_counter() - inicio
+
+        print(
+            f"arquivos={i:<3} linhas={len(df):>10,}  completo {completo:6.2f}s"
+            f"  incremental {incremental:6.2f}s  ({completo / incremental:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
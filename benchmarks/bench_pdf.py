@@ -0,0 +1,88 @@
+# benchmarks/bench_pdf.py
+#
+# Extração de texto de um lote sintético de DANFEs em PDF: leitura sequencial
+# antiga (texto += page.extract_text()), pipeline no processo atual, pipeline
+# com pool de processos e pipeline com o cache de páginas já preenchido.
+# Sem o Tesseract instalado, o OCR das páginas digitalizadas é simulado por
+# --ocr-ms milissegundos de CPU por página.
+# Uso: python -m benchmarks.bench_pdf [--notas 100] [--paginas-por-nota 3]
+#      [--taxa-digitalizadas 0.3] [--ocr-ms 200] [--processos N]
+
+import argparse
+import io
+import os
+import shutil
+import time
+
+from PyPDF2 import PdfReader
+
+from benchmarks.dados_sinteticos import gerar_pdf_danfe
+from pdf_pipeline import CachePaginas, extrair_paginas, notas_de_paginas, ocr_tesseract
+
+OCR_MS = 200
+
+
+def ocr_simulado(imagem):
+    """
+    Ocupa a CPU por OCR_MS milissegundos, como uma chamada ao Tesseract.
+    """
+    fim = time.process_time() + OCR_MS / 1000
+    while time.process_time() < fim:
+        pass
+    return ""
+
+
+def leitura_sequencial(conteudo):
+    texto = ""
+    for page in PdfReader(io.BytesIO(conteudo)).pages:
+        texto += page.extract_text()
+    return texto
+
+
+def medir(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    global OCR_MS
+    parser = argparse.ArgumentParser(description="Pipeline de extração de PDF")
+    parser.add_argument("--notas", type=int, default=100)
+    parser.add_argument("--paginas-por-nota", type=int, default=3)
+    parser.add_argument("--taxa-digitalizadas", type=float, default=0.3)
+    parser.add_argument("--ocr-ms", type=int, default=OCR_MS)
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    OCR_MS = args.ocr_ms
+
+    buffer = io.BytesIO()
+    gerar_pdf_danfe(buffer, args.notas, args.paginas_por_nota, args.taxa_digitalizadas)
+    conteudo = buffer.getvalue()
+    ocr = ocr_tesseract if shutil.which("tesseract") else ocr_simulado
+    print(
+        f"Páginas: {args.notas * args.paginas_por_nota:,} | processos: {args.processos} | "
+        f"OCR: {'tesseract' if ocr is ocr_tesseract else f'simulado ({OCR_MS} ms)'}"
+    )
+
+    _, t_antigo = medir(leitura_sequencial, conteudo)
+    print(f"sequencial sem OCR (antigo): {t_antigo:7.2f}s")
+
+    def pipeline(max_workers, cache):
+        paginas = sorted(extrair_paginas(conteudo, max_workers=max_workers, ocr=ocr, cache=cache))
+        return paginas, notas_de_paginas([p.texto for p in paginas])
+
+    (paginas, notas), t_um = medir(pipeline, 1, None)
+    ocr_paginas = sum(p.origem != "texto" for p in paginas)
+    print(f"pipeline, 1 processo:        {t_um:7.2f}s  OCR em {ocr_paginas} páginas, {len(notas)} notas")
+
+    cache = CachePaginas()
+    _, t_pool = medir(pipeline, args.processos, cache)
+    print(f"pipeline, {args.processos} processo(s):      {t_pool:7.2f}s  speedup {t_um / t_pool:.1f}x")
+
+    _, t_cache = medir(pipeline, args.processos, cache)
+    print(f"pipeline, cache preenchido:  {t_cache:7.2f}s  {cache.estatisticas()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/bench_validacao.py
+#
+# Compara a validação linha a linha (pydantic) com a validação vetorizada.
+# Uso: python -m benchmarks.bench_validacao [--linhas 1000000] [--taxa-erro 0.01]
+
+import argparse
+import time
+
+from benchmarks.dados_sinteticos import gerar_notas
+from data_validator import DataValidator
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validação linha a linha x vetorizada"
+    )
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--taxa-erro", type=float, default=0.01)
+    args = parser.parse_args()
+
+    df = gerar_notas(args.linhas, args.taxa_erro)
+    print(f"Linhas: {len(df):,} | taxa de erro: {args.taxa_erro:.2%}")
+
+    resultado, t_vetorizado = medir(DataValidator.validar_dados_vetorizado, df)
+    mensagens_vetorizado, t_mensagens = medir(resultado.mensagens)
+    print(f"vetorizado (máscaras): {t_vetorizado:8.2f}s  erros: {len(resultado):,}")
+    print(f"vetorizado (relatório): {t_mensagens:7.2f}s  linhas: {len(mensagens_vetorizado):,}")
+
+    mensagens_linha, t_linha = medir(DataValidator.validar_dados, df)
+    print(f"linha a linha:         {t_linha:8.2f}s  linhas: {len(mensagens_linha):,}")
+
+    print(f"speedup: {t_linha / (t_vetorizado + t_mensagens):.1f}x")
+    print("relatórios idênticos:", mensagens_linha == mensagens_vetorizado)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_word.py
+#
+# Compara a exportação Word célula a célula (python-docx) com o gerador em bloco.
+# Uso: python -m benchmarks.bench_word [--linhas 10000 100000] [--legado-ate 10000]
+#
+# A versão célula a célula leva minutos acima de ~20 mil linhas; por isso só é
+# medida até --legado-ate.
+
+import argparse
+import tempfile
+import time
+import os
+
+from docx import Document
+
+from benchmarks.dados_sinteticos import gerar_notas
+from report_writer import escrever_relatorio_word
+
+
+def exportar_celula_a_celula(df, caminho):
+    """
+    Implementação anterior de Exporter.exportar_para_word.
+    """
+    doc = Document()
+    doc.add_heading("Relatório de Dados", level=1)
+    tabela = doc.add_table(rows=1, cols=len(df.columns))
+    tabela.style = "Table Grid"
+    for i, coluna in enumerate(df.columns):
+        tabela.cell(0, i).text = coluna
+    for _, linha in df.iterrows():
+        row_cells = tabela.add_row().cells
+        for i, valor in enumerate(linha):
+            row_cells[i].text = str(valor)
+    doc.save(caminho)
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportação Word: célula a célula x em bloco")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--legado-ate", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "relatorio.docx")
+        for linhas in args.linhas:
+            df = gerar_notas(linhas)
+            t_bloco = medir(escrever_relatorio_word, caminho, df, "Relatório de Dados", None)
+            tamanho = os.path.getsize(caminho) / 2**20
+            print(f"{linhas:>9,} linhas | em bloco (completo): {t_bloco:7.2f}s  {tamanho:6.1f} MB")
+            t_limite = medir(escrever_relatorio_word, caminho, df)
+            print(f"{'':>16}| em bloco (limitado): {t_limite:7.2f}s")
+            if linhas <= args.legado_ate:
+                t_legado = medir(exportar_celula_a_celula, df, caminho)
+                print(f"{'':>16}| célula a célula:     {t_legado:7.2f}s"
+                      f"  speedup: {t_legado / t_bloco:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_xml_streaming.py
+#
+# Compara tempo e pico de memória de FileReader.carregar_xml (árvore completa)
+# com FileReader.carregar_xml_em_blocos (iterparse).
+# Uso: python -m benchmarks.bench_xml_streaming [--notas 200000] [--bloco 50000]
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.dados_sinteticos import gerar_xml_nfse
+from file_reader import FileReader
+
+
+def medir(funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    linhas = funcao()
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return linhas, duracao, pico / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XML completo x incremental")
+    parser.add_argument("--notas", type=int, default=200_000)
+    parser.add_argument("--bloco", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "lote.xml")
+        gerar_xml_nfse(caminho, args.notas)
+        tamanho = os.path.getsize(caminho) / 2**20
+        print(f"Arquivo: {args.notas:,} notas, {tamanho:.1f} MB")
+
+        linhas, duracao, pico = medir(lambda: len(FileReader.carregar_xml(caminho)))
+        print(f"carregar_xml:           {duracao:6.2f}s  pico {pico:8.1f} MB  linhas {linhas:,}")
+
+        linhas, duracao, pico = medir(
+            lambda: sum(
+                len(bloco)
+                for bloco in FileReader.carregar_xml_em_blocos(caminho, args.bloco)
+            )
+        )
+        print(f"carregar_xml_em_blocos: {duracao:6.2f}s  pico {pico:8.1f} MB  linhas {linhas:,}")
+
+
+if __name__ == "__main__":
+    main()
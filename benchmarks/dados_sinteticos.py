@@ -0,0 +1,472 @@
+# benchmarks/dados_sinteticos.py
+#
+# Geradores determinísticos de dados fiscais sintéticos para os benchmarks.
+# Uso: python -m benchmarks.dados_sinteticos saida.csv [--formato csv|nfse|nfe]
+#      [--linhas 100000] [--colunas-extras 0] [--taxa-duplicadas 0.01] [--taxa-erro 0.01]
+
+import numpy as np
+import pandas as pd
+
+
+def gerar_notas(linhas: int, taxa_erro: float = 0.01, semente: int = 42) -> pd.DataFrame:
+    """
+    Gera um DataFrame sintético com as colunas validadas pelo DataValidator.
+    :param linhas: Quantidade de notas fiscais.
+    :param taxa_erro: Fração aproximada de linhas com algum campo inválido.
+    :param semente: Semente do gerador aleatório, para resultados reproduzíveis.
+    :return: DataFrame com as colunas valor, cfop, emitente e data.
+    """
+    rng = np.random.default_rng(semente)
+    cfops = np.array(["5102", "5405", "6101", "6102", "1102", "2102"], dtype=object)
+    emitentes = np.array([f"Empresa {i:04d}" for i in range(500)], dtype=object)
+    datas = pd.date_range("2025-01-01", periods=365, freq="D").strftime("%Y-%m-%d")
+
+    df = pd.DataFrame(
+        {
+            "valor": rng.gamma(2.0, 500.0, linhas).round(2),
+            "cfop": cfops[rng.integers(0, len(cfops), linhas)],
+            "emitente": emitentes[rng.integers(0, len(emitentes), linhas)],
+            "data": np.asarray(datas, dtype=object)[rng.integers(0, len(datas), linhas)],
+        }
+    )
+
+    # Injeta erros distribuídos entre os campos
+    com_erro = np.flatnonzero(rng.random(linhas) < taxa_erro)
+    tipo_erro = rng.integers(0, 4, len(com_erro))
+    df.loc[com_erro[tipo_erro == 0], "valor"] = -1.0
+    df.loc[com_erro[tipo_erro == 1], "cfop"] = "51A2"
+    df.loc[com_erro[tipo_erro == 2], "emitente"] = None
+    df.loc[com_erro[tipo_erro == 3], "data"] = None
+    return df
+
+
+def gerar_xml_nfse(caminho: str, notas: int, semente: int = 42):
+    """
+    Grava um lote sintético de NFS-e no formato de `data/exemplo.xml`
+    (atalho para `gerar_conjunto` + `gravar_xml_nfse`).
+    :param caminho: Arquivo de saída.
+    :param notas: Quantidade de notas.
+    :param semente: Semente do gerador aleatório.
+    """
+    gravar_xml_nfse(gerar_conjunto(notas, semente=semente), caminho)
+
+
+def gerar_notas_com_chaves(
+    linhas: int, taxa_duplicadas: float = 0.001, semente: int = 42
+) -> pd.DataFrame:
+    """
+    Gera notas com chave de acesso, número e série, incluindo cópias exatas
+    (mesma chave) e reemissões (mesmo emitente, data e valor com outra chave).
+    :param linhas: Quantidade de notas fiscais.
+    :param taxa_duplicadas: Fração de notas copiadas e de notas reemitidas.
+    :param semente: Semente do gerador aleatório.
+    :return: DataFrame com chave_acesso, numero, serie, emitente, data_emissao,
+        cfop e valor_total_nota.
+    """
+    rng = np.random.default_rng(semente)
+    cfops = np.array(["5102", "5405", "6101", "6102", "1102", "2102"])
+    emitentes = np.array([f"Empresa {i:04d}" for i in range(500)])
+    numeros = np.arange(linhas)
+    df = pd.DataFrame(
+        {
+            "chave_acesso": pd.Series(numeros + 41_000_000_000, dtype="int64").astype(str),
+            "numero": (numeros + 1).astype(str),
+            "serie": "1",
+            "emitente": emitentes[rng.integers(0, len(emitentes), linhas)],
+            "data_emissao": pd.Timestamp("2025-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, linhas), unit="D"),
+            "cfop": cfops[rng.integers(0, len(cfops), linhas)],
+            "valor_total_nota": rng.gamma(2.0, 500.0, linhas).round(2),
+        }
+    )
+
+    quantidade = int(linhas * taxa_duplicadas)
+    copias = df.sample(quantidade, random_state=semente)
+    reemitidas = df.sample(quantidade, random_state=semente + 1).assign(
+        chave_acesso=lambda d: "R" + d["chave_acesso"],
+        numero=lambda d: "R" + d["numero"],
+    )
+    return pd.concat([df, copias, reemitidas], ignore_index=True)
+
+
+def _pagina_pdf(escritor, fonte, texto=None, imagem=None):
+    """
+    Monta uma página A4 com linhas de texto (Helvetica) ou uma imagem em tons de
+    cinza ocupando a página inteira (página digitalizada, sem camada de texto).
+    """
+    from PyPDF2 import PageObject
+    from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+    pagina = PageObject.create_blank_page(None, 595, 842)
+    recursos = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): fonte})})
+    if imagem is not None:
+        altura, largura = imagem.shape
+        xobjeto = DecodedStreamObject()
+        xobjeto.set_data(imagem.tobytes())
+        xobjeto.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(largura),
+                NameObject("/Height"): NumberObject(altura),
+                NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            }
+        )
+        recursos[NameObject("/XObject")] = DictionaryObject(
+            {NameObject("/Im0"): escritor._add_object(xobjeto)}
+        )
+        desenho = b"q 595 0 0 842 0 0 cm /Im0 Do Q"
+    else:
+        linhas = [
+            "(" + linha.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj"
+            for linha in texto.split("\n")
+        ]
+        desenho = ("BT /F1 9 Tf 11 TL 40 800 Td " + " T* ".join(linhas) + " ET").encode("latin-1")
+    conteudo = DecodedStreamObject()
+    conteudo.set_data(desenho)
+    pagina[NameObject("/Resources")] = recursos
+    pagina[NameObject("/Contents")] = escritor._add_object(conteudo)
+    escritor.add_page(pagina)
+
+
+def texto_danfe(indice: int, rng) -> str:
+    """
+    Texto de um DANFE sintético, com os rótulos lidos por pdf_pipeline.campos_danfe.
+    """
+    chave = f"{41250912345678000190550010000000000000000000 + indice:044d}"
+    grupos = " ".join(chave[i:i + 4] for i in range(0, 44, 4))
+    valor = f"{rng.gamma(2.0, 500.0):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    numero = f"{indice + 1:09d}"
+    return (
+        "DANFE - DOCUMENTO AUXILIAR DA NOTA FISCAL ELETRONICA\n"
+        f"No. {numero[:3]}.{numero[3:6]}.{numero[6:]} SERIE 1\n"
+        f"CHAVE DE ACESSO {grupos}\n"
+        f"RAZAO SOCIAL: Empresa {indice % 500:04d} LTDA\n"
+        f"CNPJ 12.345.678/{indice % 9999 + 1:04d}-90\n"
+        f"DATA DA EMISSAO {indice % 28 + 1:02d}/09/2025\n"
+        "DESTINATARIO CNPJ 98.765.432/0001-10\n"
+        f"CFOP {rng.choice(['5102', '6102', '5405'])}\n"
+        f"VALOR TOTAL DA NOTA R$ {valor}"
+    )
+
+
+def gerar_pdf_danfe(destino, notas: int, paginas_por_nota: int = 1,
+                    taxa_digitalizadas: float = 0.0, semente: int = 42):
+    """
+    Grava um lote sintético de DANFEs em PDF. A primeira página de cada nota tem
+    os campos principais; as seguintes repetem só a lista de itens. Uma fração
+    das páginas é "digitalizada": só uma imagem, sem camada de texto.
+    :param destino: Caminho ou arquivo binário gravável.
+    :param notas: Quantidade de notas.
+    :param paginas_por_nota: Folhas por DANFE.
+    :param taxa_digitalizadas: Fração aproximada de páginas sem camada de texto.
+    :param semente: Semente do gerador aleatório.
+    """
+    from PyPDF2 import PdfWriter
+    from PyPDF2.generic import DictionaryObject, NameObject
+
+    rng = np.random.default_rng(semente)
+    escritor = PdfWriter()
+    fonte = escritor._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for indice in range(notas):
+        texto = texto_danfe(indice, rng)
+        for folha in range(paginas_por_nota):
+            if rng.random() < taxa_digitalizadas:
+                imagem = rng.integers(0, 256, (64, 48), dtype=np.uint8)
+                _pagina_pdf(escritor, fonte, imagem=imagem)
+            elif folha == 0:
+                _pagina_pdf(escritor, fonte, texto=texto)
+            else:
+                itens = "\n".join(
+                    f"ITEM {folha * 20 + i:03d} PRODUTO {rng.integers(1, 9999):04d}" for i in range(20)
+                )
+                _pagina_pdf(escritor, fonte, texto=f"FOLHA {folha + 1}/{paginas_por_nota}\n{itens}")
+    escritor.write(destino)
+
+
+# Conjunto fiscal configurável (CSV, NFS-e e NF-e) usado pela suíte de benchmarks
+
+UFS = np.array(["SP", "RJ", "MG", "PR", "RS", "SC", "BA", "PE", "GO", "DF"])
+CODIGOS_UF = {"SP": 35, "RJ": 33, "MG": 31, "PR": 41, "RS": 43, "SC": 42, "BA": 29, "PE": 26, "GO": 52, "DF": 53}
+ALIQUOTAS = {"icms": 0.18, "pis": 0.0165, "cofins": 0.076, "ir": 0.015, "inss": 0.11}
+SERVICOS = np.array(["MENSALIDADE EAD", "CONSULTORIA", "MANUTENCAO", "LICENCA DE SOFTWARE", "TREINAMENTO"])
+PRODUTOS = np.array(["Produto A", "Produto B", "Produto C", "Produto D", "Produto E"])
+
+
+def _digito_chave(chaves: np.ndarray) -> np.ndarray:
+    """
+    Dígito verificador (módulo 11) de chaves de acesso com 43 dígitos.
+    """
+    digitos = np.frombuffer("".join(chaves).encode("ascii"), dtype=np.uint8).reshape(len(chaves), 43) - 48
+    pesos = np.tile(np.arange(2, 10), 6)[:43][::-1]
+    resto = (digitos.astype(np.int64) * pesos).sum(axis=1) % 11
+    return np.where(resto < 2, 0, 11 - resto)
+
+
+def _chaves_acesso(uf, datas, cnpj, servico, numeros, rng) -> np.ndarray:
+    """
+    Chaves de acesso: UF, ano/mês, CNPJ, modelo, série, número, tipo de emissão,
+    código numérico e dígito verificador.
+    """
+    ano_mes = pd.Series((datas.year % 100) * 100 + datas.month).astype(str).str.zfill(4)
+    prefixo = (
+        pd.Series(uf).map(CODIGOS_UF).astype(str)
+        + ano_mes.to_numpy()
+        + np.asarray(cnpj)
+        + np.where(servico, "99", "55")
+        + "001"
+        + pd.Series(numeros).astype(str).str.zfill(9)
+        + "1"
+        + pd.Series(rng.integers(0, 10**8, len(numeros))).astype(str).str.zfill(8)
+    ).to_numpy()
+    return prefixo + _digito_chave(prefixo).astype(str)
+
+
+def gerar_conjunto(
+    linhas: int,
+    colunas_extras: int = 0,
+    taxa_duplicadas: float = 0.0,
+    taxa_erro: float = 0.0,
+    semente: int = 42,
+) -> pd.DataFrame:
+    """
+    Gera um conjunto fiscal realista e reproduzível (mesma semente, mesmos dados).
+
+    Cada linha é uma nota de produto (ICMS, PIS, COFINS) ou de serviço (ISS,
+    IR, INSS), com chave de acesso de 44 dígitos e dígito verificador válido,
+    emitente com CNPJ e UF fixos e CFOP coerente com as UFs de origem e destino.
+    As colunas valor, cfop, emitente e data seguem o modelo do DataValidator.
+    :param linhas: Quantidade total de linhas (incluindo as duplicadas).
+    :param colunas_extras: Colunas adicionais (texto e número alternados), para
+        medir o efeito da largura do arquivo.
+    :param taxa_duplicadas: Fração de linhas que são cópias exatas (mesma chave)
+        ou reemissões (mesmo emitente, data e valor com outra chave), meio a meio.
+    :param taxa_erro: Fração aproximada de linhas com um campo inválido.
+    :param semente: Semente do gerador aleatório.
+    :return: DataFrame.
+    """
+    rng = np.random.default_rng(semente)
+    duplicadas = int(linhas * taxa_duplicadas)
+    n = linhas - duplicadas
+
+    emitentes = rng.integers(0, 500, n)
+    uf_emitente = UFS[emitentes % len(UFS)]
+    uf_destino = np.where(rng.random(n) < 0.7, uf_emitente, UFS[rng.integers(0, len(UFS), n)])
+    servico = rng.random(n) < 0.3
+    interna = uf_emitente == uf_destino
+    cfop = np.where(
+        servico,
+        np.where(interna, "5933", "6933"),
+        np.where(interna, rng.choice(["5102", "5405"], n), rng.choice(["6102", "6108"], n)),
+    )
+    datas = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365 * 86_400, n), unit="s")
+    valor = rng.gamma(2.0, 500.0, n).round(2)
+    cnpjs = pd.Series(12_000_000_000_000 + np.arange(500) * 10_007).astype(str).str.zfill(14).to_numpy()
+    nomes = np.array([f"Empresa {i:04d} Ltda" for i in range(500)], dtype=object)
+    numeros = np.arange(1, n + 1)
+
+    def tributo(nome, aplica):
+        return np.where(aplica, (valor * ALIQUOTAS[nome]).round(2), 0.0)
+
+    df = pd.DataFrame(
+        {
+            "chave_acesso": _chaves_acesso(uf_emitente, datas, cnpjs[emitentes], servico, numeros, rng),
+            "numero": numeros.astype(str),
+            "serie": "1",
+            "data": datas,
+            "emitente": nomes[emitentes],
+            "emitente_cnpj": cnpjs[emitentes],
+            "uf_emitente": uf_emitente,
+            "uf_destinatario": uf_destino,
+            "cfop": cfop,
+            "descricao": np.where(servico, SERVICOS[emitentes % len(SERVICOS)], PRODUTOS[numeros % len(PRODUTOS)]),
+            "valor": valor,
+            "valor_icms": tributo("icms", ~servico),
+            "valor_pis": tributo("pis", np.ones(n, dtype=bool)),
+            "valor_cofins": tributo("cofins", np.ones(n, dtype=bool)),
+            "valor_iss": np.where(servico, (valor * rng.choice([0.02, 0.03, 0.05], n)).round(2), 0.0),
+            "valor_ir": tributo("ir", servico & (valor > 666)),
+            "valor_inss": tributo("inss", servico & (rng.random(n) < 0.2)),
+        }
+    )
+    for i in range(colunas_extras):
+        if i % 2:
+            df[f"campo_extra_{i:02d}"] = rng.normal(100.0, 30.0, n).round(2)
+        else:
+            observacoes = np.array([f"OBS {j:04d}" for j in range(10_000)], dtype=object)
+            df[f"campo_extra_{i:02d}"] = observacoes[rng.integers(0, 10_000, n)]
+
+    if duplicadas:
+        copias = df.iloc[rng.integers(0, n, duplicadas - duplicadas // 2)]
+        # Reemissão: nova numeração e nova chave para a mesma operação
+        reemitidas = df.iloc[rng.integers(0, n, duplicadas // 2)].reset_index(drop=True)
+        novos = np.arange(n + 1, n + 1 + len(reemitidas))
+        reemitidas["numero"] = novos.astype(str)
+        reemitidas["chave_acesso"] = _chaves_acesso(
+            reemitidas["uf_emitente"].to_numpy(),
+            pd.DatetimeIndex(reemitidas["data"]),
+            reemitidas["emitente_cnpj"].to_numpy(),
+            reemitidas["cfop"].str.endswith("933").to_numpy(),
+            novos,
+            rng,
+        )
+        df = pd.concat([df, copias, reemitidas], ignore_index=True)
+        df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+    com_erro = np.flatnonzero(rng.random(len(df)) < taxa_erro)
+    tipo_erro = rng.integers(0, 4, len(com_erro))
+    df.loc[com_erro[tipo_erro == 0], "valor"] = -1.0
+    df.loc[com_erro[tipo_erro == 1], "cfop"] = "51A2"
+    df.loc[com_erro[tipo_erro == 2], "emitente"] = None
+    df.loc[com_erro[tipo_erro == 3], "data"] = pd.NaT
+    return df
+
+
+def gravar_csv(df: pd.DataFrame, destino):
+    """
+    Grava o conjunto em CSV, como os arquivos enviados na aba de upload.
+    """
+    df.to_csv(destino, index=False, date_format="%Y-%m-%d")
+
+
+def _texto(serie: pd.Series) -> np.ndarray:
+    texto = serie.astype(object).map(str).where(serie.notna().to_numpy(), "")
+    return texto.str.replace("&", "&amp;", regex=False).str.replace("<", "&lt;", regex=False).to_numpy()
+
+
+def _decimal_br(serie: pd.Series) -> np.ndarray:
+    return serie.map("{:.2f}".format).str.replace(".", ",", regex=False).to_numpy()
+
+
+def _extras(df: pd.DataFrame):
+    return [(coluna, _texto(df[coluna])) for coluna in df.columns if coluna.startswith("campo_extra_")]
+
+
+def gravar_xml_nfse(df: pd.DataFrame, destino, bloco: int = 10_000):
+    """
+    Grava o conjunto como lote de NFS-e no layout municipal de `data/exemplo.xml`
+    (um <nfse> por linha, com nf, prestador, tomador e itens).
+    :param destino: Caminho do arquivo de saída.
+    """
+    datas = df["data"].dt.strftime("%d/%m/%Y").fillna("").to_numpy()
+    colunas = {
+        "numero": _texto(df["numero"]),
+        "chave": _texto(df["chave_acesso"]),
+        "valor": _decimal_br(df["valor"]),
+        "ir": _decimal_br(df["valor_ir"]),
+        "inss": _decimal_br(df["valor_inss"]),
+        "pis": _decimal_br(df["valor_pis"]),
+        "cofins": _decimal_br(df["valor_cofins"]),
+        "iss": _decimal_br(df["valor_iss"]),
+        "descricao": _texto(df["descricao"]),
+        "cnpj": _texto(df["emitente_cnpj"]),
+        "uf": _texto(df["uf_destinatario"]),
+    }
+    extras = _extras(df)
+    with open(destino, "w", encoding="ISO-8859-1") as saida:
+        saida.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n<lote>\n')
+        for inicio in range(0, len(df), bloco):
+            partes = []
+            for i in range(inicio, min(inicio + bloco, len(df))):
+                c = {nome: valores[i] for nome, valores in colunas.items()}
+                campos = "".join(f"<{nome}>{valores[i]}</{nome}>" for nome, valores in extras)
+                partes.append(
+                    "<nfse><nf>"
+                    f"<numero_nfse>{c['numero']}</numero_nfse><serie_nfse>1</serie_nfse>"
+                    f"<data_nfse>{datas[i]}</data_nfse><data_fato>{datas[i]}</data_fato>"
+                    "<situacao_descricao_nfse>Emitida</situacao_descricao_nfse>"
+                    f"<chave_acesso_nfse_nacional>{c['chave']}</chave_acesso_nfse_nacional>"
+                    f"<valor_total>{c['valor']}</valor_total><valor_desconto>0,00</valor_desconto>"
+                    f"<valor_ir>{c['ir']}</valor_ir><valor_inss>{c['inss']}</valor_inss>"
+                    "<valor_contribuicao_social>0,00</valor_contribuicao_social>"
+                    f"<valor_pis>{c['pis']}</valor_pis><valor_cofins>{c['cofins']}</valor_cofins>"
+                    f"<observacao>{c['descricao']}</observacao>{campos}</nf>"
+                    f"<prestador><cpfcnpj>{c['cnpj']}</cpfcnpj><cidade>7657</cidade></prestador>"
+                    f"<tomador><cpfcnpj>10125644795</cpfcnpj><estado>{c['uf']}</estado></tomador>"
+                    f"<itens><lista><codigo_item_lista_servico>801</codigo_item_lista_servico>"
+                    f"<descritivo>{c['descricao']}</descritivo>"
+                    f"<valor_tributavel>{c['valor']}</valor_tributavel>"
+                    f"<valor_issrf>{c['iss']}</valor_issrf></lista></itens>"
+                    "</nfse>\n"
+                )
+            saida.write("".join(partes))
+        saida.write("</lote>\n")
+
+
+def gravar_xml_nfe(df: pd.DataFrame, destino, bloco: int = 10_000):
+    """
+    Grava o conjunto como lote de NF-e (um <nfeProc> por linha, com um item).
+    :param destino: Caminho do arquivo de saída.
+    """
+    datas = df["data"].dt.strftime("%Y-%m-%dT%H:%M:%S-03:00").fillna("").to_numpy()
+    colunas = {
+        "chave": _texto(df["chave_acesso"]),
+        "numero": _texto(df["numero"]),
+        "cnpj": _texto(df["emitente_cnpj"]),
+        "emitente": _texto(df["emitente"]),
+        "uf": _texto(df["uf_emitente"]),
+        "uf_dest": _texto(df["uf_destinatario"]),
+        "cfop": _texto(df["cfop"]),
+        "descricao": _texto(df["descricao"]),
+        "valor": df["valor"].map("{:.2f}".format).to_numpy(),
+        "icms": df["valor_icms"].map("{:.2f}".format).to_numpy(),
+        "pis": df["valor_pis"].map("{:.2f}".format).to_numpy(),
+        "cofins": df["valor_cofins"].map("{:.2f}".format).to_numpy(),
+    }
+    with open(destino, "w", encoding="utf-8") as saida:
+        saida.write('<?xml version="1.0" encoding="UTF-8"?>\n<lote>\n')
+        for inicio in range(0, len(df), bloco):
+            partes = []
+            for i in range(inicio, min(inicio + bloco, len(df))):
+                c = {nome: valores[i] for nome, valores in colunas.items()}
+                partes.append(
+                    '<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe" versao="4.00"><NFe>'
+                    f'<infNFe Id="NFe{c["chave"]}" versao="4.00">'
+                    f"<ide><mod>55</mod><serie>1</serie><nNF>{c['numero']}</nNF><dhEmi>{datas[i]}</dhEmi></ide>"
+                    f"<emit><CNPJ>{c['cnpj']}</CNPJ><xNome>{c['emitente']}</xNome>"
+                    f"<enderEmit><UF>{c['uf']}</UF></enderEmit></emit>"
+                    f"<dest><CPF>12345678909</CPF><enderDest><UF>{c['uf_dest']}</UF></enderDest></dest>"
+                    f'<det nItem="1"><prod><cProd>001</cProd><xProd>{c["descricao"]}</xProd>'
+                    f"<CFOP>{c['cfop']}</CFOP><qCom>1.0000</qCom><vProd>{c['valor']}</vProd></prod>"
+                    f"<imposto><ICMS><ICMS00><vICMS>{c['icms']}</vICMS></ICMS00></ICMS>"
+                    f"<PIS><PISAliq><vPIS>{c['pis']}</vPIS></PISAliq></PIS>"
+                    f"<COFINS><COFINSAliq><vCOFINS>{c['cofins']}</vCOFINS></COFINSAliq></COFINS></imposto></det>"
+                    f"<total><ICMSTot><vNF>{c['valor']}</vNF></ICMSTot></total>"
+                    "</infNFe></NFe></nfeProc>\n"
+                )
+            saida.write("".join(partes))
+        saida.write("</lote>\n")
+
+
+GRAVADORES = {"csv": (".csv", gravar_csv), "nfse": (".xml", gravar_xml_nfse), "nfe": (".xml", gravar_xml_nfe)}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera um conjunto fiscal sintético")
+    parser.add_argument("saida", help="Arquivo de saída")
+    parser.add_argument("--formato", choices=list(GRAVADORES), default="csv")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--colunas-extras", type=int, default=0)
+    parser.add_argument("--taxa-duplicadas", type=float, default=0.0)
+    parser.add_argument("--taxa-erro", type=float, default=0.0)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    df = gerar_conjunto(args.linhas, args.colunas_extras, args.taxa_duplicadas, args.taxa_erro, args.semente)
+    GRAVADORES[args.formato][1](df, args.saida)
+    print(f"{len(df):,} linhas gravadas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
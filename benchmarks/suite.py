@@ -0,0 +1,239 @@
+# benchmarks/suite.py
+#
+# Suíte de ponta a ponta: leitura (CSV, NFS-e e NF-e), validação, resumo dos
+# dados e cada exportação do Exporter, em vários tamanhos de conjunto gerados
+# por benchmarks.dados_sinteticos. Para cada etapa registra o tempo (mediana e
+# mínimo das repetições), o pico de memória alocada (tracemalloc, em uma
+# execução separada para não distorcer os tempos) e os bytes lidos/gravados.
+# Os resultados podem ser gravados em JSON e comparados com os de outro commit:
+# etapas mais lentas que a tolerância são listadas e o código de saída é 1.
+# Uso: python -m benchmarks.suite [--linhas 1000 10000 100000] [--colunas-extras 0]
+#      [--taxa-duplicadas 0.01] [--taxa-erro 0.01] [--repeticoes 3] [--etapas ler_csv ...]
+#      [--saida resultados.json] [--comparar base.json] [--tolerancia 0.2]
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import data_profile
+from benchmarks.dados_sinteticos import gerar_conjunto, gravar_csv, gravar_xml_nfe, gravar_xml_nfse
+from data_validator import DataValidator
+from exporter import Exporter
+from file_reader import FileReader
+from llm_utils import gerar_resumo_dos_dados
+
+VERSAO_RESULTADOS = 1
+
+# Validação linha a linha (pydantic por linha): acima disso a etapa é pulada
+MAX_LINHAS_VALIDACAO_POR_LINHA = 20_000
+
+
+def _tamanho(caminho):
+    return os.path.getsize(caminho) if os.path.exists(caminho) else None
+
+
+def _resumo_sem_cache(contexto):
+    # Mede o cálculo do perfil, não a consulta ao perfil já memorizado
+    with data_profile._lock:
+        data_profile._perfis_por_fingerprint.clear()
+    return gerar_resumo_dos_dados(contexto["df"].copy(deep=False))
+
+
+def _exportacao(metodo, extensao):
+    def etapa(contexto):
+        destino = os.path.join(contexto["pasta"], f"exportado{extensao}")
+        getattr(Exporter, metodo)(contexto["df"], destino)
+        return _tamanho(destino)
+    return etapa
+
+
+# Etapa -> (função que recebe o contexto e retorna os bytes gravados ou None,
+#           arquivo de entrada do contexto, máximo de linhas ou None)
+ETAPAS = {
+    "ler_csv": (lambda c: FileReader.carregar_csv(c["csv"]), "csv", None),
+    "ler_xml_nfse": (lambda c: FileReader.carregar_xml(c["nfse"]), "nfse", None),
+    "ler_xml_nfse_tipado": (lambda c: FileReader.carregar_xml_tipado(c["nfse"]), "nfse", None),
+    "ler_xml_nfe_tipado": (lambda c: FileReader.carregar_xml_tipado(c["nfe"]), "nfe", None),
+    "validar_dados": (lambda c: DataValidator.validar_dados(c["df"]), None, MAX_LINHAS_VALIDACAO_POR_LINHA),
+    "validar_dados_vetorizado": (lambda c: DataValidator.validar_dados_vetorizado(c["df"]), None, None),
+    "resumo_dos_dados": (_resumo_sem_cache, None, None),
+    "exportar_csv": (_exportacao("exportar_para_csv", ".csv"), None, None),
+    "exportar_json": (_exportacao("exportar_para_json", ".json"), None, None),
+    "exportar_jsonl": (_exportacao("exportar_para_jsonl", ".jsonl"), None, None),
+    "exportar_parquet": (_exportacao("exportar_para_parquet", ".parquet"), None, None),
+    "exportar_feather": (_exportacao("exportar_para_feather", ".feather"), None, None),
+    "exportar_word": (_exportacao("exportar_para_word", ".docx"), None, None),
+}
+
+
+def preparar(pasta, linhas, colunas_extras, taxa_duplicadas, taxa_erro, semente):
+    """
+    Gera o conjunto, grava os arquivos de entrada e lê o CSV como na aba de upload.
+    :return: Contexto das etapas (caminhos, DataFrame lido e pasta de saída).
+    """
+    gerado = gerar_conjunto(linhas, colunas_extras, taxa_duplicadas, taxa_erro, semente)
+    contexto = {"pasta": pasta}
+    for nome, gravar in [("csv", gravar_csv), ("nfse", gravar_xml_nfse), ("nfe", gravar_xml_nfe)]:
+        contexto[nome] = os.path.join(pasta, f"entrada-{nome}.{'csv' if nome == 'csv' else 'xml'}")
+        gravar(gerado, contexto[nome])
+    contexto["df"] = FileReader.carregar_csv(contexto["csv"])
+    return contexto
+
+
+def medir(etapa, contexto, repeticoes, memoria):
+    """
+    :return: Dicionário com os tempos, o pico de memória e os bytes gravados.
+    """
+    funcao, _, _ = ETAPAS[etapa]
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        gravados = funcao(contexto)
+        tempos.append(time.perf_counter() - inicio)
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcao(contexto)
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "segundos": statistics.median(tempos),
+        "segundos_min": min(tempos),
+        "pico_memoria_bytes": pico,
+        "bytes_gravados": gravados if isinstance(gravados, int) else None,
+    }
+
+
+def metadados(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versoes = {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__}
+    try:
+        import pyarrow
+
+        versoes["pyarrow"] = pyarrow.__version__
+    except ImportError:
+        pass
+    return {
+        "versao_resultados": VERSAO_RESULTADOS,
+        "commit": commit,
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "versoes": versoes,
+        "parametros": {
+            "linhas": args.linhas,
+            "colunas_extras": args.colunas_extras,
+            "taxa_duplicadas": args.taxa_duplicadas,
+            "taxa_erro": args.taxa_erro,
+            "semente": args.semente,
+            "repeticoes": args.repeticoes,
+        },
+    }
+
+
+def comparar(resultados, base, tolerancia):
+    """
+    Compara as medianas com as de uma execução anterior.
+    :return: Lista de (etapa, linhas, razão) das etapas mais lentas que 1 + tolerância.
+    """
+    anteriores = {(r["etapa"], r["linhas"]): r for r in base["resultados"]}
+    regressoes = []
+    for resultado in resultados:
+        anterior = anteriores.get((resultado["etapa"], resultado["linhas"]))
+        if anterior is None or not anterior["segundos"]:
+            continue
+        razao = resultado["segundos"] / anterior["segundos"]
+        resultado["razao_base"] = round(razao, 3)
+        if razao > 1 + tolerancia:
+            regressoes.append((resultado["etapa"], resultado["linhas"], razao))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks de ponta a ponta")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--colunas-extras", type=int, default=0)
+    parser.add_argument("--taxa-duplicadas", type=float, default=0.01)
+    parser.add_argument("--taxa-erro", type=float, default=0.01)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória")
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior, para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Aumento de tempo tolerado (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'etapa':<26}{'linhas':>10}{'mediana':>11}{'mínimo':>11}{'pico MB':>10}{'MB/s':>9}")
+    for linhas in args.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            contexto = preparar(
+                pasta, linhas, args.colunas_extras, args.taxa_duplicadas, args.taxa_erro, args.semente
+            )
+            for etapa in args.etapas:
+                _, entrada, maximo = ETAPAS[etapa]
+                if maximo is not None and linhas > maximo:
+                    continue
+                medida = medir(etapa, contexto, args.repeticoes, not args.sem_memoria)
+                bytes_lidos = _tamanho(contexto[entrada]) if entrada else None
+                resultado = {
+                    "etapa": etapa,
+                    "linhas": linhas,
+                    "colunas": len(contexto["df"].columns),
+                    **medida,
+                    "bytes_lidos": bytes_lidos,
+                    "linhas_por_segundo": linhas / medida["segundos"] if medida["segundos"] else None,
+                }
+                resultados.append(resultado)
+                volume = bytes_lidos or medida["bytes_gravados"]
+                taxa = f"{volume / 2**20 / medida['segundos']:9.1f}" if volume and medida["segundos"] else f"{'-':>9}"
+                pico = medida["pico_memoria_bytes"]
+                print(
+                    f"{etapa:<26}{linhas:>10,}{medida['segundos']:>10.3f}s{medida['segundos_min']:>10.3f}s"
+                    f"{pico / 2**20 if pico is not None else float('nan'):>10.1f}{taxa}"
+                )
+
+    relatorio = {"meta": metadados(args), "resultados": resultados}
+    codigo_saida = 0
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(resultados, base, args.tolerancia)
+        relatorio["meta"]["base"] = {"arquivo": args.comparar, "commit": base["meta"].get("commit")}
+        print(f"\nComparação com {args.comparar} (commit {base['meta'].get('commit')}):")
+        for resultado in resultados:
+            if "razao_base" in resultado:
+                print(f"  {resultado['etapa']:<26}{resultado['linhas']:>10,}  {resultado['razao_base']:6.2f}x")
+        if regressoes:
+            codigo_saida = 1
+            print(f"Regressões acima de {args.tolerancia:.0%}:")
+            for etapa, linhas, razao in regressoes:
+                print(f"  {etapa} ({linhas:,} linhas): {razao:.2f}x mais lenta")
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.saida}")
+    sys.exit(codigo_saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# chart_data.py
+
+from collections import OrderedDict, namedtuple
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from conversores import converter_data_br, converter_decimal_br
+from data_profile import fingerprint_dataframe, perfil_registrado
+from query_planner import ALTERNATIVAS_COLUNAS, detectar_coluna
+
+# Máximo de pontos enviados a um gráfico, qualquer que seja o tamanho dos dados
+ORCAMENTO_PONTOS = 1_000
+
+# Máximo de barras; as demais categorias são somadas em "Outros"
+MAX_CATEGORIAS = 30
+
+# Dados de gráficos guardados (por conjunto de dados e especificação)
+MAX_GRAFICOS_CACHE = 64
+
+# x: coluna do eixo x; y: coluna de valores (None conta as linhas);
+# agregacao: "sum", "count" ou "mean"; periodo: None (categorias ou série sem
+# agrupamento), "D" (dia) ou "M" (mês) para colunas de data; pontos: orçamento
+EspecGrafico = namedtuple(
+    "EspecGrafico",
+    ["x", "y", "agregacao", "periodo", "pontos"],
+    defaults=("sum", None, ORCAMENTO_PONTOS),
+)
+
+# Dimensões oferecidas na aba de visualizações: nome -> (coluna lógica, período)
+DIMENSOES = {
+    "emitente": ("emitente", None),
+    "cfop": ("cfop", None),
+    "uf": ("uf", None),
+    "dia": ("data", "D"),
+    "mês": ("data", "M"),
+}
+
+_cache = OrderedDict()  # (fingerprint, EspecGrafico) -> DataFrame
+_fingerprints_por_objeto = {}  # id(df) -> (weakref, fingerprint)
+_lock = threading.Lock()
+
+
+def lttb(x: np.ndarray, y: np.ndarray, pontos: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: escolhe `pontos` pontos da série que
+    preservam sua forma visual (picos e vales). O primeiro e o último ponto
+    são sempre mantidos; de cada balde intermediário fica o ponto que forma o
+    maior triângulo com o ponto escolhido antes e a média do balde seguinte.
+    :param x: Eixo x em ordem crescente (numérico).
+    :param y: Valores da série.
+    :param pontos: Quantidade de pontos desejada.
+    :return: Posições dos pontos escolhidos, em ordem crescente.
+    """
+    n = len(x)
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    bordas = np.linspace(1, n - 1, pontos - 1).astype(np.intp)
+    escolhidos = np.empty(pontos, dtype=np.intp)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(pontos - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        seguinte = slice(fim, bordas[i + 2] if i + 2 < len(bordas) else n)
+        mx, my = x[seguinte].mean(), y[seguinte].mean()
+        area = np.abs(
+            (x[anterior] - mx) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (my - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(area))
+        escolhidos[i + 1] = anterior
+    return escolhidos
+
+
+def _agrupar(df: pd.DataFrame, espec: EspecGrafico, chaves, **opcoes) -> pd.Series:
+    if espec.y is None or espec.agregacao == "count":
+        return pd.Series(0, index=df.index).groupby(chaves, **opcoes).size()
+    return converter_decimal_br(df[espec.y]).groupby(chaves, **opcoes).agg(espec.agregacao)
+
+
+def _rotulo_valor(espec: EspecGrafico) -> str:
+    if espec.y is None or espec.agregacao == "count":
+        return "quantidade"
+    return {"sum": f"{espec.y}_total", "mean": f"{espec.y}_medio"}[espec.agregacao]
+
+
+def _limitar_categorias(agregado: pd.Series, maximo: int, agregacao: str) -> pd.Series:
+    """
+    Mantém as maiores categorias e soma as demais em "Outros" (para médias,
+    as demais são apenas omitidas).
+    """
+    agregado = agregado.sort_values(ascending=False)
+    if len(agregado) <= maximo:
+        return agregado
+    if agregacao == "mean":
+        return agregado.iloc[:maximo]
+    principais = agregado.iloc[:maximo - 1]
+    outros = pd.Series([agregado.iloc[maximo - 1:].sum()], index=["Outros"])
+    return pd.concat([principais.set_axis(principais.index.astype(str)), outros])
+
+
+def _calcular(df: pd.DataFrame, espec: EspecGrafico) -> pd.DataFrame:
+    rotulo = _rotulo_valor(espec)
+
+    coluna_x = df[espec.x]
+    temporal = espec.periodo is not None or pd.api.types.is_datetime64_any_dtype(coluna_x)
+    if not temporal:
+        grupos = coluna_x.astype("string")
+        agregado = _agrupar(df, espec, grupos, observed=True, sort=False)
+        maximo = min(MAX_CATEGORIAS, espec.pontos)
+        agregado = _limitar_categorias(agregado, maximo, espec.agregacao)
+        return pd.DataFrame({espec.x: agregado.index.astype(str), rotulo: agregado.to_numpy()})
+
+    datas = converter_data_br(coluna_x)
+    if espec.periodo == "M":
+        chaves = datas.dt.to_period("M").dt.to_timestamp()
+    elif espec.periodo == "D":
+        chaves = datas.dt.normalize()
+    else:
+        chaves = datas
+    if espec.periodo is not None:
+        agregado = _agrupar(df, espec, chaves, sort=True)
+        x, y = agregado.index.to_numpy(), agregado.to_numpy()
+    else:
+        # Série sem agrupamento: um ponto por linha, em ordem de data
+        if espec.y is None or espec.agregacao == "count":
+            valores = pd.Series(1, index=df.index)
+        else:
+            valores = converter_decimal_br(df[espec.y])
+        validos = chaves.notna().to_numpy() & valores.notna().to_numpy()
+        ordem = np.argsort(chaves.to_numpy()[validos], kind="stable")
+        x = chaves.to_numpy()[validos][ordem]
+        y = valores.to_numpy()[validos][ordem]
+    manter = lttb(x.astype("datetime64[ns]").astype("int64"), y, espec.pontos)
+    return pd.DataFrame({espec.x: x[manter], rotulo: y[manter]})
+
+
+def _fingerprint(df: pd.DataFrame) -> str:
+    # O lote carregado já tem perfil registrado: a consulta é imediata
+    perfil = perfil_registrado(df)
+    if perfil is not None:
+        return perfil.fingerprint
+    with _lock:
+        registro = _fingerprints_por_objeto.get(id(df))
+    if registro is not None and registro[0]() is df:
+        return registro[1]
+    fingerprint = fingerprint_dataframe(df)
+    with _lock:
+        _fingerprints_por_objeto[id(df)] = (
+            weakref.ref(df, lambda _, i=id(df): _fingerprints_por_objeto.pop(i, None)),
+            fingerprint,
+        )
+    return fingerprint
+
+
+def dados_grafico(df: pd.DataFrame, espec: EspecGrafico) -> pd.DataFrame:
+    """
+    Dados prontos para um gráfico: agregados por categoria (maiores primeiro,
+    com "Outros") ou por período, e reduzidos por LTTB até o orçamento de
+    pontos. O resultado é guardado por impressão digital do conjunto e
+    especificação, de modo que redesenhar o gráfico não depende do tamanho dos dados.
+    :param df: DataFrame carregado.
+    :param espec: EspecGrafico.
+    :return: DataFrame com a coluna do eixo x e a coluna de valores.
+    """
+    chave = (_fingerprint(df), espec)
+    with _lock:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave].copy()
+    dados = _calcular(df, espec)
+    with _lock:
+        _cache[chave] = dados
+        while len(_cache) > MAX_GRAFICOS_CACHE:
+            _cache.popitem(last=False)
+    return dados.copy()
+
+
+def dimensoes_disponiveis(df: pd.DataFrame) -> dict:
+    """
+    Dimensões de DIMENSOES que existem no DataFrame.
+    :return: Dicionário {nome: (coluna, período)}.
+    """
+    disponiveis = {}
+    for nome, (logica, periodo) in DIMENSOES.items():
+        coluna = detectar_coluna(df, ALTERNATIVAS_COLUNAS[logica])
+        if coluna is not None:
+            disponiveis[nome] = (coluna, periodo)
+    return disponiveis
+
+
+def espec_por_dimensao(df: pd.DataFrame, dimensao: str, por_quantidade=False) -> EspecGrafico:
+    """
+    Especificação do gráfico de uma dimensão da aba de visualizações: valor
+    total (ou quantidade de notas) por categoria ou período.
+    """
+    coluna, periodo = dimensoes_disponiveis(df)[dimensao]
+    coluna_valor = detectar_coluna(df, ALTERNATIVAS_COLUNAS["valor"])
+    if por_quantidade or coluna_valor is None:
+        return EspecGrafico(coluna, None, "count", periodo)
+    return EspecGrafico(coluna, coluna_valor, "sum", periodo)
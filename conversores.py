@@ -0,0 +1,66 @@
+# conversores.py
+
+import numpy as np
+import pandas as pd
+
+
+def converter_decimal_br(serie: pd.Series) -> pd.Series:
+    """
+    Converte textos numéricos para float64, aceitando o formato brasileiro
+    ("1.234,56") e o formato com ponto decimal usado no XML da NF-e ("1234.56").
+    Valores não numéricos viram NaN.
+    :param serie: Coluna com os valores em texto.
+    :return: Série float64.
+    """
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.astype("float64")
+    texto = serie.astype("string").str.strip()
+    com_virgula = texto.str.contains(",", regex=False).fillna(False)
+    if com_virgula.any():
+        brasileiro = texto.str.replace(".", "", regex=False).str.replace(
+            ",", ".", regex=False
+        )
+        # Caminho rápido: coluna inteira no formato brasileiro
+        texto = brasileiro if com_virgula.all() else texto.where(~com_virgula, brasileiro)
+    return pd.to_numeric(texto, errors="coerce").astype("float64")
+
+
+def converter_data_br(serie: pd.Series) -> pd.Series:
+    """
+    Converte datas "dd/mm/aaaa" e ISO 8601 ("2025-09-29T11:02:58-03:00") para
+    datetime64. O fuso horário é descartado, mantendo o horário local da emissão.
+    :param serie: Coluna com as datas em texto.
+    :return: Série datetime64.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie.astype("datetime64[ns]")
+    texto = serie.astype("string").str.strip()
+    formato_br = texto.str.match(r"\d{2}/\d{2}/\d{4}").fillna(False)
+    if (formato_br | texto.isna()).all():
+        datas = pd.to_datetime(texto.str.slice(0, 10), format="%d/%m/%Y", errors="coerce")
+        return datas.astype("datetime64[ns]")
+    iso = pd.to_datetime(
+        texto.where(~formato_br).str.slice(0, 19), format="ISO8601", errors="coerce"
+    )
+    if not formato_br.any():
+        return iso.astype("datetime64[ns]")
+    br = pd.to_datetime(
+        texto.where(formato_br).str.slice(0, 10), format="%d/%m/%Y", errors="coerce"
+    )
+    return br.where(formato_br.to_numpy(dtype=bool), iso).astype("datetime64[ns]")
+
+
+def converter_chave(serie: pd.Series) -> pd.Series:
+    """
+    Mantém apenas os dígitos de chaves de acesso ("NFe4113..." -> "4113...").
+    """
+    return serie.astype("string").str.replace(r"\D", "", regex=True).replace("", np.nan)
+
+
+# Conversões por nome de tipo, usadas pelos perfis de XML e pelo leitor de CSV
+CONVERSORES = {
+    "texto": lambda serie: serie.astype("string"),
+    "decimal": converter_decimal_br,
+    "data": converter_data_br,
+    "chave": converter_chave,
+}
@@ -0,0 +1,177 @@
+# data_normalizer.py
+
+import logging
+import numpy as np
+import pandas as pd
+from conversores import converter_data_br, converter_decimal_br
+
+
+# Mudar a versão invalida as entradas de cache gravadas com a normalização anterior
+VERSAO_NORMALIZACAO = 3
+
+# Colunas de texto com no máximo essa proporção de valores distintos viram categóricas
+PROPORCAO_CATEGORIA = 0.5
+
+# Trechos de nome que indicam códigos: continuam texto mesmo que só tenham dígitos
+FRAGMENTOS_CODIGO = (
+    "cfop",
+    "ncm",
+    "cnpj",
+    "cpf",
+    "chave",
+    "cep",
+    "cod",
+    "verificador",
+    "protocolo",
+    "fone",
+    "numero",
+    "serie",
+    "ibge",
+    "item",
+    "modelo",
+    "cst",
+    "csosn",
+    "uf",
+)
+
+# Texto só com dígitos acima desse tamanho é identificador: float64 guarda
+# no máximo 15 dígitos exatos
+MAX_DIGITOS_NUMERO = 15
+
+# Menor tipo inteiro usado na normalização
+MENOR_INTEIRO = np.iinfo(np.int32)
+
+# Trechos de nome que indicam datas
+FRAGMENTOS_DATA = ("data", "dhemi", "demi", "dt_")
+
+
+def _contem(nome, fragmentos):
+    nome = str(nome).lower()
+    return any(fragmento in nome for fragmento in fragmentos)
+
+
+def _eh_texto(serie):
+    return serie.dtype == object or (
+        pd.api.types.is_string_dtype(serie.dtype)
+        and not isinstance(serie.dtype, pd.CategoricalDtype)
+    )
+
+
+def _reduzir_numero(serie):
+    # Floats continuam float64: somas de valores monetários em float32 perdem centavos.
+    # Inteiros ficam com sinal e com no mínimo 32 bits: em tipos menores ou sem
+    # sinal, diferenças e colunas derivadas estouram sem erro (200 + 200 em uint8)
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "iu":
+        if not len(serie) or (serie.min() >= MENOR_INTEIRO.min and serie.max() <= MENOR_INTEIRO.max):
+            return serie.astype(np.int32)
+        if serie.dtype.kind == "u" and serie.max() <= np.iinfo(np.int64).max:
+            return serie.astype(np.int64)
+    return serie
+
+
+def _normalizar_coluna(nome, serie, proporcao_categoria):
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return serie
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return _reduzir_numero(serie)
+    if not _eh_texto(serie):
+        return serie
+
+    texto = serie.astype("string").str.strip()
+    preenchidos = int(texto.notna().sum())
+    if not preenchidos:
+        return serie
+
+    if not _contem(nome, FRAGMENTOS_CODIGO):
+        # Zeros à esquerda ou dígitos demais: identificador, não número
+        identificador = (
+            texto.str.match(r"0\d").fillna(False).any()
+            or texto.str.fullmatch(rf"\d{{{MAX_DIGITOS_NUMERO + 1},}}").fillna(False).any()
+        )
+        numeros = converter_decimal_br(texto)
+        if not identificador and numeros.notna().sum() == preenchidos:
+            return _reduzir_numero(numeros)
+        if _contem(nome, FRAGMENTOS_DATA):
+            datas = converter_data_br(texto)
+            if datas.notna().sum() == preenchidos:
+                return datas
+
+    if texto.nunique(dropna=True) <= proporcao_categoria * preenchidos:
+        return serie.astype("category")
+    return serie if serie.dtype != object else serie.astype("string")
+
+
+def _para_arrow(serie, pa):
+    if isinstance(serie.dtype, (pd.CategoricalDtype, pd.ArrowDtype)):
+        return serie
+    if pd.api.types.is_string_dtype(serie.dtype):
+        return serie.astype("string[pyarrow]")
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biufM":
+        return serie.astype(pd.ArrowDtype(pa.from_numpy_dtype(serie.dtype)))
+    return serie
+
+
+class ResultadoNormalizacao:
+    """
+    Resultado da normalização: o DataFrame compacto (`df`), a memória ocupada
+    antes e depois, em bytes, e as conversões por coluna
+    (`conversoes`, {coluna: (tipo antes, tipo depois)}).
+    """
+
+    def __init__(self, df, memoria_antes, memoria_depois, conversoes):
+        self.df = df
+        self.memoria_antes = memoria_antes
+        self.memoria_depois = memoria_depois
+        self.conversoes = conversoes
+
+    def relatorio(self) -> str:
+        """
+        Texto com a memória antes e depois e as colunas convertidas.
+        """
+        reducao = self.memoria_antes / self.memoria_depois if self.memoria_depois else 0
+        linhas = [
+            f"Memória: {self.memoria_antes / 2**20:.2f} MB -> "
+            f"{self.memoria_depois / 2**20:.2f} MB ({reducao:.1f}x menor)"
+        ]
+        linhas += [
+            f"- {coluna}: {antes} -> {depois}"
+            for coluna, (antes, depois) in self.conversoes.items()
+        ]
+        return "\n".join(linhas)
+
+
+def normalizar_dataframe(
+    df: pd.DataFrame, proporcao_categoria=PROPORCAO_CATEGORIA, arrow=False
+) -> ResultadoNormalizacao:
+    """
+    Converte o DataFrame para uma representação compacta: números em texto no
+    formato brasileiro viram float64, datas em texto viram datetime64,
+    textos repetitivos viram categóricos e inteiros são reduzidos ao menor tipo.
+    Códigos (CFOP, CNPJ, chaves, ...) continuam texto.
+    :param df: DataFrame lido do arquivo.
+    :param proporcao_categoria: Proporção máxima de valores distintos para
+        converter uma coluna de texto em categórica.
+    :param arrow: Se True, as colunas não categóricas passam a usar tipos pyarrow.
+    :return: ResultadoNormalizacao.
+    """
+    memoria_antes = int(df.memory_usage(deep=True).sum())
+    colunas = {
+        coluna: _normalizar_coluna(coluna, df[coluna], proporcao_categoria)
+        for coluna in df.columns
+    }
+    if arrow:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            logging.warning("pyarrow não instalado; mantendo os tipos do numpy.")
+        else:
+            colunas = {coluna: _para_arrow(serie, pa) for coluna, serie in colunas.items()}
+    normalizado = pd.DataFrame(colunas, index=df.index)
+
+    conversoes = {
+        coluna: (str(df[coluna].dtype), str(normalizado[coluna].dtype))
+        for coluna in df.columns
+        if str(df[coluna].dtype) != str(normalizado[coluna].dtype)
+    }
+    memoria_depois = int(normalizado.memory_usage(deep=True).sum())
+    return ResultadoNormalizacao(normalizado, memoria_antes, memoria_depois, conversoes)
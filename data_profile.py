@@ -0,0 +1,377 @@
+# data_profile.py
+
+from collections import OrderedDict
+import hashlib
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+
+
+# Valores guardados por coluna para estimar os quartis. Até esse limite os
+# quartis são exatos; acima dele vêm de uma amostra uniforme.
+TAMANHO_AMOSTRA_QUARTIS = 20_000
+
+
+def fingerprint_dataframe(df: pd.DataFrame) -> str:
+    """
+    Gera uma impressão digital do conteúdo do DataFrame (colunas, tipos e valores).
+    :param df: DataFrame a identificar.
+    :return: Hash hexadecimal.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(zip(map(str, df.columns), map(str, df.dtypes)))).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def combinar_fingerprints(fingerprints) -> str:
+    """
+    Impressão digital de um conjunto ordenado de partes (ex.: arquivos concatenados).
+    """
+    return hashlib.blake2b("|".join(fingerprints).encode(), digest_size=16).hexdigest()
+
+
+class PerfilDados:
+    """
+    Perfil estatístico de um DataFrame usado no resumo enviado à LLM.
+
+    Guarda estatísticas suficientes (contagens, somas, somas de quadrados e de
+    produtos cruzados, mínimos, máximos e uma amostra para os quartis), que podem
+    ser combinadas quando novos arquivos são anexados sem reler os dados antigos.
+    O texto do resumo é montado uma única vez e reaproveitado.
+    """
+
+    def __init__(
+        self,
+        fingerprint,
+        dtypes,
+        colunas,
+        deslocamento,
+        n,
+        soma,
+        soma_quad,
+        soma_cruzada,
+        n_par,
+        soma_par,
+        soma_quad_par,
+        minimo,
+        maximo,
+        amostras,
+    ):
+        self.fingerprint = fingerprint
+        self.dtypes = dtypes
+        self.colunas = colunas
+        # Deslocamento por coluna aplicado antes das somas (estabilidade numérica)
+        self.deslocamento = deslocamento
+        self.n = n
+        self.soma = soma
+        self.soma_quad = soma_quad
+        self.soma_cruzada = soma_cruzada
+        self.n_par = n_par
+        self.soma_par = soma_par
+        self.soma_quad_par = soma_quad_par
+        self.minimo = minimo
+        self.maximo = maximo
+        self.amostras = amostras
+        self._resumo = None
+
+    @classmethod
+    def de_dataframe(cls, df: pd.DataFrame, fingerprint=None, deslocamento=None):
+        """
+        Calcula o perfil de um DataFrame em uma única passada vetorizada.
+        :param df: DataFrame carregado.
+        :param fingerprint: Impressão digital já conhecida (evita recalcular).
+        :param deslocamento: {coluna: valor} a subtrair; por padrão, a média.
+        """
+        numericas = df.select_dtypes(include="number")
+        colunas = list(numericas.columns)
+        valores = numericas.to_numpy(dtype="float64", na_value=np.nan)
+        presente = ~np.isnan(valores)
+        contagem = presente.sum(axis=0)
+
+        if deslocamento is None:
+            soma_bruta = np.where(presente, valores, 0.0).sum(axis=0)
+            medias = soma_bruta / np.maximum(contagem, 1)
+            deslocamento = dict(zip(colunas, medias))
+        desloc = np.array([deslocamento.get(c, 0.0) for c in colunas])
+
+        x = np.where(presente, valores - desloc, 0.0)
+        m = presente.astype("float64")
+
+        minimo = np.min(np.where(presente, valores, np.inf), axis=0, initial=np.inf)
+        maximo = np.max(np.where(presente, valores, -np.inf), axis=0, initial=-np.inf)
+        minimo[contagem == 0] = np.nan
+        maximo[contagem == 0] = np.nan
+
+        amostras = {}
+        rng = np.random.default_rng(0)
+        for i, coluna in enumerate(colunas):
+            coluna_valores = valores[presente[:, i], i]
+            if len(coluna_valores) > TAMANHO_AMOSTRA_QUARTIS:
+                coluna_valores = rng.choice(
+                    coluna_valores, TAMANHO_AMOSTRA_QUARTIS, replace=False
+                )
+            amostras[coluna] = coluna_valores
+
+        return cls(
+            fingerprint=fingerprint or fingerprint_dataframe(df),
+            dtypes=df.dtypes.copy(),
+            colunas=colunas,
+            deslocamento=dict(zip(colunas, desloc)),
+            n=m.sum(axis=0),
+            soma=x.sum(axis=0),
+            soma_quad=(x * x).sum(axis=0),
+            soma_cruzada=x.T @ x,
+            n_par=m.T @ m,
+            soma_par=x.T @ m,  # [i, j]: soma de x_i nas linhas em que x_j existe
+            soma_quad_par=(x * x).T @ m,
+            minimo=minimo,
+            maximo=maximo,
+            amostras=amostras,
+        )
+
+    def anexar(self, df_novo: pd.DataFrame, df_total: pd.DataFrame, fingerprint=None):
+        """
+        Atualiza o perfil com um novo arquivo, sem reprocessar os dados anteriores.
+        :param df_novo: DataFrame do arquivo anexado.
+        :param df_total: DataFrame consolidado (apenas os tipos são consultados).
+        :param fingerprint: Impressão digital do consolidado, se já conhecida.
+        :return: Novo PerfilDados.
+        """
+        novo = PerfilDados.de_dataframe(
+            df_novo, fingerprint="-", deslocamento=self.deslocamento
+        )
+        if fingerprint is None:
+            fingerprint = combinar_fingerprints(
+                [self.fingerprint, fingerprint_dataframe(df_novo)]
+            )
+        return PerfilDados.combinar([self, novo], df_total.dtypes, fingerprint)
+
+    @staticmethod
+    def combinar(perfis, dtypes: pd.Series, fingerprint: str):
+        """
+        Combina perfis de partes de um mesmo conjunto de dados.
+        :param perfis: Perfis das partes, na ordem de concatenação.
+        :param dtypes: Tipos do DataFrame consolidado.
+        :param fingerprint: Impressão digital do consolidado.
+        :return: PerfilDados do consolidado, ou None se as partes não forem
+            compatíveis (ex.: coluna numérica em uma parte e texto em outra).
+        """
+        colunas = [
+            c
+            for c, t in dtypes.items()
+            if pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t)
+        ]
+        base = perfis[0]
+        deslocamento = {c: base.deslocamento.get(c, 0.0) for c in colunas}
+        k = len(colunas)
+        total = {
+            "n": np.zeros(k),
+            "soma": np.zeros(k),
+            "soma_quad": np.zeros(k),
+            "soma_cruzada": np.zeros((k, k)),
+            "n_par": np.zeros((k, k)),
+            "soma_par": np.zeros((k, k)),
+            "soma_quad_par": np.zeros((k, k)),
+        }
+        minimo = np.full(k, np.inf)
+        maximo = np.full(k, -np.inf)
+        amostras = {c: [] for c in colunas}
+        pesos = {c: [] for c in colunas}
+
+        for perfil in perfis:
+            # Coluna numérica no consolidado, mas não nesta parte: recalcular tudo
+            if any(c not in perfil.colunas and c in perfil.dtypes.index for c in colunas):
+                return None
+            idx = [perfil.colunas.index(c) if c in perfil.colunas else -1 for c in colunas]
+            presentes = [i for i, j in enumerate(idx) if j >= 0]
+            origem = [idx[i] for i in presentes]
+            if not presentes:
+                continue
+            # Ajusta as somas da parte para o deslocamento do consolidado
+            d = np.array(
+                [deslocamento[colunas[i]] - perfil.deslocamento[colunas[i]] for i in presentes]
+            )
+            n = perfil.n[origem]
+            soma = perfil.soma[origem] - d * n
+            soma_quad = perfil.soma_quad[origem] - 2 * d * perfil.soma[origem] + d * d * n
+            n_par = perfil.n_par[np.ix_(origem, origem)]
+            sp = perfil.soma_par[np.ix_(origem, origem)]
+            soma_par = sp - d[:, None] * n_par
+            soma_quad_par = (
+                perfil.soma_quad_par[np.ix_(origem, origem)]
+                - 2 * d[:, None] * sp + (d * d)[:, None] * n_par
+            )
+            sc = perfil.soma_cruzada[np.ix_(origem, origem)]
+            soma_cruzada = (
+                sc - d[None, :] * sp - d[:, None] * sp.T + np.outer(d, d) * n_par
+            )
+
+            grade = np.ix_(presentes, presentes)
+            total["n"][presentes] += n
+            total["soma"][presentes] += soma
+            total["soma_quad"][presentes] += soma_quad
+            total["n_par"][grade] += n_par
+            total["soma_par"][grade] += soma_par
+            total["soma_quad_par"][grade] += soma_quad_par
+            total["soma_cruzada"][grade] += soma_cruzada
+            minimo[presentes] = np.fmin(minimo[presentes], perfil.minimo[origem])
+            maximo[presentes] = np.fmax(maximo[presentes], perfil.maximo[origem])
+            for i, j in zip(presentes, origem):
+                amostras[colunas[i]].append(perfil.amostras[perfil.colunas[j]])
+                pesos[colunas[i]].append(perfil.n[j])
+
+        rng = np.random.default_rng(0)
+        for c in colunas:
+            partes, n_partes = amostras[c], pesos[c]
+            if not partes:
+                amostras[c] = np.array([])
+            elif sum(n_partes) <= TAMANHO_AMOSTRA_QUARTIS:
+                amostras[c] = np.concatenate(partes)
+            else:
+                # Cada parte contribui proporcionalmente ao número de valores que representa
+                fracao = np.array(n_partes) / sum(n_partes)
+                cotas = np.floor(fracao * TAMANHO_AMOSTRA_QUARTIS).astype(int)
+                amostras[c] = np.concatenate(
+                    [
+                        rng.choice(p, min(q, len(p)), replace=False)
+                        for p, q in zip(partes, cotas)
+                    ]
+                )
+
+        vazio = total["n"] == 0
+        minimo[vazio] = np.nan
+        maximo[vazio] = np.nan
+        return PerfilDados(
+            fingerprint=fingerprint,
+            dtypes=dtypes.copy(),
+            colunas=colunas,
+            deslocamento=deslocamento,
+            minimo=minimo,
+            maximo=maximo,
+            amostras=amostras,
+            **total,
+        )
+
+    def descrever(self) -> pd.DataFrame:
+        """
+        Equivalente a `df.select_dtypes(include="number").describe()`.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            deslocamento = np.array([self.deslocamento[c] for c in self.colunas])
+            media = self.soma / self.n + deslocamento
+            variancia = (self.soma_quad - self.soma ** 2 / self.n) / (self.n - 1)
+            desvio = np.sqrt(np.clip(variancia, 0, None))
+        quartis = np.array(
+            [
+                np.quantile(self.amostras[c], [0.25, 0.5, 0.75])
+                if len(self.amostras[c])
+                else [np.nan] * 3
+                for c in self.colunas
+            ]
+        ).reshape(len(self.colunas), 3)
+        return pd.DataFrame(
+            [self.n, media, desvio, self.minimo, *quartis.T, self.maximo],
+            index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+            columns=self.colunas,
+        )
+
+    def correlacao(self) -> pd.DataFrame:
+        """
+        Equivalente a `df.select_dtypes(include="number").corr()` (Pearson,
+        com pares de observações completas).
+        """
+        n = self.n_par
+        sx = self.soma_par          # soma de x_i onde x_j existe
+        sy = self.soma_par.T        # soma de x_j onde x_i existe
+        sxx = self.soma_quad_par
+        syy = self.soma_quad_par.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * self.soma_cruzada - sx * sy
+            var_x = n * sxx - sx * sx
+            var_y = n * syy - sy * sy
+            corr = cov / np.sqrt(var_x * var_y)
+            corr[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diagonal = np.diag(var_x) > 0 if len(self.colunas) else np.array([], dtype=bool)
+        corr[np.diag_indices_from(corr)] = np.where(diagonal, 1.0, np.nan)
+        return pd.DataFrame(corr, index=self.colunas, columns=self.colunas)
+
+    def resumo(self) -> str:
+        """
+        Texto do resumo dos dados enviado no prompt (calculado uma vez por perfil).
+        """
+        if self._resumo is None:
+            if self.colunas:
+                descricao = self.descrever().to_string()
+                correlacao = self.correlacao().to_string()
+            else:
+                descricao = correlacao = "Nenhuma coluna numérica."
+            self._resumo = f"""
+Colunas e tipos:
+{self.dtypes.to_string()}
+
+Estatísticas descritivas:
+{descricao}
+
+Correlação entre variáveis:
+{correlacao}
+"""
+        return self._resumo
+
+
+# Perfis já calculados, por objeto DataFrame e por impressão digital (LRU)
+MAXIMO_PERFIS = 64
+_perfis_por_objeto = {}
+_perfis_por_fingerprint = OrderedDict()
+_lock = threading.Lock()
+
+
+def registrar_perfil(df: pd.DataFrame, perfil: PerfilDados):
+    """
+    Associa um perfil já calculado ao DataFrame, para consultas posteriores.
+    """
+    chave = id(df)
+    with _lock:
+        _perfis_por_objeto[chave] = (weakref.ref(df, lambda _: _descartar(chave)), perfil)
+        _perfis_por_fingerprint[perfil.fingerprint] = perfil
+        _perfis_por_fingerprint.move_to_end(perfil.fingerprint)
+        while len(_perfis_por_fingerprint) > MAXIMO_PERFIS:
+            _perfis_por_fingerprint.popitem(last=False)
+
+
+def _descartar(chave):
+    with _lock:
+        _perfis_por_objeto.pop(chave, None)
+
+
+def perfil_registrado(df: pd.DataFrame):
+    """
+    Devolve o perfil já associado a este objeto DataFrame, sem calculá-lo.
+    :return: PerfilDados ou None.
+    """
+    with _lock:
+        registro = _perfis_por_objeto.get(id(df))
+    if registro is not None and registro[0]() is df:
+        return registro[1]
+    return None
+
+
+def obter_perfil(df: pd.DataFrame) -> PerfilDados:
+    """
+    Devolve o perfil do DataFrame, calculando-o apenas na primeira consulta.
+    :param df: DataFrame carregado.
+    :return: PerfilDados.
+    """
+    perfil = perfil_registrado(df)
+    if perfil is not None:
+        return perfil
+
+    fingerprint = fingerprint_dataframe(df)
+    with _lock:
+        perfil = _perfis_por_fingerprint.get(fingerprint)
+    if perfil is None:
+        perfil = PerfilDados.de_dataframe(df, fingerprint)
+    registrar_perfil(df, perfil)
+    return perfil
@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel, ValidationError, Field
 from typing import List
+import numpy as np
 import pandas as pd
 
 
@@ -14,6 +15,163 @@ class NotaFiscal(BaseModel):
     data: str
 
 
+# Texto de datas já convertidas pelo leitor, usado nos dois modos de validação
+FORMATO_DATA_TEXTO = "%Y-%m-%dT%H:%M:%S"
+
+# Nome da regra (mesmo "type" usado pelo pydantic) para cada restrição numérica
+_COMPARACOES = {
+    "gt": ("greater_than", np.greater),
+    "ge": ("greater_than_equal", np.greater_equal),
+    "lt": ("less_than", np.less),
+    "le": ("less_than_equal", np.less_equal),
+}
+
+
+def _mascara_texto(serie: pd.Series) -> np.ndarray:
+    """
+    Indica quais valores da coluna são aceitos como `str` pelo pydantic.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Avalia cada categoria uma única vez e propaga pelos códigos
+        categorias = _mascara_texto(pd.Series(serie.cat.categories))
+        codigos = serie.cat.codes.to_numpy()
+        return (codigos >= 0) & np.append(categorias, False)[codigos]
+    if pd.api.types.is_string_dtype(serie.dtype) and serie.dtype != object:
+        return serie.notna().to_numpy()
+    if serie.dtype != object:
+        return np.zeros(len(serie), dtype=bool)
+    return np.fromiter(
+        (isinstance(v, str) for v in serie.to_numpy()), dtype=bool, count=len(serie)
+    )
+
+
+def _valor_pydantic(valor):
+    """
+    Datas já convertidas pelo leitor voltam a texto (ISO) antes do pydantic;
+    NaT é tratado como ausente.
+    """
+    if valor is pd.NaT:
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime(FORMATO_DATA_TEXTO)
+    return valor
+
+
+def _converter_numero(serie: pd.Series):
+    """
+    Converte a coluna para float64, indicando quais valores são numéricos.
+    """
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        numeros = serie.to_numpy(dtype="float64", na_value=np.nan)
+        return numeros, np.ones(len(serie), dtype=bool)
+    numeros = pd.to_numeric(serie, errors="coerce").to_numpy(
+        dtype="float64", na_value=np.nan
+    )
+    return numeros, ~np.isnan(numeros)
+
+
+def _falhas_do_campo(serie: pd.Series, campo) -> List[tuple]:
+    """
+    Aplica em bloco as regras declaradas no campo do modelo.
+    :param serie: Coluna do DataFrame correspondente ao campo.
+    :param campo: FieldInfo do modelo pydantic.
+    :return: Lista de (regra, máscara de falha), na ordem em que o pydantic avalia.
+    """
+    falhas = []
+    restante = np.ones(len(serie), dtype=bool)
+
+    if campo.annotation is float:
+        numeros, valido = _converter_numero(serie)
+        falhas.append(("float_type", ~valido))
+        restante &= valido
+    elif campo.annotation is str:
+        if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+            serie = serie.dt.strftime(FORMATO_DATA_TEXTO)
+        valido = _mascara_texto(serie)
+        falhas.append(("string_type", ~valido))
+        restante &= valido
+    else:
+        # Tipo sem versão vetorizada: todas as linhas seguem para o pydantic
+        falhas.append((f"{campo.annotation}_type", restante.copy()))
+        return falhas
+
+    for restricao in campo.metadata:
+        padrao = getattr(restricao, "pattern", None)
+        comparacao = next(
+            (nome for nome in _COMPARACOES if getattr(restricao, nome, None) is not None),
+            None,
+        )
+        if padrao is not None:
+            texto = serie.astype(object).where(restante, "")
+            casou = texto.str.fullmatch(padrao).to_numpy(dtype=bool, na_value=False)
+            falha = restante & ~casou
+            falhas.append(("string_pattern_mismatch", falha))
+        elif comparacao is not None and campo.annotation is float:
+            regra, operador = _COMPARACOES[comparacao]
+            with np.errstate(invalid="ignore"):
+                ok = operador(numeros, getattr(restricao, comparacao))
+            falha = restante & ~ok
+            falhas.append((regra, falha))
+        else:
+            # Restrição desconhecida: delega ao pydantic as linhas ainda válidas
+            falha = restante.copy()
+            falhas.append((type(restricao).__name__, falha))
+        restante &= ~falha
+    return falhas
+
+
+class ResultadoValidacao:
+    """
+    Resultado da validação vetorizada.
+
+    `erros` é um DataFrame com as colunas `linha`, `campo` e `regra`, uma entrada
+    por campo reprovado. `mensagens()` gera o mesmo relatório textual de
+    `DataValidator.validar_dados`, consultando o pydantic apenas nas linhas reprovadas.
+    """
+
+    def __init__(self, df: pd.DataFrame, erros: pd.DataFrame, posicoes: np.ndarray):
+        self.df = df
+        self.erros = erros
+        self.posicoes = posicoes
+
+    def __len__(self):
+        return len(self.erros)
+
+    @staticmethod
+    def combinar(partes, df: pd.DataFrame, deslocamentos):
+        """
+        Junta as validações de partes de um mesmo conjunto, feitas separadamente.
+        :param partes: ResultadoValidacao de cada parte, validada com índice
+            posicional (0..n-1), na ordem de concatenação.
+        :param df: DataFrame consolidado.
+        :param deslocamentos: Posição da primeira linha de cada parte no consolidado.
+        :return: ResultadoValidacao do consolidado.
+        """
+        indice = df.index.to_numpy()
+        erros = [
+            parte.erros.assign(linha=indice[parte.erros["linha"].to_numpy(dtype=np.intp) + d])
+            for parte, d in zip(partes, deslocamentos)
+        ]
+        posicoes = [parte.posicoes + d for parte, d in zip(partes, deslocamentos)]
+        if not erros:
+            return DataValidator.validar_dados_vetorizado(df)
+        return ResultadoValidacao(
+            df,
+            pd.concat(erros, ignore_index=True),
+            np.concatenate(posicoes).astype(np.intp),
+        )
+
+    def mensagens(self) -> List[str]:
+        colunas = [c for c in NotaFiscal.model_fields if c in self.df.columns]
+        mensagens = []
+        for index, row in self.df.iloc[self.posicoes].iterrows():
+            try:
+                NotaFiscal(**{c: _valor_pydantic(row[c]) for c in colunas})
+            except ValidationError as e:
+                mensagens.append(f"Linha {index + 1}: {e}")
+        return mensagens
+
+
 class DataValidator:
     """
     Classe responsável por validar dados fiscais.
@@ -25,11 +183,59 @@ class DataValidator:
         for index, row in df.iterrows():
             try:
                 nota = NotaFiscal(
-                    valor=row["valor"],
-                    cfop=row["cfop"],
-                    emitente=row["emitente"],
-                    data=row["data"],
+                    valor=_valor_pydantic(row["valor"]),
+                    cfop=_valor_pydantic(row["cfop"]),
+                    emitente=_valor_pydantic(row["emitente"]),
+                    data=_valor_pydantic(row["data"]),
                 )
             except ValidationError as e:
                 erros.append(f"Linha {index + 1}: {e}")
         return erros
+
+    @staticmethod
+    def validar_dados_vetorizado(df: pd.DataFrame) -> ResultadoValidacao:
+        """
+        Valida o DataFrame coluna a coluna, com máscaras pandas/NumPy.
+        As regras são lidas dos campos de `NotaFiscal`, de modo que os dois modos
+        de validação seguem sempre o mesmo modelo.
+        :param df: DataFrame com as notas fiscais.
+        :return: ResultadoValidacao com os erros estruturados e o relatório textual.
+        """
+        posicoes, campos, regras = [], [], []
+        reprovadas = np.zeros(len(df), dtype=bool)
+
+        for nome, campo in NotaFiscal.model_fields.items():
+            if nome not in df.columns:
+                falhas = [("missing", np.ones(len(df), dtype=bool))]
+            else:
+                falhas = _falhas_do_campo(df[nome], campo)
+            for regra, mascara in falhas:
+                indices = np.flatnonzero(mascara)
+                if len(indices):
+                    posicoes.append(indices)
+                    campos.append(np.full(len(indices), nome, dtype=object))
+                    regras.append(np.full(len(indices), regra, dtype=object))
+                    reprovadas |= mascara
+
+        if posicoes:
+            pos = np.concatenate(posicoes)
+            erros = pd.DataFrame(
+                {
+                    "linha": df.index.to_numpy()[pos],
+                    "campo": np.concatenate(campos),
+                    "regra": np.concatenate(regras),
+                    "_pos": pos,
+                }
+            )
+            erros = erros.sort_values("_pos", kind="stable").drop(columns="_pos")
+            erros = erros.reset_index(drop=True)
+        else:
+            erros = pd.DataFrame(
+                {
+                    "linha": pd.Series(dtype=df.index.dtype),
+                    "campo": pd.Series(dtype=object),
+                    "regra": pd.Series(dtype=object),
+                }
+            )
+
+        return ResultadoValidacao(df, erros, np.flatnonzero(reprovadas))
@@ -0,0 +1,268 @@
+# dataset_store.py
+
+import itertools
+import logging
+import os
+import tempfile
+import threading
+import pandas as pd
+from data_profile import fingerprint_dataframe, perfil_registrado, registrar_perfil
+
+
+class _Conjunto:
+    """
+    Um conjunto de dados guardado uma única vez, referenciado por uma ou mais
+    chaves de sessão.
+    """
+
+    def __init__(self, fingerprint, df, tamanho, perfil):
+        self.fingerprint = fingerprint
+        self.df = df  # None quando está apenas em disco
+        self.tamanho = tamanho
+        self.perfil = perfil
+        self.referencias = set()
+        self.caminho = None
+        self.ultimo_acesso = 0
+
+
+class _Entrada:
+    """
+    Valor imutável de uma chave: versão e DataFrame (via conjunto) ou outro valor.
+    """
+
+    __slots__ = ("versao", "valor", "conjunto")
+
+    def __init__(self, versao, valor=None, conjunto=None):
+        self.versao = versao
+        self.valor = valor
+        self.conjunto = conjunto
+
+
+class ArmazemDados:
+    """
+    Armazém de DataFrames compartilhado pelas sessões do servidor.
+
+    Cada valor é guardado por (sessão, chave). DataFrames com o mesmo conteúdo
+    (mesma impressão digital) são guardados uma única vez. Quando a memória
+    ocupada passa de `limite_bytes`, os conjuntos usados há mais tempo são
+    gravados em Parquet no diretório de despejo e saem da memória; voltam
+    na próxima leitura. `obter` devolve visões rasas: com o Copy-on-Write do
+    pandas, alterações na visão não afetam o conjunto guardado nem outras sessões.
+
+    Leituras não usam lock: o índice de chaves é um snapshot imutável, trocado
+    por inteiro a cada escrita (copy-on-write), e só a recarga de um conjunto
+    despejado passa pelo lock dos escritores. Cada escrita recebe uma versão
+    crescente, consultável com `versao`.
+    """
+
+    def __init__(self, limite_bytes=1024 * 2**20, diretorio=None):
+        """
+        :param limite_bytes: Orçamento de memória para os DataFrames residentes.
+        :param diretorio: Diretório de despejo; se None, é criado um temporário.
+        """
+        self.limite_bytes = limite_bytes
+        self.diretorio = diretorio
+        self.conjuntos = {}  # impressão digital -> _Conjunto
+        self.indice = {}  # snapshot: (sessão, chave) -> _Entrada; nunca alterado no lugar
+        self.bytes_residentes = 0
+        self.deduplicados = 0
+        self.despejos = 0
+        self.recarregamentos = 0
+        self.lock = threading.Lock()
+        self._versoes = itertools.count(1)
+        self._acessos = itertools.count(1)
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logging.warning("pyarrow não instalado; despejo em disco desativado.")
+            self.despejo_ativo = False
+        else:
+            self.despejo_ativo = True
+
+    def _caminho(self, fingerprint):
+        if self.diretorio is None:
+            self.diretorio = tempfile.mkdtemp(prefix="chatfiscal-dados-")
+        os.makedirs(self.diretorio, exist_ok=True)
+        return os.path.join(self.diretorio, f"{fingerprint}.parquet")
+
+    def salvar(self, sessao, chave, valor):
+        """
+        Salva um valor para a sessão.
+        :param sessao: Identificador da sessão.
+        :param chave: Chave identificadora do dado.
+        :param valor: Valor a ser armazenado (DataFrames vão para o armazém).
+        :return: Versão atribuída ao valor.
+        """
+        if not isinstance(valor, pd.DataFrame):
+            with self.lock:
+                indice = dict(self.indice)
+                self._soltar(indice, (sessao, chave))
+                entrada = indice[(sessao, chave)] = _Entrada(next(self._versoes), valor=valor)
+                self.indice = indice
+            return entrada.versao
+
+        perfil = perfil_registrado(valor)
+        # Cópia rasa: com Copy-on-Write, edições posteriores do chamador no
+        # próprio DataFrame não alcançam o conjunto guardado (nem outras sessões)
+        valor = valor.copy(deep=False)
+        fingerprint = perfil.fingerprint if perfil else fingerprint_dataframe(valor)
+        with self.lock:
+            indice = dict(self.indice)
+            self._soltar(indice, (sessao, chave))
+            conjunto = self.conjuntos.get(fingerprint)
+            if conjunto is None:
+                tamanho = int(valor.memory_usage(deep=True).sum())
+                conjunto = _Conjunto(fingerprint, valor, tamanho, perfil)
+                self.conjuntos[fingerprint] = conjunto
+                self.bytes_residentes += tamanho
+            else:
+                self.deduplicados += 1
+                conjunto.perfil = conjunto.perfil or perfil
+            conjunto.referencias.add((sessao, chave))
+            conjunto.ultimo_acesso = next(self._acessos)
+            entrada = indice[(sessao, chave)] = _Entrada(next(self._versoes), conjunto=conjunto)
+            self.indice = indice
+            self._despejar(manter=conjunto)
+        return entrada.versao
+
+    def obter(self, sessao, chave):
+        """
+        Obtém um valor da sessão, sem bloquear outras leituras.
+        :param sessao: Identificador da sessão.
+        :param chave: Chave identificadora do dado.
+        :return: Visão somente leitura do DataFrame, o valor armazenado ou None.
+        """
+        return self.obter_com_versao(sessao, chave)[0]
+
+    def obter_com_versao(self, sessao, chave):
+        """
+        Obtém o valor e a versão lidos do mesmo snapshot.
+        :return: (valor, versão) ou (None, None) se a chave não existir.
+        """
+        entrada = self.indice.get((sessao, chave))
+        if entrada is None:
+            return None, None
+        conjunto = entrada.conjunto
+        if conjunto is None:
+            return entrada.valor, entrada.versao
+
+        conjunto.ultimo_acesso = next(self._acessos)
+        df = conjunto.df
+        if df is None:
+            df = self._recarregar(conjunto)
+            if df is None:  # Conjunto descartado durante a leitura
+                return self.obter_com_versao(sessao, chave)
+
+        visao = df.copy(deep=False)
+        if conjunto.perfil is not None:
+            registrar_perfil(visao, conjunto.perfil)
+        return visao, entrada.versao
+
+    def versao(self, sessao, chave):
+        """
+        Versão atual do valor, para detectar mudanças sem copiar dados.
+        :return: Número crescente a cada `salvar`, ou None se a chave não existir.
+        """
+        entrada = self.indice.get((sessao, chave))
+        return entrada.versao if entrada is not None else None
+
+    def _recarregar(self, conjunto):
+        with self.lock:
+            if self.conjuntos.get(conjunto.fingerprint) is not conjunto:
+                return None
+            if conjunto.df is None:
+                conjunto.df = pd.read_parquet(conjunto.caminho)
+                self.bytes_residentes += conjunto.tamanho
+                self.recarregamentos += 1
+            df = conjunto.df
+            self._despejar(manter=conjunto)
+            return df
+
+    def descartar_sessao(self, sessao):
+        """
+        Libera todos os valores da sessão (ex.: quando a sessão termina).
+        """
+        with self.lock:
+            indice = dict(self.indice)
+            for chave in [c for c in indice if c[0] == sessao]:
+                self._soltar(indice, chave)
+            self.indice = indice
+
+    def _soltar(self, indice, chave):
+        entrada = indice.pop(chave, None)
+        if entrada is None or entrada.conjunto is None:
+            return
+        conjunto = entrada.conjunto
+        conjunto.referencias.discard(chave)
+        if conjunto.referencias:
+            return
+        del self.conjuntos[conjunto.fingerprint]
+        if conjunto.df is not None:
+            self.bytes_residentes -= conjunto.tamanho
+        if conjunto.caminho:
+            try:
+                os.remove(conjunto.caminho)
+            except OSError:
+                pass
+
+    def _despejar(self, manter):
+        if not self.despejo_ativo or self.bytes_residentes <= self.limite_bytes:
+            return
+        residentes = [c for c in self.conjuntos.values() if c.df is not None and c is not manter]
+        for conjunto in sorted(residentes, key=lambda c: c.ultimo_acesso):
+            if self.bytes_residentes <= self.limite_bytes:
+                break
+            if conjunto.caminho is None:
+                caminho = self._caminho(conjunto.fingerprint)
+                try:
+                    conjunto.df.to_parquet(caminho + ".tmp", index=True)
+                    os.replace(caminho + ".tmp", caminho)
+                except Exception as e:
+                    logging.warning(
+                        "Falha ao despejar conjunto %s em disco: %s", conjunto.fingerprint, e
+                    )
+                    continue
+                conjunto.caminho = caminho
+            conjunto.df = None
+            self.bytes_residentes -= conjunto.tamanho
+            self.despejos += 1
+
+    def estatisticas(self):
+        """
+        :return: Dicionário com conjuntos, bytes residentes e em disco, chaves,
+            deduplicações, despejos e recarregamentos.
+        """
+        with self.lock:
+            em_disco = [c for c in self.conjuntos.values() if c.df is None]
+            return {
+                "conjuntos": len(self.conjuntos),
+                "residentes": len(self.conjuntos) - len(em_disco),
+                "bytes_residentes": self.bytes_residentes,
+                "limite_bytes": self.limite_bytes,
+                "bytes_em_disco": sum(c.tamanho for c in em_disco),
+                "chaves": len(self.indice),
+                "sessoes": len({sessao for sessao, _ in self.indice}),
+                "deduplicados": self.deduplicados,
+                "despejos": self.despejos,
+                "recarregamentos": self.recarregamentos,
+            }
+
+
+_armazem_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_armazem_padrao() -> ArmazemDados:
+    """
+    Armazém único do processo, configurado por CHATFISCAL_MEMORIA_MB e
+    CHATFISCAL_DESPEJO_DIR.
+    """
+    global _armazem_padrao
+    with _lock_padrao:
+        if _armazem_padrao is None:
+            _armazem_padrao = ArmazemDados(
+                limite_bytes=int(os.getenv("CHATFISCAL_MEMORIA_MB", "1024")) * 2**20,
+                diretorio=os.getenv("CHATFISCAL_DESPEJO_DIR"),
+            )
+        return _armazem_padrao
@@ -1,47 +1,298 @@
 # exporter.py
 
+from contextlib import contextmanager
+import gzip
+import importlib.util
+import os
+import tempfile
 import pandas as pd
-from docx import Document
+from instrumentation import etapa
+from report_writer import LIMITE_LINHAS_WORD, escrever_relatorio_word
+
+# Linhas serializadas por vez: a memória usada na exportação depende do bloco,
+# não do tamanho do DataFrame
+TAMANHO_BLOCO = 100_000
+
+# Extensão -> compressão, quando `compressao="infer"`
+_EXTENSOES_COMPRESSAO = {".gz": "gzip", ".zst": "zstd"}
+
+# Formato -> (extensão, tipo MIME), usados nos downloads
+_TODOS_FORMATOS = {
+    "csv": (".csv", "text/csv"),
+    "json": (".json", "application/json"),
+    "jsonl": (".jsonl", "application/x-ndjson"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "feather": (".feather", "application/vnd.apache.arrow.file"),
+}
+
+# Formatos que dependem do pyarrow
+_FORMATOS_ARROW = ("parquet", "feather")
+
+
+def formatos_disponiveis() -> dict:
+    """
+    Formatos cujo backend está instalado (Parquet e Feather só com o pyarrow),
+    sem importá-lo.
+    """
+    if importlib.util.find_spec("pyarrow") is not None:
+        return dict(_TODOS_FORMATOS)
+    return {nome: formato for nome, formato in _TODOS_FORMATOS.items() if nome not in _FORMATOS_ARROW}
+
+
+FORMATOS = formatos_disponiveis()
+
+
+def _inferir_compressao(destino, compressao):
+    if compressao != "infer":
+        return compressao
+    if isinstance(destino, (str, os.PathLike)):
+        return _EXTENSOES_COMPRESSAO.get(os.path.splitext(os.fspath(destino))[1].lower())
+    return None
+
+
+class _SemFechar:
+    """
+    Repassa as escritas ao destino sem fechá-lo ao final (o pyarrow fecha o
+    arquivo subjacente junto com o fluxo comprimido).
+    """
+
+    closed = False
+
+    def __init__(self, destino):
+        self._destino = destino
+
+    def write(self, dados):
+        return self._destino.write(dados)
+
+    def flush(self):
+        self._destino.flush()
+
+    def close(self):
+        self.closed = True
+
+
+@contextmanager
+def _abrir_saida(destino, compressao=None):
+    """
+    Abre o destino para escrita binária, com compressão opcional.
+    :param destino: Caminho do arquivo ou objeto binário gravável.
+    :param compressao: None, "gzip", "zstd" ou "infer" (pela extensão do caminho).
+    """
+    compressao = _inferir_compressao(destino, compressao)
+    with _abrir_destino(destino) as saida:
+        if compressao is None:
+            yield saida
+        elif compressao == "gzip":
+            with gzip.GzipFile(fileobj=saida, mode="wb", compresslevel=6) as comprimido:
+                yield comprimido
+        elif compressao == "zstd":
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise ValueError("Compressão zstd requer o pyarrow instalado.")
+            with pa.CompressedOutputStream(pa.PythonFile(_SemFechar(saida), mode="w"), "zstd") as comprimido:
+                yield comprimido
+        else:
+            raise ValueError(f"Compressão não suportada: {compressao}")
+
+
+@contextmanager
+def _abrir_destino(destino):
+    if isinstance(destino, (str, os.PathLike)):
+        with open(destino, "wb") as arquivo:
+            yield arquivo
+    else:
+        yield destino
+
+
+def _blocos(df: pd.DataFrame, tamanho_bloco: int):
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+
+def _blocos_texto(df: pd.DataFrame, formato: str, tamanho_bloco: int = TAMANHO_BLOCO):
+    """
+    Serializa o DataFrame em pedaços de bytes (UTF-8), bloco a bloco.
+    :param formato: "csv", "json" (lista de registros) ou "jsonl" (um registro por linha).
+    """
+    if formato == "csv":
+        yield df.iloc[:0].to_csv(index=False).encode("utf-8")
+        for bloco in _blocos(df, tamanho_bloco):
+            yield bloco.to_csv(index=False, header=False).encode("utf-8")
+    elif formato == "json":
+        yield b"["
+        separador = b""
+        for bloco in _blocos(df, tamanho_bloco):
+            registros = bloco.to_json(orient="records", force_ascii=False, date_format="iso")
+            yield separador + registros[1:-1].encode("utf-8")
+            separador = b","
+        yield b"]"
+    elif formato == "jsonl":
+        for bloco in _blocos(df, tamanho_bloco):
+            yield bloco.to_json(
+                orient="records", lines=True, force_ascii=False, date_format="iso"
+            ).encode("utf-8")
+    else:
+        raise ValueError(f"Formato de texto não suportado: {formato}")
+
+
+def _tamanho_destino(destino):
+    """
+    Bytes gravados no destino (caminho ou arquivo posicionável), se disponível.
+    """
+    if isinstance(destino, (str, os.PathLike)):
+        return os.path.getsize(destino)
+    try:
+        return destino.tell()
+    except (AttributeError, OSError):
+        return None
+
+
+def _gravar_texto(df, destino, formato, compressao, tamanho_bloco):
+    with etapa("exportar", formato=formato) as medida:
+        with _abrir_saida(destino, compressao) as saida:
+            for pedaco in _blocos_texto(df, formato, tamanho_bloco):
+                saida.write(pedaco)
+        medida.registrar(linhas=len(df), tamanho_bytes=_tamanho_destino(destino))
+
+
+def _gravar_arrow(df, destino, formato, compressao, tamanho_bloco):
+    """
+    Grava Parquet (um row group por bloco) ou Feather/Arrow IPC (um lote por bloco).
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError(f"Exportação {formato} requer o pyarrow instalado.")
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    lotes = (
+        pa.RecordBatch.from_pandas(bloco, schema=schema, preserve_index=False)
+        for bloco in _blocos(df, tamanho_bloco)
+    )
+    with etapa("exportar", formato=formato) as medida, _abrir_destino(destino) as saida:
+        if formato == "parquet":
+            import pyarrow.parquet as pq
+
+            with pq.ParquetWriter(saida, schema, compression=compressao or "none") as escritor:
+                for lote in lotes:
+                    escritor.write_batch(lote)
+        else:
+            opcoes = pa.ipc.IpcWriteOptions(compression=compressao)
+            with pa.ipc.new_file(saida, schema, options=opcoes) as escritor:
+                for lote in lotes:
+                    escritor.write_batch(lote)
+        medida.registrar(linhas=len(df), tamanho_bytes=_tamanho_destino(saida))
 
 
 class Exporter:
     """
     Classe responsável por exportar dados e relatórios em diferentes formatos.
+
+    As exportações de dados gravam o DataFrame em blocos de `TAMANHO_BLOCO`
+    linhas, direto no destino (caminho ou objeto binário gravável), de modo que
+    a memória usada não cresce com o número de linhas exportadas.
     """
 
     @staticmethod
-    def exportar_para_csv(df: pd.DataFrame, caminho: str):
+    def exportar_para_csv(df: pd.DataFrame, caminho, compressao="infer",
+                          tamanho_bloco: int = TAMANHO_BLOCO):
+        """
+        :param compressao: None, "gzip", "zstd" ou "infer" (pela extensão: .gz, .zst).
+        """
         try:
-            df.to_csv(caminho, index=False, encoding="utf-8")
+            _gravar_texto(df, caminho, "csv", compressao, tamanho_bloco)
         except Exception as e:
             raise ValueError(f"Erro ao exportar para CSV: {e}")
 
     @staticmethod
-    def exportar_para_json(df: pd.DataFrame, caminho: str):
+    def exportar_para_json(df: pd.DataFrame, caminho, compressao="infer",
+                           tamanho_bloco: int = TAMANHO_BLOCO):
+        """
+        Lista JSON de registros, gravada em blocos.
+        """
         try:
-            df.to_json(caminho, orient="records", force_ascii=False)
+            _gravar_texto(df, caminho, "json", compressao, tamanho_bloco)
         except Exception as e:
             raise ValueError(f"Erro ao exportar para JSON: {e}")
 
     @staticmethod
-    def exportar_para_word(df: pd.DataFrame, caminho: str):
+    def exportar_para_jsonl(df: pd.DataFrame, caminho, compressao="infer",
+                            tamanho_bloco: int = TAMANHO_BLOCO):
+        """
+        JSON Lines: um registro por linha.
+        """
         try:
-            doc = Document()
-            doc.add_heading("Relatório de Dados", level=1)
+            _gravar_texto(df, caminho, "jsonl", compressao, tamanho_bloco)
+        except Exception as e:
+            raise ValueError(f"Erro ao exportar para JSON Lines: {e}")
 
-            tabela = doc.add_table(rows=1, cols=len(df.columns))
-            tabela.style = "Table Grid"
+    @staticmethod
+    def exportar_para_parquet(df: pd.DataFrame, caminho, compressao="zstd",
+                              tamanho_bloco: int = TAMANHO_BLOCO):
+        """
+        :param compressao: Codec do Parquet ("zstd", "snappy", "gzip"...) ou None.
+        """
+        try:
+            _gravar_arrow(df, caminho, "parquet", compressao, tamanho_bloco)
+        except Exception as e:
+            raise ValueError(f"Erro ao exportar para Parquet: {e}")
 
-            # Adiciona cabeçalhos
-            for i, coluna in enumerate(df.columns):
-                tabela.cell(0, i).text = coluna
+    @staticmethod
+    def exportar_para_feather(df: pd.DataFrame, caminho, compressao="zstd",
+                              tamanho_bloco: int = TAMANHO_BLOCO):
+        """
+        :param compressao: "zstd", "lz4" ou None.
+        """
+        try:
+            _gravar_arrow(df, caminho, "feather", compressao, tamanho_bloco)
+        except Exception as e:
+            raise ValueError(f"Erro ao exportar para Feather: {e}")
 
-            # Adiciona dados
-            for _, linha in df.iterrows():
-                row_cells = tabela.add_row().cells
-                for i, valor in enumerate(linha):
-                    row_cells[i].text = str(valor)
+    @staticmethod
+    def exportar(df: pd.DataFrame, destino, formato: str, compressao="infer"):
+        """
+        Exporta no formato indicado (uma das chaves de FORMATOS).
+        Para Parquet e Feather, "infer" usa zstd.
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato não suportado: {formato}")
+        exportar = getattr(Exporter, f"exportar_para_{formato}")
+        if formato in _FORMATOS_ARROW and compressao == "infer":
+            compressao = "zstd"
+        exportar(df, destino, compressao=compressao)
 
-            doc.save(caminho)
+    @staticmethod
+    def iterar_bytes(df: pd.DataFrame, formato: str, tamanho_bloco: int = TAMANHO_BLOCO):
+        """
+        Gera o conteúdo exportado em pedaços de bytes, sem compressão, para
+        respostas em streaming.
+        :param formato: "csv", "json" ou "jsonl".
+        """
+        return _blocos_texto(df, formato, tamanho_bloco)
+
+    @staticmethod
+    def arquivo_temporario(df: pd.DataFrame, formato: str, compressao=None):
+        """
+        Exporta para um arquivo temporário em disco (removido ao ser fechado).
+        :return: Arquivo binário aberto, posicionado no início.
+        """
+        arquivo = tempfile.TemporaryFile()
+        try:
+            Exporter.exportar(df, arquivo, formato, compressao)
+        except Exception:
+            arquivo.close()
+            raise
+        arquivo.seek(0)
+        return arquivo
+
+    @staticmethod
+    def exportar_para_word(df: pd.DataFrame, caminho: str, limite_linhas=LIMITE_LINHAS_WORD):
+        """
+        Exporta o DataFrame como tabela em um relatório Word. Tabelas maiores que
+        `limite_linhas` são cortadas e acompanhadas de um resumo (None grava todas).
+        """
+        try:
+            escrever_relatorio_word(caminho, df, limite_linhas=limite_linhas)
         except Exception as e:
             raise ValueError(f"Erro ao exportar para Word: {e}")
@@ -1,11 +1,242 @@
 # file_reader.py
 
+import codecs
+import csv
+import os
 import pandas as pd
 import xml.etree.ElementTree as ET
-from PyPDF2 import PdfReader
-import pytesseract
-from PIL import Image
 import logging
+from conversores import CONVERSORES
+from xml_profiles import extrair_xml_tipado
+
+# PyPDF2, pytesseract e PIL são importados apenas nos métodos de PDF e OCR,
+# para não pesar no início de sessões que só leem CSV/XML
+
+
+# Versão da saída dos leitores, usada nas chaves do cache de leitura.
+# Incrementar sempre que uma mudança alterar o DataFrame produzido.
+VERSAO_LEITOR = 2
+
+# Tipos das colunas fiscais conhecidas nos CSVs (nome em minúsculas).
+# Identificadores ficam como texto: chaves de 44 dígitos não cabem em int64 e
+# CNPJs, números e séries podem ter zeros à esquerda.
+TIPOS_CSV_FISCAL = {
+    "cfop": "texto",
+    "chave_acesso": "texto",
+    "chave_acesso_nfse_nacional": "texto",
+    "chave": "texto",
+    "numero": "texto",
+    "serie": "texto",
+    "emitente_cnpj": "texto",
+    "destinatario_cnpj": "texto",
+    "cnpj": "texto",
+    "ncm": "texto",
+    "valor": "decimal",
+    "data": "data",
+}
+
+# Bytes lidos do início do CSV para detectar codificação e delimitador
+TAMANHO_AMOSTRA_CSV = 64 * 1024
+
+# Tags de nota reconhecidas, em ordem de prioridade
+ESTRUTURAS_XML = [
+    "nf",  # Para seu XML atual
+    "NFe",  # Para NFe padrão
+    "NotaFiscal",  # Para outras notas
+    "NFSe",  # Para NFSe
+    "Nota",  # Para estrutura genérica
+]
+
+
+def _detectar_formato_csv(arquivo):
+    """
+    Lê uma amostra do início do CSV (e volta à posição original) para detectar
+    codificação, delimitador e cabeçalho.
+    :param arquivo: Caminho ou arquivo (binário ou texto) posicionável.
+    :return: Tupla (encoding, delimitador, colunas). encoding é None para
+        arquivos já abertos em modo texto.
+    """
+    if isinstance(arquivo, (str, os.PathLike)):
+        with open(arquivo, "rb") as f:
+            amostra = f.read(TAMANHO_AMOSTRA_CSV)
+    else:
+        inicio = arquivo.tell()
+        amostra = arquivo.read(TAMANHO_AMOSTRA_CSV)
+        arquivo.seek(inicio)
+
+    if isinstance(amostra, str):
+        encoding, texto = None, amostra
+    elif amostra.startswith(codecs.BOM_UTF8):
+        encoding, texto = "utf-8-sig", amostra.decode("utf-8-sig", errors="ignore")
+    else:
+        try:
+            # final=False tolera um caractere cortado no fim da amostra
+            texto = codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding, texto = "latin1", amostra.decode("latin1")
+
+    linhas = texto.splitlines()[:20]
+    try:
+        delimitador = csv.Sniffer().sniff("\n".join(linhas), delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimitador = ","
+    colunas = next(csv.reader(linhas[:1], delimiter=delimitador), [])
+    return encoding, delimitador, colunas
+
+
+def _tipar_csv(df, tipos):
+    """
+    Converte as colunas fiscais conhecidas (valor, data) já lidas do CSV.
+    """
+    for coluna, tipo in tipos.items():
+        if tipo != "texto" and coluna in df.columns:
+            df[coluna] = CONVERSORES[tipo](df[coluna])
+    return df
+
+
+def _opcoes_csv(arquivo):
+    """
+    Monta os argumentos de `pd.read_csv` a partir da amostra do arquivo.
+    :return: Tupla (opções do read_csv, {coluna: tipo fiscal}).
+    """
+    encoding, delimitador, colunas = _detectar_formato_csv(arquivo)
+    tipos = {
+        coluna: TIPOS_CSV_FISCAL[coluna.strip().lower()]
+        for coluna in colunas
+        if coluna.strip().lower() in TIPOS_CSV_FISCAL
+    }
+    opcoes = {
+        "sep": delimitador,
+        "dtype": {c: "str" for c, tipo in tipos.items() if tipo == "texto"},
+    }
+    if encoding:
+        opcoes["encoding"] = encoding
+    return opcoes, tipos
+
+
+def _posicao(arquivo):
+    return None if isinstance(arquivo, (str, os.PathLike)) else arquivo.tell()
+
+
+def _reler_como_latin1(arquivo, posicao, opcoes):
+    """
+    Volta ao início do CSV para relê-lo como latin1, quando um caractere fora
+    do UTF-8 aparece depois da amostra usada na detecção.
+    :return: Opções do read_csv com a nova codificação.
+    """
+    if opcoes.get("encoding") != "utf-8":
+        return None
+    if posicao is not None:
+        arquivo.seek(posicao)
+    return {**opcoes, "encoding": "latin1"}
+
+
+def _extrair_nota(nota):
+    """
+    Achata os elementos de uma nota em um dicionário {tag: texto}.
+    """
+    info = {}
+    # Coletar todos os elementos filhos
+    for elem in nota.iter():
+        if elem.text and elem.text.strip():
+            info[elem.tag] = elem.text.strip()
+    # Também coletar atributos se existirem
+    for key, value in nota.attrib.items():
+        info[key] = value
+    return info
+
+
+def _descartar(elem, pilha):
+    """
+    Libera um elemento já processado e o desliga do elemento pai.
+    """
+    elem.clear()
+    if pilha:
+        pilha[-1].remove(elem)
+
+
+def _notas_xml_incremental(arquivo):
+    """
+    Percorre o XML com iterparse, gerando um dicionário por nota.
+    A estrutura é detectada quando o primeiro elemento candidato termina,
+    considerando a prioridade de ESTRUTURAS_XML entre ele, seus descendentes e
+    seus ancestrais abertos. Se uma estrutura de maior prioridade só aparecer
+    depois, em outro ramo do documento, o resultado difere de `carregar_xml`
+    e um aviso é registrado. Subárvores processadas são descartadas, de modo
+    que a memória fica limitada ao tamanho de uma nota.
+    :param arquivo: Caminho ou arquivo binário posicionável.
+    """
+    prioridade = {tag: i for i, tag in enumerate(ESTRUTURAS_XML)}
+    inicio = None if isinstance(arquivo, (str, os.PathLike)) else arquivo.tell()
+    tag_nota = None
+    pilha = []
+    abertas = 0  # Candidatos abertos (antes da detecção) ou notas abertas (depois)
+    encontrou = False
+    vistas = set()
+
+    def conta(elem):
+        return elem.tag == tag_nota if tag_nota else elem.tag in prioridade
+
+    for evento, elem in ET.iterparse(arquivo, events=("start", "end")):
+        if evento == "start":
+            pilha.append(elem)
+            if conta(elem):
+                abertas += 1
+            if elem.tag in prioridade:
+                vistas.add(elem.tag)
+            continue
+
+        pilha.pop()
+        if conta(elem):
+            abertas -= 1
+
+        if tag_nota is None:
+            if elem.tag not in prioridade:
+                if not abertas:
+                    _descartar(elem, pilha)
+                continue
+            candidatas = [e.tag for e in pilha if e.tag in prioridade]
+            candidatas += [d.tag for d in elem.iter() if d.tag in prioridade]
+            tag_nota = min(candidatas, key=prioridade.get)
+            abertas = sum(1 for e in pilha if e.tag == tag_nota)
+
+        if abertas:
+            continue  # Ainda dentro de uma nota: a subárvore é processada no fim dela
+        if elem.tag == tag_nota:
+            for nota in elem.iter(tag_nota):
+                info = _extrair_nota(nota)
+                if info:  # Só adicionar se tiver dados
+                    encontrou = True
+                    yield info
+        _descartar(elem, pilha)
+
+    if tag_nota is not None and min(vistas, key=prioridade.get) != tag_nota:
+        logging.warning(
+            "Estrutura %s encontrada após a detecção; notas lidas como %s",
+            min(vistas, key=prioridade.get),
+            tag_nota,
+        )
+    if encontrou:
+        return
+
+    # Se não encontrou nenhuma estrutura conhecida, tentar extrair tudo
+    logging.warning("Estrutura não reconhecida, extraindo todos os elementos")
+    if inicio is not None:
+        arquivo.seek(inicio)
+    anterior = None
+    for evento, elem in ET.iterparse(arquivo, events=("start", "end")):
+        # O texto de um elemento está completo no evento seguinte ao seu início
+        if anterior is not None:
+            if anterior.text and anterior.text.strip():
+                yield {anterior.tag: anterior.text.strip()}
+            anterior = None
+        if evento == "start":
+            pilha.append(elem)
+            anterior = elem
+        else:
+            pilha.pop()
+            _descartar(elem, pilha)
 
 
 class FileReader:
@@ -14,9 +245,59 @@ class FileReader:
     """
 
     @staticmethod
-    def carregar_csv(arquivo):
+    def carregar_csv(arquivo, motor="c"):
+        """
+        Carrega um CSV detectando codificação e delimitador uma única vez, a
+        partir de uma amostra, e aplicando os tipos fiscais conhecidos
+        (cfop como texto, valor como float, data como data).
+        :param arquivo: Caminho ou arquivo posicionável.
+        :param motor: Engine do pandas ("c" ou "pyarrow", se instalado).
+        :return: DataFrame.
+        """
         try:
-            return pd.read_csv(arquivo, encoding="latin1", sep=None, engine="python")
+            posicao = _posicao(arquivo)
+            opcoes, tipos = _opcoes_csv(arquivo)
+            try:
+                df = pd.read_csv(arquivo, engine=motor, **opcoes)
+            except UnicodeDecodeError:
+                latin1 = _reler_como_latin1(arquivo, posicao, opcoes)
+                if latin1 is None:
+                    raise
+                df = pd.read_csv(arquivo, engine=motor, **latin1)
+            return _tipar_csv(df, tipos)
+        except Exception as e:
+            raise ValueError(f"Erro ao carregar arquivo CSV: {e}")
+
+    @staticmethod
+    def carregar_csv_em_blocos(arquivo, tamanho_bloco=100_000):
+        """
+        Carrega o CSV em blocos de até `tamanho_bloco` linhas, já tipados,
+        para arquivos maiores que a memória disponível.
+        :param arquivo: Caminho ou arquivo posicionável.
+        :param tamanho_bloco: Quantidade máxima de linhas por DataFrame.
+        :return: Gerador de DataFrames.
+        """
+        try:
+            posicao = _posicao(arquivo)
+            opcoes, tipos = _opcoes_csv(arquivo)
+            lidas = 0
+            try:
+                with pd.read_csv(arquivo, chunksize=tamanho_bloco, **opcoes) as leitor:
+                    for bloco in leitor:
+                        lidas += len(bloco)
+                        yield _tipar_csv(bloco, tipos)
+            except UnicodeDecodeError:
+                latin1 = _reler_como_latin1(arquivo, posicao, opcoes)
+                if latin1 is None:
+                    raise
+                # Relê desde o início, pulando as linhas já entregues
+                with pd.read_csv(arquivo, chunksize=tamanho_bloco, **latin1) as leitor:
+                    for bloco in leitor:
+                        if lidas >= len(bloco):
+                            lidas -= len(bloco)
+                            continue
+                        yield _tipar_csv(bloco.iloc[lidas:], tipos)
+                        lidas = 0
         except Exception as e:
             raise ValueError(f"Erro ao carregar arquivo CSV: {e}")
 
@@ -28,27 +309,13 @@ class FileReader:
             dados = []
 
             # Tentar diferentes estruturas de XML
-            estruturas = [
-                ".//nf",  # Para seu XML atual
-                ".//NFe",  # Para NFe padrão
-                ".//NotaFiscal",  # Para outras notas
-                ".//NFSe",  # Para NFSe
-                ".//Nota",  # Para estrutura genérica
-            ]
+            estruturas = [f".//{tag}" for tag in ESTRUTURAS_XML]
 
             for estrutura in estruturas:
                 notas = root.findall(estrutura)
                 if notas:
                     for nota in notas:
-                        info = {}
-                        # Coletar todos os elementos filhos
-                        for elem in nota.iter():
-                            if elem.text and elem.text.strip():
-                                info[elem.tag] = elem.text.strip()
-                        # Também coletar atributos se existirem
-                        for key, value in nota.attrib.items():
-                            info[key] = value
-
+                        info = _extrair_nota(nota)
                         if info:  # Só adicionar se tiver dados
                             dados.append(info)
 
@@ -70,19 +337,84 @@ class FileReader:
             raise ValueError(f"Erro ao carregar arquivo XML: {e}")
 
     @staticmethod
-    def carregar_pdf(arquivo):
+    def carregar_xml_em_blocos(arquivo, tamanho_bloco=50_000):
+        """
+        Carrega o XML de forma incremental, gerando DataFrames de até
+        `tamanho_bloco` notas. A concatenação dos blocos equivale ao resultado
+        de `carregar_xml`, mas o pico de memória não depende do tamanho do arquivo.
+        :param arquivo: Caminho ou arquivo binário posicionável.
+        :param tamanho_bloco: Quantidade máxima de linhas por DataFrame.
+        :return: Gerador de DataFrames (ao menos um, possivelmente vazio).
+        """
         try:
-            reader = PdfReader(arquivo)
-            texto = ""
-            for page in reader.pages:
-                texto += page.extract_text()
-            return texto
+            bloco = []
+            gerou = False
+            for info in _notas_xml_incremental(arquivo):
+                bloco.append(info)
+                if len(bloco) >= tamanho_bloco:
+                    yield pd.DataFrame(bloco)
+                    bloco = []
+                    gerou = True
+            if bloco or not gerou:
+                yield pd.DataFrame(bloco)
+        except Exception as e:
+            raise ValueError(f"Erro ao carregar arquivo XML: {e}")
+
+    @staticmethod
+    def carregar_xml_tipado(arquivo, perfil=None):
+        """
+        Carrega NF-e/NFS-e com um perfil de extração (ver xml_profiles): uma
+        linha por item, sem namespaces nas colunas e com valores e datas já
+        convertidos para float64/datetime64.
+        :param arquivo: Caminho ou arquivo binário posicionável.
+        :param perfil: PerfilExtracao opcional; por padrão é detectado.
+        :return: DataFrame tipado.
+        """
+        try:
+            return extrair_xml_tipado(arquivo, perfil)
+        except Exception as e:
+            raise ValueError(f"Erro ao carregar arquivo XML: {e}")
+
+    @staticmethod
+    def carregar_pdf(arquivo, max_workers=None):
+        """
+        Extrai o texto do PDF (ver pdf_pipeline.extrair_paginas): páginas em
+        paralelo, OCR apenas nas páginas sem camada de texto e cache por página.
+        :param arquivo: Caminho, bytes ou arquivo binário do PDF.
+        :param max_workers: Número de processos; 1 extrai no processo atual.
+        :return: Texto das páginas concatenado, na ordem do documento.
+        """
+        try:
+            from pdf_pipeline import extrair_paginas
+
+            paginas = sorted(extrair_paginas(arquivo, max_workers=max_workers))
+            return "".join(pagina.texto for pagina in paginas)
+        except Exception as e:
+            raise ValueError(f"Erro ao carregar arquivo PDF: {e}")
+
+    @staticmethod
+    def carregar_pdf_notas(arquivo, max_workers=None):
+        """
+        Lê um lote de DANFEs em PDF (texto ou digitalizados) como DataFrame, com
+        as colunas do cabeçalho da NF-e de `carregar_xml_tipado`.
+        :param arquivo: Caminho, bytes ou arquivo binário do PDF.
+        :param max_workers: Número de processos; 1 extrai no processo atual.
+        :return: DataFrame com uma linha por nota.
+        """
+        try:
+            from pdf_pipeline import extrair_paginas, notas_de_paginas
+
+            paginas = sorted(extrair_paginas(arquivo, max_workers=max_workers))
+            return notas_de_paginas([pagina.texto for pagina in paginas])
         except Exception as e:
             raise ValueError(f"Erro ao carregar arquivo PDF: {e}")
 
     @staticmethod
     def carregar_imagem_com_ocr(arquivo):
         try:
+            import pytesseract
+            from PIL import Image
+
             imagem = Image.open(arquivo)
             texto = pytesseract.image_to_string(imagem, lang="por")
             return texto
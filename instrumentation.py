@@ -0,0 +1,350 @@
+# instrumentation.py
+
+from collections import deque, namedtuple
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+# Eventos mantidos em memória para o painel de diagnóstico
+MAX_EVENTOS = 1_000
+
+# Uma etapa concluída do pipeline. inicio: horário (epoch); memoria_bytes:
+# aumento do pico de memória alocada durante a etapa (None sem medição de
+# memória); atributos: medidas e rótulos extras (ex.: tamanho do prompt);
+# erro: nome da exceção, se a etapa falhou; pai: etapa que a continha
+Evento = namedtuple(
+    "Evento",
+    ["nome", "inicio", "segundos", "linhas", "bytes", "memoria_bytes", "atributos", "erro", "pai"],
+)
+
+
+class _EtapaInativa:
+    """
+    Etapa sem efeito, devolvida quando a instrumentação está desligada.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+    def registrar(self, linhas=None, tamanho_bytes=None, **atributos):
+        pass
+
+
+_INATIVA = _EtapaInativa()
+
+
+class Etapa:
+    """
+    Mede uma etapa (bloco `with`): tempo de parede, linhas e bytes
+    processados, aumento do pico de memória e atributos informados em `registrar`.
+    """
+
+    def __init__(self, instrumentacao, nome, atributos):
+        self._instrumentacao = instrumentacao
+        self.nome = nome
+        self.atributos = atributos
+        self.linhas = None
+        self.tamanho_bytes = None
+        self._pico_filhas = 0
+
+    def registrar(self, linhas=None, tamanho_bytes=None, **atributos):
+        """
+        Informa o volume processado e atributos extras da etapa.
+        :param linhas: Linhas processadas.
+        :param tamanho_bytes: Bytes lidos ou gravados.
+        """
+        if linhas is not None:
+            self.linhas = int(linhas)
+        if tamanho_bytes is not None:
+            self.tamanho_bytes = int(tamanho_bytes)
+        self.atributos.update(atributos)
+
+    def __enter__(self):
+        pilha = self._instrumentacao._pilha()
+        self._pai = pilha[-1] if pilha else None
+        pilha.append(self)
+        self._medir_memoria = self._instrumentacao.memoria and tracemalloc.is_tracing()
+        if self._medir_memoria:
+            # O pico do processo é zerado a cada etapa; o da etapa que contém
+            # esta é recomposto com o pico das filhas ao final delas
+            self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.inicio = time.time()
+        self._relogio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, erro, rastreamento):
+        segundos = time.perf_counter() - self._relogio
+        memoria = None
+        if self._medir_memoria and tracemalloc.is_tracing():
+            pico = max(tracemalloc.get_traced_memory()[1], self._pico_filhas)
+            memoria = max(pico - self._memoria_inicial, 0)
+            if self._pai is not None:
+                self._pai._pico_filhas = max(self._pai._pico_filhas, pico)
+        self._instrumentacao._pilha().pop()
+        self._instrumentacao.emitir(
+            Evento(
+                self.nome,
+                self.inicio,
+                segundos,
+                self.linhas,
+                self.tamanho_bytes,
+                memoria,
+                dict(self.atributos),
+                tipo.__name__ if tipo is not None else None,
+                self._pai.nome if self._pai is not None else None,
+            )
+        )
+        return False
+
+
+class Instrumentacao:
+    """
+    Coleta as etapas do pipeline quando ativa; desligada, `etapa` devolve um
+    contexto vazio e o custo é o de uma verificação de atributo.
+
+    Os eventos ficam em um buffer circular (painel de diagnóstico), são
+    entregues aos assinantes (fluxo de eventos, ex.: GravadorEventos) e
+    acumulados por etapa para o texto no formato do Prometheus. A medição de
+    memória usa o tracemalloc, que deixa o processo mais lento; por isso é
+    ligada à parte. O pico de memória é do processo: com várias sessões
+    simultâneas, etapas concorrentes entram umas nas medidas das outras.
+    """
+
+    def __init__(self, ativa=False, memoria=False, max_eventos=MAX_EVENTOS):
+        """
+        :param ativa: Liga a coleta de etapas.
+        :param memoria: Mede o pico de memória das etapas (inicia o tracemalloc).
+        :param max_eventos: Eventos guardados para consulta.
+        """
+        self.ativa = False
+        self.memoria = False
+        self._eventos = deque(maxlen=max_eventos)
+        self._agregados = {}  # etapa -> dicionário de totais
+        self._assinantes = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.configurar(ativa, memoria)
+
+    def configurar(self, ativa=None, memoria=None):
+        """
+        Liga ou desliga a coleta e a medição de memória (None mantém o estado atual).
+        """
+        if memoria is not None:
+            if memoria and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            elif not memoria and self.memoria and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self.memoria = memoria
+        if ativa is not None:
+            self.ativa = ativa
+
+    def _pilha(self):
+        pilha = getattr(self._local, "pilha", None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def etapa(self, nome, **atributos):
+        """
+        Contexto que mede uma etapa.
+        :param nome: Nome da etapa (ex.: "validar_arquivo").
+        :param atributos: Rótulos da etapa (ex.: formato="csv").
+        :return: Etapa (ou contexto vazio, se a instrumentação está desligada).
+        """
+        if not self.ativa:
+            return _INATIVA
+        return Etapa(self, nome, atributos)
+
+    def emitir(self, evento: Evento):
+        """
+        Registra um evento concluído e o entrega aos assinantes.
+        """
+        with self._lock:
+            self._eventos.append(evento)
+            totais = self._agregados.setdefault(
+                evento.nome,
+                {"chamadas": 0, "segundos": 0.0, "linhas": 0, "bytes": 0, "erros": 0,
+                 "memoria_max": 0, "medidas": {}},
+            )
+            totais["chamadas"] += 1
+            totais["segundos"] += evento.segundos
+            totais["linhas"] += evento.linhas or 0
+            totais["bytes"] += evento.bytes or 0
+            totais["erros"] += evento.erro is not None
+            totais["memoria_max"] = max(totais["memoria_max"], evento.memoria_bytes or 0)
+            for nome, valor in evento.atributos.items():
+                if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                    totais["medidas"][nome] = totais["medidas"].get(nome, 0) + valor
+            assinantes = list(self._assinantes)
+        for assinante in assinantes:
+            try:
+                assinante(evento)
+            except Exception as e:
+                logging.warning("Falha no assinante de eventos %r: %s", assinante, e)
+
+    def assinar(self, assinante):
+        """
+        Inscreve uma função chamada com cada Evento concluído.
+        :return: O próprio assinante (para `cancelar`).
+        """
+        with self._lock:
+            self._assinantes.append(assinante)
+        return assinante
+
+    def cancelar(self, assinante):
+        with self._lock:
+            self._assinantes.remove(assinante)
+
+    def eventos(self, limite=None) -> list:
+        """
+        Eventos mais recentes, do mais antigo para o mais novo.
+        """
+        with self._lock:
+            eventos = list(self._eventos)
+        return eventos if limite is None else eventos[-limite:]
+
+    def agregados(self) -> dict:
+        """
+        Totais por etapa: chamadas, segundos, linhas, bytes, erros, maior
+        aumento de memória e a soma dos atributos numéricos ("medidas").
+        """
+        with self._lock:
+            return {
+                nome: {**totais, "medidas": dict(totais["medidas"])}
+                for nome, totais in self._agregados.items()
+            }
+
+    def limpar(self):
+        with self._lock:
+            self._eventos.clear()
+            self._agregados.clear()
+
+    def texto_prometheus(self) -> str:
+        """
+        Totais por etapa no formato de exposição de texto do Prometheus.
+        """
+        agregados = self.agregados()
+
+        def rotulo(texto):
+            return str(texto).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        metricas = [
+            ("chatfiscal_etapa_segundos", "summary", "Tempo de parede das etapas.", None),
+            ("chatfiscal_etapa_linhas_total", "counter", "Linhas processadas.", "linhas"),
+            ("chatfiscal_etapa_bytes_total", "counter", "Bytes lidos ou gravados.", "bytes"),
+            ("chatfiscal_etapa_erros_total", "counter", "Etapas encerradas com erro.", "erros"),
+            ("chatfiscal_etapa_memoria_pico_bytes", "gauge",
+             "Maior aumento do pico de memória alocada.", "memoria_max"),
+        ]
+        linhas = []
+        for nome, tipo, ajuda, campo in metricas:
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+            for etapa, totais in sorted(agregados.items()):
+                if campo is None:
+                    linhas.append(f'{nome}_count{{etapa="{rotulo(etapa)}"}} {totais["chamadas"]}')
+                    linhas.append(f'{nome}_sum{{etapa="{rotulo(etapa)}"}} {totais["segundos"]:.6f}')
+                else:
+                    linhas.append(f'{nome}{{etapa="{rotulo(etapa)}"}} {totais[campo]}')
+        nome = "chatfiscal_etapa_medida_total"
+        linhas += [f"# HELP {nome} Soma dos atributos numéricos das etapas.", f"# TYPE {nome} counter"]
+        for etapa, totais in sorted(agregados.items()):
+            for medida, valor in sorted(totais["medidas"].items()):
+                linhas.append(f'{nome}{{etapa="{rotulo(etapa)}",medida="{rotulo(medida)}"}} {valor}')
+        return "\n".join(linhas) + "\n"
+
+    def gravar_prometheus(self, caminho):
+        """
+        Grava o texto do Prometheus em arquivo (ex.: para o textfile collector
+        do node_exporter), substituindo o anterior de forma atômica.
+        """
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.texto_prometheus())
+        os.replace(temporario, caminho)
+
+    def servir_prometheus(self, porta, endereco="127.0.0.1"):
+        """
+        Serve o texto do Prometheus em http://endereco:porta/metrics, em uma
+        thread de fundo.
+        :return: ThreadingHTTPServer (use `shutdown()` para encerrar).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        instrumentacao = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                corpo = instrumentacao.texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((endereco, porta), Manipulador)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return servidor
+
+
+class GravadorEventos:
+    """
+    Assinante que grava cada evento como uma linha JSON (fluxo de eventos).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+    def __call__(self, evento: Evento):
+        registro = json.dumps(evento._asdict(), ensure_ascii=False, default=str)
+        with self._lock, open(self.caminho, "a", encoding="utf-8") as arquivo:
+            arquivo.write(registro + "\n")
+
+
+def evento_para_dict(evento: Evento) -> dict:
+    """
+    Evento como dicionário plano (atributos no mesmo nível), para tabelas.
+    """
+    registro = evento._asdict()
+    return {**{k: v for k, v in registro.items() if k != "atributos"}, **registro["atributos"]}
+
+
+# Instância do processo, configurada pelas variáveis de ambiente:
+# CHATFISCAL_INSTRUMENTACAO=1 liga a coleta; CHATFISCAL_INSTRUMENTACAO_MEMORIA=1
+# mede memória; CHATFISCAL_EVENTOS grava o fluxo de eventos (JSON Lines);
+# CHATFISCAL_METRICAS_ARQUIVO grava o texto do Prometheus a cada evento
+# (o app também lê CHATFISCAL_METRICAS_PORTA para servi-lo por HTTP)
+INSTRUMENTACAO = Instrumentacao(
+    ativa=os.getenv("CHATFISCAL_INSTRUMENTACAO", "0") == "1",
+    memoria=os.getenv("CHATFISCAL_INSTRUMENTACAO_MEMORIA", "0") == "1",
+)
+if os.getenv("CHATFISCAL_EVENTOS"):
+    INSTRUMENTACAO.assinar(GravadorEventos(os.getenv("CHATFISCAL_EVENTOS")))
+if os.getenv("CHATFISCAL_METRICAS_ARQUIVO"):
+    INSTRUMENTACAO.assinar(
+        lambda _: INSTRUMENTACAO.gravar_prometheus(os.getenv("CHATFISCAL_METRICAS_ARQUIVO"))
+    )
+
+
+def etapa(nome, **atributos):
+    """
+    Mede uma etapa na instância do processo (ver Instrumentacao.etapa).
+    """
+    if not INSTRUMENTACAO.ativa:
+        return _INATIVA
+    return Etapa(INSTRUMENTACAO, nome, atributos)
@@ -0,0 +1,234 @@
+# kpi_rollup.py
+
+from collections import OrderedDict
+import threading
+import numpy as np
+import pandas as pd
+from conversores import converter_data_br, converter_decimal_br
+from query_planner import ALTERNATIVAS_COLUNAS, ALTERNATIVAS_TRIBUTOS, detectar_coluna
+
+# Mudar a versão invalida os cubos gravados no cache de leitura
+VERSAO_CUBO = 1
+
+# Dimensões do cubo, na ordem de detalhamento do painel
+DIMENSOES_KPI = ("emitente", "cfop", "uf", "mes")
+
+# Rótulo das linhas sem a informação (ou de arquivos sem a coluna)
+SEM_INFORMACAO = "(não informado)"
+
+# Consultas (fatias) guardadas por cubo
+MAX_CONSULTAS_CACHE = 128
+
+
+def chave_cubo(chave) -> str:
+    """
+    Chave do cubo de um arquivo no cache de leitura, ao lado do DataFrame lido.
+    :param chave: Chave de conteúdo do arquivo (ou sua impressão digital).
+    """
+    return f"{chave}-kpi{VERSAO_CUBO}"
+
+
+def _dimensao(df: pd.DataFrame, nome: str):
+    """
+    Códigos e rótulos de uma dimensão: os valores são fatorados e só os
+    distintos viram texto (o último rótulo é SEM_INFORMACAO).
+    :return: (códigos por linha, array de rótulos).
+    """
+    coluna = detectar_coluna(df, ALTERNATIVAS_COLUNAS["data" if nome == "mes" else nome])
+    if coluna is None:
+        return np.zeros(len(df), dtype=np.intp), np.array([SEM_INFORMACAO], dtype=object)
+    if nome == "mes":
+        meses = converter_data_br(df[coluna]).to_numpy(dtype="datetime64[ns]")
+        codigos, unicos = pd.factorize(meses.astype("datetime64[M]"))
+        rotulos = np.datetime_as_string(np.asarray(unicos, dtype="datetime64[M]"), unit="M")
+    else:
+        codigos, unicos = pd.factorize(df[coluna])
+        rotulos = [str(valor) for valor in unicos]
+    rotulos = np.append(np.asarray(rotulos, dtype=object), SEM_INFORMACAO)
+    return np.where(codigos < 0, len(rotulos) - 1, codigos), rotulos
+
+
+def _medidas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Colunas somadas no cubo: linhas, valor e cada tributo presente nos dados.
+    """
+    medidas = {"linhas": pd.Series(1, index=df.index, dtype="int64")}
+    coluna_valor = detectar_coluna(df, ALTERNATIVAS_COLUNAS["valor"])
+    if coluna_valor is not None:
+        medidas["valor"] = converter_decimal_br(df[coluna_valor])
+    for tributo, alternativas in ALTERNATIVAS_TRIBUTOS.items():
+        coluna = detectar_coluna(df, alternativas)
+        if coluna is not None:
+            medidas[tributo] = converter_decimal_br(df[coluna])
+    return pd.DataFrame(medidas, index=df.index)
+
+
+def _somar(tabela: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma as medidas por combinação de dimensões, com as dimensões categóricas.
+    """
+    agregado = tabela.groupby(list(DIMENSOES_KPI), observed=True, sort=False).sum()
+    agregado = agregado.reset_index()
+    for nome in DIMENSOES_KPI:
+        if not isinstance(agregado[nome].dtype, pd.CategoricalDtype):
+            agregado[nome] = agregado[nome].astype("category")
+        agregado[nome] = agregado[nome].cat.remove_unused_categories()
+    return agregado
+
+
+class CuboKPI:
+    """
+    Totais fiscais (linhas, valor e tributos) pré-agregados por emitente,
+    CFOP, UF e mês. O cubo tem uma linha por combinação existente dessas
+    dimensões, de modo que as fatias e detalhamentos do painel são somas sobre
+    alguns milhares de linhas, qualquer que seja o tamanho dos dados.
+    Cubos de arquivos diferentes são combinados somando as medidas.
+    """
+
+    def __init__(self, tabela: pd.DataFrame):
+        """
+        :param tabela: DataFrame com as colunas de DIMENSOES_KPI e as medidas.
+        """
+        self.tabela = tabela
+        self._consultas = OrderedDict()  # argumentos -> DataFrame
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def de_dataframe(df: pd.DataFrame) -> "CuboKPI":
+        """
+        Materializa o cubo a partir das notas.
+        :param df: DataFrame carregado.
+        """
+        tabela = _medidas(df)
+        rotulos = {}
+        for nome in DIMENSOES_KPI:
+            tabela[nome], rotulos[nome] = _dimensao(df, nome)
+        # Soma pelos códigos e só então troca pelos rótulos, que podem coincidir
+        tabela = tabela.groupby(list(DIMENSOES_KPI), sort=False).sum().reset_index()
+        for nome in DIMENSOES_KPI:
+            tabela[nome] = rotulos[nome][tabela[nome].to_numpy()]
+        return CuboKPI(_somar(tabela))
+
+    @staticmethod
+    def combinar(cubos) -> "CuboKPI":
+        """
+        Cubo de um conjunto de arquivos, a partir dos cubos de cada um.
+        Medidas ausentes em algum arquivo contam como zero nele.
+        """
+        tabelas = [cubo.tabela for cubo in cubos]
+        if not tabelas:
+            return CuboKPI(_somar(pd.DataFrame(columns=[*DIMENSOES_KPI, "linhas"])))
+        if len(tabelas) == 1:
+            return CuboKPI(tabelas[0])
+        # Mesmas categorias em todos os cubos: a soma agrupa pelos códigos
+        tabelas = [tabela.copy(deep=False) for tabela in tabelas]
+        for nome in DIMENSOES_KPI:
+            categorias = pd.Index([], dtype="str")
+            for tabela in tabelas:
+                categorias = categorias.union(tabela[nome].cat.categories.astype("str"))
+            for tabela in tabelas:
+                tabela[nome] = tabela[nome].cat.set_categories(categorias)
+        tabela = pd.concat(tabelas, ignore_index=True)
+        medidas = [c for c in tabela.columns if c not in DIMENSOES_KPI]
+        tabela[medidas] = tabela[medidas].fillna(0)
+        tabela["linhas"] = tabela["linhas"].astype("int64")
+        return CuboKPI(_somar(tabela))
+
+    @property
+    def medidas(self) -> list:
+        """
+        Medidas do cubo: "linhas", "valor" (se houver coluna de valor) e os tributos.
+        """
+        return [c for c in self.tabela.columns if c not in DIMENSOES_KPI]
+
+    @property
+    def dimensoes(self) -> list:
+        """
+        Dimensões com alguma informação nos dados.
+        """
+        return [
+            nome for nome in DIMENSOES_KPI
+            if (self.tabela[nome].astype("str") != SEM_INFORMACAO).any()
+        ]
+
+    def _filtrar(self, filtros) -> pd.DataFrame:
+        tabela = self.tabela
+        for nome, valores in (filtros or {}).items():
+            if isinstance(valores, str):
+                valores = [valores]
+            tabela = tabela[tabela[nome].isin(valores)]
+        return tabela
+
+    def fatiar(self, por=(), filtros=None, limite=None) -> pd.DataFrame:
+        """
+        Totais das medidas por uma ou mais dimensões, dentro de um filtro.
+        Categorias vêm do maior para o menor valor (mês em ordem cronológica).
+        :param por: Dimensão ou lista de dimensões; vazio retorna o total geral.
+        :param filtros: Dicionário {dimensão: valor ou lista de valores}.
+        :param limite: Máximo de linhas no resultado.
+        :return: DataFrame com as dimensões pedidas e as medidas.
+        """
+        por = (por,) if isinstance(por, str) else tuple(por)
+        chave = (
+            por,
+            tuple(sorted((nome, str(valores)) for nome, valores in (filtros or {}).items())),
+            limite,
+        )
+        with self._lock:
+            if chave in self._consultas:
+                self._consultas.move_to_end(chave)
+                return self._consultas[chave].copy()
+
+        tabela = self._filtrar(filtros)
+        medidas = self.medidas
+        if not por:
+            resultado = tabela[medidas].sum().to_frame().T.astype(tabela[medidas].dtypes)
+        else:
+            resultado = tabela.groupby(list(por), observed=True)[medidas].sum().reset_index()
+            for nome in por:
+                resultado[nome] = resultado[nome].astype("str")
+            if por == ("mes",):
+                resultado = resultado.sort_values("mes")
+            else:
+                ordem = "valor" if "valor" in medidas else "linhas"
+                resultado = resultado.sort_values(ordem, ascending=False, kind="stable")
+            resultado = resultado.reset_index(drop=True)
+        if limite is not None:
+            resultado = resultado.head(limite)
+
+        with self._lock:
+            self._consultas[chave] = resultado
+            while len(self._consultas) > MAX_CONSULTAS_CACHE:
+                self._consultas.popitem(last=False)
+        return resultado.copy()
+
+    def totais(self, filtros=None) -> pd.Series:
+        """
+        Total de cada medida dentro do filtro.
+        :return: Series indexada pelo nome da medida.
+        """
+        return self.fatiar((), filtros).iloc[0]
+
+    def valores(self, dimensao: str, filtros=None) -> list:
+        """
+        Valores de uma dimensão presentes dentro do filtro, para os seletores
+        de detalhamento (do maior para o menor valor; meses em ordem).
+        """
+        return self.fatiar(dimensao, filtros)[dimensao].tolist()
+
+
+def cubo_particao(chave, df: pd.DataFrame, cache=None) -> CuboKPI:
+    """
+    Cubo de um arquivo, lido do cache de leitura quando já materializado.
+    :param chave: Chave de conteúdo do arquivo (ou sua impressão digital).
+    :param df: DataFrame do arquivo.
+    :param cache: CacheLeitura opcional; o cubo é gravado ao lado do arquivo lido.
+    """
+    if cache is None:
+        return CuboKPI.de_dataframe(df)
+    tabela = cache.obter(chave_cubo(chave))
+    if tabela is not None:
+        return CuboKPI(tabela)
+    cubo = CuboKPI.de_dataframe(df)
+    cache.salvar(chave_cubo(chave), cubo.tabela)
+    return cubo
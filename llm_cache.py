@@ -0,0 +1,153 @@
+# llm_cache.py
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import hashlib
+import threading
+import time
+
+
+def normalizar_prompt(prompt: str) -> str:
+    """
+    Normaliza o prompt para a chave do cache: espaços repetidos e diferenças
+    de maiúsculas e minúsculas não geram chamadas novas.
+    """
+    return " ".join(prompt.split()).casefold()
+
+
+def chave_resposta(modelo: str, prompt: str, fingerprint: str) -> str:
+    """
+    Gera a chave de cache de uma resposta.
+    :param modelo: Nome do modelo consultado.
+    :param prompt: Prompt enviado (é normalizado antes do hash).
+    :param fingerprint: Impressão digital do conjunto de dados.
+    :return: Chave hexadecimal.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for parte in (modelo, normalizar_prompt(prompt), fingerprint):
+        h.update(parte.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class CacheRespostas:
+    """
+    Cache das respostas da LLM com validade (TTL) e descarte LRU por quantidade
+    de entradas.
+
+    Pedidos idênticos simultâneos são agrupados: apenas o primeiro chama o
+    modelo e os demais aguardam o mesmo resultado. Falhas não são guardadas.
+    É seguro para uso simultâneo por várias sessões.
+    """
+
+    def __init__(self, ttl_segundos=3600, max_entradas=256, relogio=time.monotonic):
+        """
+        :param ttl_segundos: Validade de cada resposta; None para não expirar.
+        :param max_entradas: Quantidade máxima de respostas guardadas.
+        :param relogio: Função que devolve o instante atual, em segundos.
+        """
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self.relogio = relogio
+        self.entradas = OrderedDict()  # chave -> (resposta, expira_em)
+        self.em_andamento = {}  # chave -> Future
+        self.acertos = 0
+        self.falhas = 0
+        self.agrupadas = 0
+        self.expiradas = 0
+        self.lock = threading.Lock()
+
+    def _valida(self, chave):
+        resposta, expira_em = self.entradas[chave]
+        if expira_em is not None and self.relogio() >= expira_em:
+            del self.entradas[chave]
+            self.expiradas += 1
+            return None
+        self.entradas.move_to_end(chave)
+        return resposta
+
+    def obter_ou_gerar(self, chave, gerar):
+        """
+        Devolve a resposta em cache ou chama `gerar` uma única vez por chave.
+        :param chave: Chave gerada por `chave_resposta`.
+        :param gerar: Função sem argumentos que consulta o modelo.
+        :return: Texto da resposta.
+        """
+        with self.lock:
+            if chave in self.entradas:
+                resposta = self._valida(chave)
+                if resposta is not None:
+                    self.acertos += 1
+                    return resposta
+            futuro = self.em_andamento.get(chave)
+            responsavel = futuro is None
+            if responsavel:
+                futuro = self.em_andamento[chave] = Future()
+                self.falhas += 1
+            else:
+                self.agrupadas += 1
+
+        if not responsavel:
+            return futuro.result()
+
+        try:
+            resposta = gerar()
+        except BaseException as e:
+            with self.lock:
+                del self.em_andamento[chave]
+            futuro.set_exception(e)
+            raise
+
+        with self.lock:
+            self._guardar(chave, resposta)
+            del self.em_andamento[chave]
+        futuro.set_result(resposta)
+        return resposta
+
+    def obter(self, chave):
+        """
+        Consulta o cache sem gerar a resposta.
+        :return: Texto da resposta ou None se ausente ou expirada.
+        """
+        with self.lock:
+            resposta = self._valida(chave) if chave in self.entradas else None
+            if resposta is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+            return resposta
+
+    def salvar(self, chave, resposta):
+        """
+        Guarda uma resposta gerada fora de `obter_ou_gerar` (ex.: em lote).
+        """
+        with self.lock:
+            self._guardar(chave, resposta)
+
+    def _guardar(self, chave, resposta):
+        expira_em = None if self.ttl_segundos is None else self.relogio() + self.ttl_segundos
+        self.entradas[chave] = (resposta, expira_em)
+        self.entradas.move_to_end(chave)
+        while len(self.entradas) > self.max_entradas:
+            self.entradas.popitem(last=False)
+
+    def limpar(self):
+        """
+        Remove todas as respostas guardadas (as métricas são mantidas).
+        """
+        with self.lock:
+            self.entradas.clear()
+
+    def estatisticas(self):
+        """
+        :return: Dicionário com entradas, acertos, falhas, pedidos agrupados e expirados.
+        """
+        with self.lock:
+            return {
+                "entradas": len(self.entradas),
+                "max_entradas": self.max_entradas,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "agrupadas": self.agrupadas,
+                "expiradas": self.expiradas,
+            }
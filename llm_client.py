@@ -0,0 +1,308 @@
+# llm_client.py
+
+import asyncio
+import queue
+import random
+import threading
+import time
+
+_FIM = object()
+
+
+class ErroLimiteTaxa(Exception):
+    """
+    Limite de requisições do provedor atingido (HTTP 429 / 503).
+    """
+
+
+def _eh_limite_taxa(erro) -> bool:
+    if isinstance(erro, ErroLimiteTaxa):
+        return True
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return False
+    return isinstance(
+        erro,
+        (exceptions.ResourceExhausted, exceptions.TooManyRequests, exceptions.ServiceUnavailable),
+    )
+
+
+class BackendGemini:
+    """
+    Backend do Google Gemini. A instância do modelo é criada na primeira
+    chamada e reutilizada nas seguintes.
+    """
+
+    def __init__(self, nome_modelo="gemini-pro-latest", api_key=None):
+        """
+        :param nome_modelo: Modelo do Gemini.
+        :param api_key: Chave da API, configurada junto com o modelo (a biblioteca
+            do Gemini só é importada na primeira chamada).
+        """
+        self.nome_modelo = nome_modelo
+        self.api_key = api_key
+        self.modelo = None
+
+    def _modelo(self):
+        if self.modelo is None:
+            import google.generativeai as genai
+
+            if self.api_key:
+                genai.configure(api_key=self.api_key)
+            self.modelo = genai.GenerativeModel(self.nome_modelo)
+        return self.modelo
+
+    async def gerar(self, prompt: str) -> str:
+        resposta = await self._modelo().generate_content_async(prompt)
+        return resposta.text
+
+    async def gerar_stream(self, prompt: str):
+        resposta = await self._modelo().generate_content_async(prompt, stream=True)
+        async for trecho in resposta:
+            if trecho.text:
+                yield trecho.text
+
+
+class BackendFalso:
+    """
+    Backend local, sem rede, para testes e benchmarks: responde após
+    `latencia` segundos e pode simular erros de limite de taxa. No modo
+    streaming, a resposta é entregue palavra a palavra.
+    """
+
+    def __init__(self, latencia=0.05, falhas_limite_taxa=0, responder=None, latencia_trecho=0.0):
+        """
+        :param latencia: Tempo de resposta simulado, em segundos (no streaming,
+            tempo até o primeiro trecho).
+        :param falhas_limite_taxa: Quantidade de chamadas iniciais que falham
+            com ErroLimiteTaxa.
+        :param responder: Função prompt -> texto; o padrão ecoa o prompt.
+        :param latencia_trecho: Intervalo entre os trechos do streaming.
+        """
+        self.nome_modelo = "falso"
+        self.latencia = latencia
+        self.falhas_limite_taxa = falhas_limite_taxa
+        self.responder = responder or (lambda prompt: f"Resposta: {prompt[-80:].strip()}")
+        self.latencia_trecho = latencia_trecho
+        self.chamadas = 0
+        self.em_execucao = 0
+        self.max_em_execucao = 0
+
+    def _iniciar(self):
+        self.chamadas += 1
+        if self.chamadas <= self.falhas_limite_taxa:
+            raise ErroLimiteTaxa("429 limite de requisições atingido")
+        self.em_execucao += 1
+        self.max_em_execucao = max(self.max_em_execucao, self.em_execucao)
+
+    async def gerar(self, prompt: str) -> str:
+        self._iniciar()
+        try:
+            await asyncio.sleep(self.latencia)
+            return self.responder(prompt)
+        finally:
+            self.em_execucao -= 1
+
+    async def gerar_stream(self, prompt: str):
+        self._iniciar()
+        try:
+            await asyncio.sleep(self.latencia)
+            palavras = self.responder(prompt).split(" ")
+            for i, palavra in enumerate(palavras):
+                if i:
+                    await asyncio.sleep(self.latencia_trecho)
+                yield palavra if i == len(palavras) - 1 else palavra + " "
+        finally:
+            self.em_execucao -= 1
+
+
+class ClienteLLM:
+    """
+    Cliente reutilizável da LLM, com API assíncrona e síncrona.
+
+    Todas as chamadas rodam em um event loop dedicado, em segundo plano, que
+    mantém o backend (e a conexão do modelo) vivo entre chamadas e aplica um
+    limite global de chamadas simultâneas, válido para todas as sessões.
+    Cada tentativa tem timeout próprio; erros de limite de taxa são repetidos
+    com espera exponencial com jitter. No streaming, o timeout vale para a
+    espera de cada trecho e só há nova tentativa antes do primeiro trecho.
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_concorrentes=4,
+        timeout_segundos=60.0,
+        tentativas=3,
+        espera_base=1.0,
+        espera_maxima=30.0,
+    ):
+        """
+        :param backend: Objeto com `async gerar(prompt) -> str` e, para o
+            streaming, o gerador assíncrono `gerar_stream(prompt)`.
+        :param max_concorrentes: Chamadas simultâneas permitidas ao backend.
+        :param timeout_segundos: Tempo máximo de cada tentativa.
+        :param tentativas: Total de tentativas por prompt.
+        :param espera_base: Espera inicial antes de repetir, em segundos.
+        :param espera_maxima: Limite da espera entre tentativas.
+        """
+        self.backend = backend
+        self.max_concorrentes = max_concorrentes
+        self.timeout_segundos = timeout_segundos
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.chamadas = 0
+        self.retentativas = 0
+        self.timeouts = 0
+        self.tempo_primeiro_trecho = None
+        self._loop = None
+        self._semaforo = None
+        self._lock = threading.Lock()
+
+    def _submeter(self, coro):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._semaforo = asyncio.Semaphore(self.max_concorrentes)
+                threading.Thread(
+                    target=self._loop.run_forever, name="cliente-llm", daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _gerar(self, prompt):
+        for tentativa in range(self.tentativas):
+            try:
+                async with self._semaforo:
+                    self.chamadas += 1
+                    return await asyncio.wait_for(
+                        self.backend.gerar(prompt), self.timeout_segundos
+                    )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise TimeoutError(
+                    f"A LLM não respondeu em {self.timeout_segundos:g} segundos."
+                ) from None
+            except Exception as e:
+                if tentativa + 1 >= self.tentativas or not _eh_limite_taxa(e):
+                    raise
+                self.retentativas += 1
+            espera = min(self.espera_maxima, self.espera_base * 2**tentativa)
+            await asyncio.sleep(random.uniform(0, espera))
+
+    async def _stream(self, prompt, entregar):
+        for tentativa in range(self.tentativas):
+            recebidos = 0
+            try:
+                async with self._semaforo:
+                    self.chamadas += 1
+                    inicio = time.perf_counter()
+                    trechos = self.backend.gerar_stream(prompt).__aiter__()
+                    try:
+                        while True:
+                            try:
+                                trecho = await asyncio.wait_for(
+                                    trechos.__anext__(), self.timeout_segundos
+                                )
+                            except StopAsyncIteration:
+                                return
+                            if not recebidos:
+                                self.tempo_primeiro_trecho = time.perf_counter() - inicio
+                            recebidos += 1
+                            entregar(trecho)
+                    finally:
+                        await trechos.aclose()
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise TimeoutError(
+                    f"A LLM não respondeu em {self.timeout_segundos:g} segundos."
+                ) from None
+            except Exception as e:
+                if recebidos or tentativa + 1 >= self.tentativas or not _eh_limite_taxa(e):
+                    raise
+                self.retentativas += 1
+            espera = min(self.espera_maxima, self.espera_base * 2**tentativa)
+            await asyncio.sleep(random.uniform(0, espera))
+
+    async def _gerar_lote(self, prompts):
+        return await asyncio.gather(*(self._gerar(p) for p in prompts), return_exceptions=True)
+
+    async def gerar(self, prompt: str) -> str:
+        """
+        Gera a resposta de um prompt (pode ser aguardada de qualquer event loop).
+        """
+        return await asyncio.wrap_future(self._submeter(self._gerar(prompt)))
+
+    async def gerar_lote(self, prompts):
+        """
+        Gera as respostas de vários prompts de uma vez, respeitando o limite
+        de concorrência.
+        :return: Lista na ordem dos prompts; prompts que falharam trazem a exceção.
+        """
+        return await asyncio.wrap_future(self._submeter(self._gerar_lote(list(prompts))))
+
+    async def gerar_stream(self, prompt: str):
+        """
+        Gera a resposta em trechos de texto, entregues assim que chegam.
+        """
+        loop = asyncio.get_running_loop()
+        fila = asyncio.Queue()
+        futuro = self._submeter(
+            self._stream(prompt, lambda t: loop.call_soon_threadsafe(fila.put_nowait, t))
+        )
+        futuro.add_done_callback(lambda _: loop.call_soon_threadsafe(fila.put_nowait, _FIM))
+        try:
+            while (trecho := await fila.get()) is not _FIM:
+                yield trecho
+            futuro.result()
+        finally:
+            futuro.cancel()
+
+    def gerar_stream_sync(self, prompt: str):
+        """
+        Versão bloqueante de `gerar_stream`: gerador comum de trechos de texto.
+        """
+        fila = queue.Queue()
+        futuro = self._submeter(self._stream(prompt, fila.put))
+        futuro.add_done_callback(lambda _: fila.put(_FIM))
+        try:
+            while (trecho := fila.get()) is not _FIM:
+                yield trecho
+            futuro.result()
+        finally:
+            futuro.cancel()
+
+    def gerar_sync(self, prompt: str) -> str:
+        """
+        Versão bloqueante de `gerar`, para o script do Streamlit.
+        """
+        return self._submeter(self._gerar(prompt)).result()
+
+    def gerar_lote_sync(self, prompts):
+        """
+        Versão bloqueante de `gerar_lote`.
+        """
+        return self._submeter(self._gerar_lote(list(prompts))).result()
+
+    def fechar(self):
+        """
+        Encerra o event loop dedicado.
+        """
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+    def estatisticas(self):
+        """
+        :return: Dicionário com chamadas ao backend, retentativas, timeouts e
+            o tempo até o primeiro trecho do último streaming.
+        """
+        return {
+            "chamadas": self.chamadas,
+            "retentativas": self.retentativas,
+            "timeouts": self.timeouts,
+            "tempo_primeiro_trecho": self.tempo_primeiro_trecho,
+            "max_concorrentes": self.max_concorrentes,
+        }
@@ -1,42 +1,83 @@
+import logging
 import os
 import pandas as pd
 from dotenv import load_dotenv
-import google.generativeai as genai
+from data_profile import obter_perfil
+from instrumentation import etapa
+from llm_cache import CacheRespostas, chave_resposta
+from llm_client import BackendGemini, ClienteLLM
+from prompt_builder import estimar_tokens, montar_contexto
+from query_planner import executar_consultas, formatar_resultados
 
-# 🔐 Carrega a chave da API do arquivo .env
+# 🔐 Carrega as variáveis do arquivo .env (a chave da API só é usada na
+# primeira chamada ao modelo, ver BackendGemini)
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
-# 📊 Função para gerar resumo dos dados
-def gerar_resumo_dos_dados(df: pd.DataFrame) -> str:
-    colunas_numericas = df.select_dtypes(include="number")
+NOME_MODELO = "gemini-pro-latest"
 
-    resumo = f"""
-Colunas e tipos:
-{df.dtypes.to_string()}
+# 📏 Orçamento (estimado) de tokens para o resumo dos dados no prompt
+ORCAMENTO_TOKENS_DADOS = int(os.getenv("CHATFISCAL_PROMPT_TOKENS", "2000"))
 
-Estatísticas descritivas:
-{colunas_numericas.describe().to_string()}
+# ♻️ Respostas compartilhadas entre as sessões do processo
+CACHE_RESPOSTAS = CacheRespostas(
+    ttl_segundos=int(os.getenv("CHATFISCAL_LLM_CACHE_TTL", "3600")),
+    max_entradas=int(os.getenv("CHATFISCAL_LLM_CACHE_ENTRADAS", "256")),
+)
 
-Correlação entre variáveis:
-{colunas_numericas.corr().to_string()}
-"""
+_cliente_llm = None
+
+# 🔌 Cliente único do processo: modelo reutilizado e limite global de chamadas
+def obter_cliente_llm() -> ClienteLLM:
+    global _cliente_llm
+    if _cliente_llm is None:
+        _cliente_llm = ClienteLLM(
+            BackendGemini(NOME_MODELO, api_key=os.getenv("GEMINI_API_KEY")),
+            max_concorrentes=int(os.getenv("CHATFISCAL_LLM_CONCORRENCIA", "4")),
+            timeout_segundos=float(os.getenv("CHATFISCAL_LLM_TIMEOUT", "60")),
+        )
+    return _cliente_llm
+
+# 📊 Função para gerar resumo dos dados
+def gerar_resumo_dos_dados(df: pd.DataFrame) -> str:
+    # O perfil é calculado uma vez por conjunto de dados (ver data_profile)
+    with etapa("gerar_resumo_dos_dados") as medida:
+        resumo = obter_perfil(df).resumo()
+        medida.registrar(linhas=len(df), resumo_caracteres=len(resumo))
     return resumo
 
-# 🤖 Função principal que chama a LLM via Gemini
-def gerar_resposta_llm(pergunta: str, df: pd.DataFrame) -> str:
-    try:
-        model = genai.GenerativeModel("gemini-pro-latest")
-        resumo_dados = gerar_resumo_dos_dados(df)
+# 🧮 Contexto da pergunta: resumo compacto dentro do orçamento de tokens e,
+# quando a intenção é reconhecida, os resultados exatos calculados localmente
+def gerar_contexto_da_pergunta(pergunta: str, df: pd.DataFrame) -> str:
+    contexto = montar_contexto(pergunta, df, ORCAMENTO_TOKENS_DADOS)
+    resultados = executar_consultas(pergunta, df)
+    if not resultados:
+        return contexto.texto
+    return (
+        f"{contexto.texto}\n\n"
+        "Resultados calculados localmente (exatos, use-os sem recalcular):\n"
+        f"{formatar_resultados(resultados)}"
+    )
 
-        # 🎯 Estilo de resposta
-        if "(resposta curta)" in pergunta.lower():
-            estilo_instrucao = "- Responda de forma direta, objetiva e concisa. Use frases curtas e vá direto ao ponto."
-        else:
-            estilo_instrucao = "- Seja técnico, claro e forneça uma resposta equilibrada: nem muito longa, nem muito curta."
+# 🧠 Monta o prompt enviado à LLM
+def montar_prompt(pergunta: str, df: pd.DataFrame) -> str:
+    with etapa("montar_prompt") as medida:
+        prompt = _montar_prompt(pergunta, df)
+        medida.registrar(
+            linhas=len(df), prompt_caracteres=len(prompt), prompt_tokens=estimar_tokens(prompt)
+        )
+    return prompt
 
-        # 🧠 Prompt enviado à LLM
-        prompt = f"""
+def _montar_prompt(pergunta: str, df: pd.DataFrame) -> str:
+    resumo_dados = gerar_contexto_da_pergunta(pergunta, df)
+
+    # 🎯 Estilo de resposta
+    if "(resposta curta)" in pergunta.lower():
+        estilo_instrucao = "- Responda de forma direta, objetiva e concisa. Use frases curtas e vá direto ao ponto."
+    else:
+        estilo_instrucao = "- Seja técnico, claro e forneça uma resposta equilibrada: nem muito longa, nem muito curta."
+
+    # 🧠 Prompt enviado à LLM
+    prompt = f"""
 Você é um agente fiscal inteligente chamado ChatFiscal, especializado em documentos tributários brasileiros.
 
 Seu papel é analisar os dados fiscais enviados pelo usuário e responder perguntas com base nesses dados.
@@ -61,9 +102,86 @@ Resumo dos dados:
 Pergunta:
 {pergunta}
 """
+    logging.info("Prompt montado com ~%d tokens estimados", estimar_tokens(prompt))
+    return prompt
 
-        response = model.generate_content(prompt)
-        return response.text
+def _chave(cliente, prompt, df):
+    return chave_resposta(cliente.backend.nome_modelo, prompt, obter_perfil(df).fingerprint)
+
+# 🤖 Função principal que chama a LLM via Gemini
+# cliente substitui o cliente padrão (ex.: BackendFalso em testes sem acesso à API);
+# cache=None desativa o cache de respostas
+# stream=True devolve um gerador de trechos de texto (ver gerar_resposta_llm_stream)
+def gerar_resposta_llm(
+    pergunta: str, df: pd.DataFrame, cliente=None, cache=CACHE_RESPOSTAS, stream=False
+):
+    if stream:
+        return gerar_resposta_llm_stream(pergunta, df, cliente, cache)
+    try:
+        cliente = cliente or obter_cliente_llm()
+        prompt = montar_prompt(pergunta, df)
+        with etapa("chamada_llm", modelo=cliente.backend.nome_modelo) as medida:
+            chamou = []
+
+            def gerar():
+                chamou.append(True)
+                return cliente.gerar_sync(prompt)
+
+            resposta = gerar() if cache is None else cache.obter_ou_gerar(_chave(cliente, prompt, df), gerar)
+            medida.registrar(
+                prompt_caracteres=len(prompt),
+                resposta_caracteres=len(resposta),
+                do_cache=not chamou,
+            )
+        return resposta
 
     except Exception as e:
         return f"❌ Erro ao gerar resposta: {e}"
+
+# ⚡ Resposta em streaming: os trechos são entregues assim que o modelo os gera
+# e a resposta completa vai para o cache ao final
+def gerar_resposta_llm_stream(
+    pergunta: str, df: pd.DataFrame, cliente=None, cache=CACHE_RESPOSTAS
+):
+    try:
+        cliente = cliente or obter_cliente_llm()
+        prompt = montar_prompt(pergunta, df)
+        chave = _chave(cliente, prompt, df) if cache is not None else None
+        resposta = cache.obter(chave) if cache is not None else None
+        if resposta is not None:
+            yield resposta
+            return
+
+        trechos = []
+        with etapa("chamada_llm", modelo=cliente.backend.nome_modelo, streaming=True) as medida:
+            for trecho in cliente.gerar_stream_sync(prompt):
+                trechos.append(trecho)
+                yield trecho
+            medida.registrar(
+                prompt_caracteres=len(prompt), resposta_caracteres=sum(map(len, trechos))
+            )
+        if cache is not None:
+            cache.salvar(chave, "".join(trechos))
+
+    except Exception as e:
+        yield f"❌ Erro ao gerar resposta: {e}"
+
+# 📦 Várias perguntas de uma vez: as que não estão em cache vão juntas ao cliente
+def gerar_respostas_llm(
+    perguntas, df: pd.DataFrame, cliente=None, cache=CACHE_RESPOSTAS
+) -> list:
+    cliente = cliente or obter_cliente_llm()
+    prompts = [montar_prompt(pergunta, df) for pergunta in perguntas]
+    chaves = [_chave(cliente, prompt, df) for prompt in prompts]
+    respostas = [cache.obter(chave) if cache is not None else None for chave in chaves]
+
+    pendentes = [i for i, resposta in enumerate(respostas) if resposta is None]
+    geradas = cliente.gerar_lote_sync([prompts[i] for i in pendentes])
+    for i, resposta in zip(pendentes, geradas):
+        if isinstance(resposta, Exception):
+            respostas[i] = f"❌ Erro ao gerar resposta: {resposta}"
+            continue
+        if cache is not None:
+            cache.salvar(chaves[i], resposta)
+        respostas[i] = resposta
+    return respostas
@@ -0,0 +1 @@
+# main/__init__.py
@@ -0,0 +1,27 @@
+# main/dicas_corujito.py
+
+import logging
+from anomaly_detector import detectar_anomalias
+
+# Quantidade máxima de achados exibidos na dica
+MAX_ACHADOS_DICA = 3
+
+SEM_INCONSISTENCIAS = "✅ Nenhuma inconsistência aparente. Mas continue atento aos detalhes fiscais!"
+
+
+def gerar_dica_corujito(df, inicios_arquivos=None, achados=None) -> str:
+    """
+    Gera a dica do Corujito a partir dos achados mais graves nos dados
+    carregados (duplicidades, quase duplicidades e valores atípicos).
+    :param df: DataFrame carregado.
+    :param inicios_arquivos: Posição da primeira linha de cada arquivo do lote.
+    :param achados: Achados já calculados (ex.: AgentManager.detectar_anomalias);
+        se None, são calculados a partir de `df`.
+    :return: Texto da dica, com um achado por linha.
+    """
+    if achados is None:
+        achados = detectar_anomalias(df, inicios_arquivos)
+    logging.debug("Achados do Corujito: %s", achados)
+    if not achados:
+        return SEM_INCONSISTENCIAS
+    return "\n".join(achado.mensagem for achado in achados[:MAX_ACHADOS_DICA])
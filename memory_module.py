@@ -1,34 +1,64 @@
 # memory_module.py
 
-import threading
+import uuid
+import weakref
+from dataset_store import obter_armazem_padrao
 
 
 class MemoriaCompartilhada:
     """
     Classe para gerenciar memória compartilhada entre os módulos.
+
+    Os valores ficam no ArmazemDados do processo, separados por sessão: DataFrames
+    idênticos de sessões diferentes ocupam memória uma única vez e podem ir
+    para o disco quando o orçamento de memória é excedido. Os valores da
+    sessão são liberados quando esta instância é descartada. Leituras de
+    várias threads não disputam lock entre si, e cada valor salvo recebe uma
+    versão para detectar mudanças sem copiar os dados.
     """
 
-    def __init__(self):
-        self.dados = {}
-        self.lock = threading.Lock()
+    def __init__(self, sessao=None, armazem=None):
+        """
+        :param sessao: Identificador da sessão; se None, é gerado um novo.
+        :param armazem: ArmazemDados a usar; se None, o armazém padrão do processo.
+        """
+        self.sessao = sessao or uuid.uuid4().hex
+        self.armazem = armazem or obter_armazem_padrao()
+        weakref.finalize(self, self.armazem.descartar_sessao, self.sessao)
 
     def salvar(self, chave, valor):
         """
         Salva um valor na memória compartilhada.
         :param chave: Chave identificadora do dado.
         :param valor: Valor a ser armazenado.
+        :return: Versão atribuída ao valor.
         """
-        with self.lock:
-            self.dados[chave] = valor
+        return self.armazem.salvar(self.sessao, chave, valor)
 
     def obter(self, chave):
         """
         Obtém um valor da memória compartilhada.
         :param chave: Chave identificadora do dado.
-        :return: Valor armazenado ou None se a chave não existir.
+        :return: Valor armazenado (DataFrames como visão somente leitura) ou None
+            se a chave não existir.
+        """
+        return self.armazem.obter(self.sessao, chave)
+
+    def obter_com_versao(self, chave):
+        """
+        Obtém o valor e a sua versão, lidos do mesmo snapshot.
+        :param chave: Chave identificadora do dado.
+        :return: (valor, versão) ou (None, None) se a chave não existir.
+        """
+        return self.armazem.obter_com_versao(self.sessao, chave)
+
+    def versao(self, chave):
+        """
+        Versão atual do valor, sem copiá-lo.
+        :param chave: Chave identificadora do dado.
+        :return: Número que cresce a cada `salvar`, ou None se a chave não existir.
         """
-        with self.lock:
-            return self.dados.get(chave)
+        return self.armazem.versao(self.sessao, chave)
 
 
 class MemoriaDedicada:
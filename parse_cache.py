@@ -0,0 +1,124 @@
+# parse_cache.py
+
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import threading
+import pandas as pd
+
+
+def chave_conteudo(nome: str, conteudo: bytes, versao) -> str:
+    """
+    Gera a chave de cache de um arquivo: hash do conteúdo, formato e versão do leitor.
+    :param nome: Nome do arquivo (apenas a extensão entra na chave).
+    :param conteudo: Bytes do arquivo.
+    :param versao: Versão do leitor; mudar a versão invalida as entradas antigas.
+    :return: Chave hexadecimal.
+    """
+    extensao = os.path.splitext(nome)[1].lower()
+    digest = hashlib.blake2b(conteudo, digest_size=20).hexdigest()
+    return f"{digest}-{extensao.lstrip('.')}-v{versao}"
+
+
+class CacheLeitura:
+    """
+    Cache de DataFrames já lidos, indexado pela chave de conteúdo.
+
+    Mantém as entradas em memória com descarte LRU respeitando `limite_bytes`.
+    Se `diretorio` for informado (e o pyarrow estiver instalado), cada entrada
+    também é gravada em Parquet, sobrevivendo a reinícios do processo.
+    É seguro para uso simultâneo por várias sessões.
+    """
+
+    def __init__(self, limite_bytes=512 * 2**20, diretorio=None):
+        """
+        :param limite_bytes: Orçamento de memória para os DataFrames em cache.
+        :param diretorio: Diretório opcional para a cópia em Parquet.
+        """
+        self.limite_bytes = limite_bytes
+        self.diretorio = diretorio
+        self.entradas = OrderedDict()  # chave -> (df, bytes)
+        self.bytes_em_uso = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.lock = threading.Lock()
+
+        if diretorio:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                logging.warning("pyarrow não instalado; cache em disco desativado.")
+                self.diretorio = None
+            else:
+                os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.parquet")
+
+    def obter(self, chave):
+        """
+        Obtém um DataFrame do cache (memória ou disco).
+        :param chave: Chave gerada por `chave_conteudo`.
+        :return: DataFrame ou None se a chave não estiver em cache.
+        """
+        with self.lock:
+            if chave in self.entradas:
+                self.entradas.move_to_end(chave)
+                self.acertos += 1
+                return self.entradas[chave][0].copy(deep=False)
+
+        if self.diretorio and os.path.exists(self._caminho(chave)):
+            try:
+                df = pd.read_parquet(self._caminho(chave))
+            except Exception as e:
+                logging.warning("Falha ao ler cache em disco %s: %s", chave, e)
+            else:
+                with self.lock:
+                    self.acertos += 1
+                    self._guardar(chave, df)
+                return df.copy(deep=False)
+
+        with self.lock:
+            self.falhas += 1
+        return None
+
+    def salvar(self, chave, df: pd.DataFrame):
+        """
+        Salva um DataFrame no cache.
+        :param chave: Chave gerada por `chave_conteudo`.
+        :param df: DataFrame lido do arquivo.
+        """
+        if self.diretorio and not os.path.exists(self._caminho(chave)):
+            try:
+                df.to_parquet(self._caminho(chave) + ".tmp", index=True)
+                os.replace(self._caminho(chave) + ".tmp", self._caminho(chave))
+            except Exception as e:
+                logging.warning("Falha ao gravar cache em disco %s: %s", chave, e)
+        with self.lock:
+            self._guardar(chave, df)
+
+    def _guardar(self, chave, df):
+        tamanho = int(df.memory_usage(deep=True).sum())
+        if chave in self.entradas:
+            self.bytes_em_uso -= self.entradas.pop(chave)[1]
+        if tamanho > self.limite_bytes:
+            return  # Maior que o orçamento inteiro: fica apenas em disco
+        self.entradas[chave] = (df, tamanho)
+        self.bytes_em_uso += tamanho
+        while self.bytes_em_uso > self.limite_bytes:
+            _, (_, liberado) = self.entradas.popitem(last=False)
+            self.bytes_em_uso -= liberado
+
+    def estatisticas(self):
+        """
+        :return: Dicionário com entradas, bytes em uso, acertos e falhas.
+        """
+        with self.lock:
+            return {
+                "entradas": len(self.entradas),
+                "bytes_em_uso": self.bytes_em_uso,
+                "limite_bytes": self.limite_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+            }
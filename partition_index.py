@@ -0,0 +1,213 @@
+# partition_index.py
+
+from collections import Counter
+import numpy as np
+import pandas as pd
+from anomaly_detector import (
+    AnaliseNotas,
+    Achado,
+    combinar_achados,
+    ordenar_achados,
+    repetidas_nas_entradas,
+)
+from data_profile import PerfilDados, combinar_fingerprints
+from data_validator import DataValidator, ResultadoValidacao
+from kpi_rollup import CuboKPI, cubo_particao
+
+TIPOS_DUPLICIDADE = ("chave_duplicada", "numero_duplicado")
+
+_VAZIO = np.array([], dtype=np.uint64)
+
+
+class Particao:
+    """
+    Um arquivo do lote, com as contribuições calculadas uma única vez: perfil
+    estatístico, erros de validação, índices de duplicidade (chave de acesso e
+    número + série + emitente), achados aproximados do arquivo (quase
+    duplicatas e valores atípicos) e cubo de KPIs. O DataFrame do arquivo não
+    é mantido.
+    """
+
+    def __init__(self, chave, df: pd.DataFrame, cache=None):
+        """
+        :param chave: Identificador do conteúdo (chave de cache ou impressão digital).
+        :param df: DataFrame do arquivo.
+        :param cache: CacheLeitura opcional onde o cubo de KPIs é persistido.
+        """
+        df = df.reset_index(drop=True)
+        self.chave = chave
+        self.linhas = len(df)
+        self.perfil = PerfilDados.de_dataframe(df, fingerprint=chave)
+
+        validacao = DataValidator.validar_dados_vetorizado(df)
+        self.validacao = ResultadoValidacao(None, validacao.erros, validacao.posicoes)
+
+        analise = AnaliseNotas(df)
+        self.indices = {
+            "chave_duplicada": analise.indice_chaves(),
+            "numero_duplicado": analise.indice_numeros(),
+        }
+        self.repetidas = {
+            tipo: indice.repetidas() if indice is not None else _VAZIO
+            for tipo, indice in self.indices.items()
+        }
+        self.achados = ordenar_achados(analise.achados_aproximados())
+        self.cubo = cubo_particao(chave, df, cache)
+
+
+class IndiceParticoes:
+    """
+    Conjunto de dados formado por arquivos (partições) registrados um a um.
+
+    Incluir ou retirar um arquivo calcula apenas a contribuição dele: o perfil,
+    a validação e os achados do conjunto são combinados a partir das partes, e
+    as chaves repetidas entre arquivos são atualizadas por busca binária nos
+    índices já existentes, sem reprocessar os demais arquivos. Um mesmo arquivo
+    pode aparecer mais de uma vez no lote (suas notas ficam duplicadas).
+    """
+
+    def __init__(self, cache=None):
+        """
+        :param cache: CacheLeitura opcional para persistir os cubos de KPIs.
+        """
+        self.cache = cache
+        self.particoes = {}  # chave -> Particao
+        self.sequencia = []  # chaves na ordem do lote
+        self.repetidas = {tipo: _VAZIO for tipo in TIPOS_DUPLICIDADE}
+        self.calculadas = 0
+        self._cubo = (None, None)  # (sequência, CuboKPI)
+
+    def _ativas(self):
+        return [self.particoes[chave] for chave in self.sequencia]
+
+    def adicionar(self, chave, df: pd.DataFrame) -> Particao:
+        """
+        Inclui um arquivo no fim do lote.
+        :param chave: Identificador do conteúdo do arquivo.
+        :param df: DataFrame do arquivo (usado só se a partição ainda não existir).
+        :return: Particao registrada.
+        """
+        particao = self.particoes.get(chave)
+        if particao is None:
+            particao = self.particoes[chave] = Particao(chave, df, self.cache)
+            self.calculadas += 1
+
+        for tipo, indice in particao.indices.items():
+            if indice is None:
+                continue
+            novas = [self.repetidas[tipo], particao.repetidas[tipo]]
+            for outra in self._ativas():
+                if outra.indices[tipo] is not None:
+                    novas.append(outra.indices[tipo].em_conflito(indice))
+            self.repetidas[tipo] = np.unique(np.concatenate(novas))
+        self.sequencia.append(chave)
+        return particao
+
+    def remover(self, chave):
+        """
+        Retira uma ocorrência do arquivo do lote, recontando apenas as chaves
+        repetidas que envolviam esse arquivo.
+        """
+        self.sequencia.remove(chave)
+        particao = self.particoes[chave]
+        for tipo, indice in particao.indices.items():
+            if indice is None:
+                continue
+            candidatas = np.intersect1d(self.repetidas[tipo], indice.chaves)
+            if not len(candidatas):
+                continue
+            chaves, notas = [], []
+            for outra in self._ativas():
+                if outra.indices[tipo] is not None:
+                    c, n = outra.indices[tipo].entradas(candidatas)
+                    chaves.append(c)
+                    notas.append(n)
+            restantes = _VAZIO
+            if chaves:
+                identificadores = None if notas[0] is None else np.concatenate(notas)
+                restantes = repetidas_nas_entradas(np.concatenate(chaves), identificadores)
+            self.repetidas[tipo] = np.union1d(
+                np.setdiff1d(self.repetidas[tipo], candidatas, assume_unique=True), restantes
+            )
+        if chave not in self.sequencia:
+            del self.particoes[chave]
+
+    def sincronizar(self, itens):
+        """
+        Ajusta o lote para a lista de arquivos informada, incluindo e retirando
+        apenas o que mudou desde a chamada anterior.
+        :param itens: Lista de (chave, df) na ordem do lote.
+        """
+        alvo = [chave for chave, _ in itens]
+        for chave, vezes in (Counter(self.sequencia) - Counter(alvo)).items():
+            for _ in range(vezes):
+                self.remover(chave)
+        dfs = dict(itens)
+        for chave, vezes in (Counter(alvo) - Counter(self.sequencia)).items():
+            for _ in range(vezes):
+                self.adicionar(chave, dfs[chave])
+        self.sequencia = alvo
+
+    @property
+    def inicios(self):
+        """
+        Posição da primeira linha de cada arquivo no consolidado.
+        """
+        tamanhos = [particao.linhas for particao in self._ativas()]
+        return [sum(tamanhos[:i]) for i in range(len(tamanhos))]
+
+    def perfil(self, df: pd.DataFrame) -> PerfilDados:
+        """
+        Perfil do consolidado, combinado a partir dos perfis dos arquivos.
+        :param df: DataFrame consolidado (concatenação do lote).
+        """
+        perfis = [particao.perfil for particao in self._ativas()]
+        fingerprint = combinar_fingerprints([p.fingerprint for p in perfis])
+        perfil = PerfilDados.combinar(perfis, df.dtypes, fingerprint)
+        if perfil is None:
+            perfil = PerfilDados.de_dataframe(df, fingerprint)
+        return perfil
+
+    def validacao(self, df: pd.DataFrame) -> ResultadoValidacao:
+        """
+        Validação do consolidado, combinada a partir das validações dos arquivos.
+        :param df: DataFrame consolidado (concatenação do lote).
+        """
+        partes = [particao.validacao for particao in self._ativas()]
+        return ResultadoValidacao.combinar(partes, df, self.inicios)
+
+    def achados(self) -> list:
+        """
+        Achados do consolidado: duplicidades exatas em todo o lote (inclusive
+        entre arquivos) e achados aproximados de cada arquivo.
+        :return: Lista de Achado, do mais grave para o menos grave.
+        """
+        ativas, inicios = self._ativas(), self.inicios
+        exatos = []
+        for tipo in TIPOS_DUPLICIDADE:
+            repetidas = self.repetidas[tipo]
+            linhas = [
+                particao.indices[tipo].posicoes_de(repetidas) + inicio
+                for particao, inicio in zip(ativas, inicios)
+                if particao.indices[tipo] is not None
+            ]
+            if len(repetidas):
+                exatos.append(Achado(tipo, np.concatenate(linhas), len(repetidas)))
+        aproximados = combinar_achados([particao.achados for particao in ativas], inicios)
+        return ordenar_achados(exatos + aproximados)
+
+    def cubo(self) -> CuboKPI:
+        """
+        Cubo de KPIs do consolidado, somado a partir dos cubos dos arquivos.
+        Se o lote só ganhou arquivos no fim, soma apenas os novos ao cubo anterior.
+        """
+        sequencia, cubo = self._cubo
+        if sequencia == self.sequencia:
+            return cubo
+        if sequencia is not None and self.sequencia[:len(sequencia)] == sequencia:
+            novas = [self.particoes[chave].cubo for chave in self.sequencia[len(sequencia):]]
+            cubo = CuboKPI.combinar([cubo] + novas)
+        else:
+            cubo = CuboKPI.combinar([particao.cubo for particao in self._ativas()])
+        self._cubo = (list(self.sequencia), cubo)
+        return cubo
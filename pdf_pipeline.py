@@ -0,0 +1,326 @@
+# pdf_pipeline.py
+
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+from io import BytesIO
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import pandas as pd
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ArrayObject, DictionaryObject, StreamObject
+from conversores import CONVERSORES
+
+# Versão da extração de texto por página, usada nas chaves do cache.
+# Incrementar sempre que uma mudança alterar o texto extraído.
+VERSAO_EXTRACAO = 1
+
+# Abaixo disso as páginas são lidas no processo atual (o pool não compensa)
+MINIMO_PAGINAS_POOL = 8
+
+# Processos das páginas iniciados por forkserver (ou spawn), nunca por fork do
+# processo do app, que tem threads que podem estar segurando locks
+CONTEXTO_POOL = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Texto de uma página extraída; `origem` é "texto" (camada de texto do PDF),
+# "ocr" (imagens da página) ou "vazia"
+PaginaExtraida = namedtuple("PaginaExtraida", ["indice", "texto", "origem", "do_cache"])
+
+# Campos da NF-e lidos do DANFE, com os nomes e tipos de PERFIL_NFE (xml_profiles);
+# o CFOP é o do primeiro item
+CAMPOS_DANFE = {
+    "chave_acesso": "chave",
+    "numero": "texto",
+    "serie": "texto",
+    "data_emissao": "data",
+    "emitente_cnpj": "texto",
+    "emitente": "texto",
+    "destinatario_cnpj": "texto",
+    "cfop": "texto",
+    "valor_total_nota": "decimal",
+}
+
+_CHAVE = re.compile(r"(?<!\d)(\d{4}(?:[ .]?\d{4}){10})(?!\d)")
+_CNPJ = re.compile(r"\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}")
+_PADROES_DANFE = {
+    "numero": re.compile(r"\bN[º°o]\.?\s*:?\s*(\d[\d.]*)"),
+    "serie": re.compile(r"S[ÉE]RIE\s*:?\s*(\d+)", re.IGNORECASE),
+    "data_emissao": re.compile(
+        r"DATA\s+D[AE]\s+EMISS[ÃA]O\s*:?\s*(\d{2}/\d{2}/\d{4})", re.IGNORECASE
+    ),
+    "emitente": re.compile(r"(?:RAZ[ÃA]O SOCIAL|EMITENTE)\s*:?\s*([^\n]+)", re.IGNORECASE),
+    "cfop": re.compile(r"CFOP\D{0,40}?([1-7]\d{3})(?!\d)", re.IGNORECASE),
+    "valor_total_nota": re.compile(
+        r"VALOR\s+TOTAL\s+DA\s+NOTA\s*:?\s*(?:R\$\s*)?(\d[\d.]*,\d{2})", re.IGNORECASE
+    ),
+}
+
+
+def ocr_tesseract(imagem) -> str:
+    """
+    OCR padrão do pipeline (Tesseract, em português).
+    """
+    import pytesseract
+
+    return pytesseract.image_to_string(imagem, lang="por")
+
+
+def _bytes_brutos(objeto):
+    """
+    Bytes ainda codificados de um stream (ou lista de streams) do PDF, sem
+    descompactar: bastam para identificar o conteúdo.
+    """
+    objeto = objeto.get_object() if objeto is not None else None
+    if isinstance(objeto, ArrayObject):
+        return b"".join(_bytes_brutos(item) for item in objeto)
+    if isinstance(objeto, StreamObject):
+        return objeto._data
+    return b""
+
+
+def hash_pagina(pagina) -> str:
+    """
+    Identifica o conteúdo de uma página: streams de desenho, imagens e
+    mapeamentos de caracteres das fontes. Páginas idênticas em PDFs diferentes
+    têm o mesmo hash.
+    """
+    resumo = hashlib.blake2b(digest_size=20)
+    resumo.update(f"v{VERSAO_EXTRACAO}".encode())
+    resumo.update(_bytes_brutos(pagina.get("/Contents")))
+    recursos = pagina.get("/Resources")
+    recursos = recursos.get_object() if recursos is not None else DictionaryObject()
+    for grupo in ("/XObject", "/Font"):
+        itens = recursos.get(grupo)
+        itens = itens.get_object() if itens is not None else DictionaryObject()
+        for nome in sorted(itens):
+            item = itens[nome].get_object()
+            resumo.update(nome.encode())
+            resumo.update(_bytes_brutos(item))
+            if grupo == "/Font":
+                resumo.update(str(item.get("/BaseFont", "")).encode())
+                resumo.update(_bytes_brutos(item.get("/ToUnicode")))
+    return resumo.hexdigest()
+
+
+def _extrair_pagina(leitor, indice, ocr):
+    """
+    Texto de uma página: a camada de texto, se houver; senão, OCR das imagens.
+    :return: Tupla (indice, texto, origem).
+    """
+    pagina = leitor.pages[indice]
+    texto = pagina.extract_text() or ""
+    if texto.strip() or ocr is None:
+        return indice, texto, "texto" if texto.strip() else "vazia"
+
+    textos = []
+    try:
+        from PIL import Image
+
+        for imagem in pagina.images:
+            textos.append(ocr(Image.open(BytesIO(imagem.data))))
+    except Exception as e:
+        logging.warning("Falha no OCR da página %d: %s", indice + 1, e)
+    texto = "\n".join(textos)
+    return indice, texto, "ocr" if texto.strip() else "vazia"
+
+
+# Documento aberto em cada processo do pool (lido uma única vez por processo)
+_DOCUMENTO = None
+
+
+def _abrir_no_processo(conteudo):
+    global _DOCUMENTO
+    _DOCUMENTO = PdfReader(BytesIO(conteudo))
+
+
+def _extrair_no_processo(indice, ocr):
+    return _extrair_pagina(_DOCUMENTO, indice, ocr)
+
+
+class CachePaginas:
+    """
+    Cache do texto extraído por página, indexado por `hash_pagina`.
+
+    Mantém até `limite` páginas em memória (descarte LRU). Se `diretorio` for
+    informado, cada página também é gravada em disco, sobrevivendo a reinícios
+    do processo. É seguro para uso simultâneo por várias sessões.
+    """
+
+    def __init__(self, limite=20_000, diretorio=None):
+        self.limite = limite
+        self.diretorio = diretorio
+        self.entradas = OrderedDict()  # hash -> (texto, origem)
+        self.acertos = 0
+        self.falhas = 0
+        self.lock = threading.Lock()
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.txt")
+
+    def obter(self, chave):
+        """
+        :return: Tupla (texto, origem) ou None se a página não estiver em cache.
+        """
+        with self.lock:
+            if chave in self.entradas:
+                self.entradas.move_to_end(chave)
+                self.acertos += 1
+                return self.entradas[chave]
+
+        if self.diretorio and os.path.exists(self._caminho(chave)):
+            try:
+                with open(self._caminho(chave), encoding="utf-8") as arquivo:
+                    origem, texto = arquivo.read().split("\n", 1)
+            except Exception as e:
+                logging.warning("Falha ao ler página em cache %s: %s", chave, e)
+            else:
+                self.salvar(chave, texto, origem, gravar=False)
+                with self.lock:
+                    self.acertos += 1
+                return texto, origem
+
+        with self.lock:
+            self.falhas += 1
+        return None
+
+    def salvar(self, chave, texto, origem, gravar=True):
+        if gravar and self.diretorio:
+            try:
+                with open(self._caminho(chave) + ".tmp", "w", encoding="utf-8") as arquivo:
+                    arquivo.write(f"{origem}\n{texto}")
+                os.replace(self._caminho(chave) + ".tmp", self._caminho(chave))
+            except Exception as e:
+                logging.warning("Falha ao gravar página em cache %s: %s", chave, e)
+        with self.lock:
+            self.entradas[chave] = (texto, origem)
+            self.entradas.move_to_end(chave)
+            while len(self.entradas) > self.limite:
+                self.entradas.popitem(last=False)
+
+    def estatisticas(self):
+        """
+        :return: Dicionário com entradas, acertos e falhas.
+        """
+        with self.lock:
+            return {
+                "entradas": len(self.entradas),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+            }
+
+
+# Cache usado quando nenhum outro é informado
+CACHE_PAGINAS = CachePaginas()
+
+
+def extrair_paginas(arquivo, max_workers=None, ocr=ocr_tesseract, cache=CACHE_PAGINAS):
+    """
+    Extrai o texto das páginas de um PDF, gerando cada página assim que fica pronta
+    (fora de ordem: use `PaginaExtraida.indice`).
+
+    Páginas já vistas (mesmo hash, em qualquer PDF) vêm do cache; as demais são
+    processadas em um pool de processos, que abre o documento uma única vez por
+    processo. O OCR só roda em páginas sem camada de texto.
+    :param arquivo: Caminho, bytes ou arquivo binário do PDF.
+    :param max_workers: Número de processos; 1 extrai no processo atual. Por padrão
+        usa os núcleos disponíveis, ou 1 se já estiver em um processo filho
+        (ex.: pool de ingestão do AgentManager).
+    :param ocr: Função imagem PIL -> texto, ou None para não fazer OCR. No pool,
+        precisa ser uma função de módulo.
+    :param cache: CachePaginas, ou None para não usar cache.
+    :return: Gerador de PaginaExtraida.
+    """
+    if isinstance(arquivo, (str, os.PathLike)):
+        with open(arquivo, "rb") as f:
+            conteudo = f.read()
+    elif isinstance(arquivo, bytes):
+        conteudo = arquivo
+    else:
+        conteudo = arquivo.read()
+    leitor = PdfReader(BytesIO(conteudo))
+
+    pendentes = {}  # indice -> hash
+    for indice, pagina in enumerate(leitor.pages):
+        chave = hash_pagina(pagina) if cache is not None else None
+        salvo = cache.obter(chave) if cache is not None else None
+        if salvo is not None:
+            yield PaginaExtraida(indice, salvo[0], salvo[1], True)
+        else:
+            pendentes[indice] = chave
+
+    def concluir(indice, texto, origem):
+        # Páginas vazias não entram no cache: o OCR pode estar indisponível agora
+        if cache is not None and origem != "vazia":
+            cache.salvar(pendentes[indice], texto, origem)
+        return PaginaExtraida(indice, texto, origem, False)
+
+    if max_workers is None:
+        max_workers = 1 if multiprocessing.parent_process() else os.cpu_count() or 1
+    max_workers = min(max_workers, len(pendentes))
+    if max_workers <= 1 or len(pendentes) < MINIMO_PAGINAS_POOL:
+        for indice in pendentes:
+            yield concluir(*_extrair_pagina(leitor, indice, ocr))
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=CONTEXTO_POOL,
+        initializer=_abrir_no_processo,
+        initargs=(conteudo,),
+    ) as pool:
+        futuros = [pool.submit(_extrair_no_processo, indice, ocr) for indice in pendentes]
+        for futuro in as_completed(futuros):
+            yield concluir(*futuro.result())
+
+
+def campos_danfe(texto: str) -> dict:
+    """
+    Lê os campos principais de uma NF-e a partir do texto do DANFE.
+    :return: Dicionário {campo: texto} com os campos encontrados (ver CAMPOS_DANFE).
+    """
+    campos = {}
+    chave = _CHAVE.search(texto)
+    if chave:
+        campos["chave_acesso"] = chave.group(1)
+    for campo, padrao in _PADROES_DANFE.items():
+        encontrado = padrao.search(texto)
+        if encontrado:
+            campos[campo] = encontrado.group(1).strip()
+    if "numero" in campos:
+        campos["numero"] = str(int(campos["numero"].replace(".", "")))
+    cnpjs = [re.sub(r"\D", "", c) for c in _CNPJ.findall(texto)]
+    if cnpjs:
+        campos["emitente_cnpj"] = cnpjs[0]
+    if len(cnpjs) > 1:
+        campos["destinatario_cnpj"] = cnpjs[1]
+    return campos
+
+
+def notas_de_paginas(textos) -> pd.DataFrame:
+    """
+    Monta o DataFrame das notas a partir dos textos das páginas, em ordem.
+    Páginas sem chave de acesso continuam a nota da página anterior (DANFE com
+    mais de uma folha). As colunas seguem os nomes de PERFIL_NFE, já tipadas.
+    :param textos: Texto de cada página, na ordem do documento.
+    :return: DataFrame com uma linha por nota.
+    """
+    notas = []
+    for texto in textos:
+        chave = _CHAVE.search(texto)
+        if not notas or (chave and chave.group(1) != notas[-1][0]):
+            notas.append([chave.group(1) if chave else None, []])
+        notas[-1][1].append(texto)
+
+    linhas = [campos_danfe("\n".join(paginas)) for _, paginas in notas]
+    linhas = [linha for linha in linhas if linha]
+    df = pd.DataFrame(linhas, columns=list(CAMPOS_DANFE), dtype=object)
+    for coluna, tipo in CAMPOS_DANFE.items():
+        df[coluna] = CONVERSORES[tipo](df[coluna])
+    return df
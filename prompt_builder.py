@@ -0,0 +1,208 @@
+# prompt_builder.py
+
+from collections import OrderedDict
+import math
+import re
+import threading
+import numpy as np
+import pandas as pd
+from data_profile import obter_perfil
+from query_planner import (
+    ALTERNATIVAS_COLUNAS,
+    ALTERNATIVAS_TRIBUTOS,
+    detectar_intencoes,
+    normalizar_texto,
+)
+
+CARACTERES_POR_TOKEN = 4
+ORCAMENTO_PADRAO = 2000
+LIMIAR_CORRELACAO = 0.5
+MAX_CORRELACOES = 15
+LIMITE_CARDINALIDADE = 30
+TOP_K_VALORES = 5
+MAX_NOMES_OMITIDOS = 20
+
+# Tipos de coluna relevantes para cada intenção reconhecida na pergunta
+COLUNAS_POR_INTENCAO = {
+    "total": ["valor"],
+    "media": ["valor"],
+    "emitente": ["emitente", "valor"],
+    "cfop": ["cfop", "valor"],
+    "uf": ["uf", "valor"],
+    "periodo": ["data", "valor"],
+    "duplicidade": ["chave", "numero", "serie", "emitente"],
+}
+
+# Contagens de valores por (impressão digital, coluna), reaproveitadas entre perguntas
+MAXIMO_CONTAGENS = 256
+_contagens = OrderedDict()
+_lock = threading.Lock()
+
+
+def estimar_tokens(texto: str) -> int:
+    """
+    Estima a quantidade de tokens de um texto (aproximação por caracteres).
+    """
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def _termos(texto):
+    return set(re.findall(r"[a-z0-9]+", normalizar_texto(texto)))
+
+
+def relevancia_colunas(pergunta: str, colunas) -> pd.Series:
+    """
+    Pontua a relevância de cada coluna para a pergunta: termos em comum com o
+    nome da coluna, colunas ligadas às intenções e tributos citados e, com
+    peso menor, as colunas fiscais principais.
+    :param pergunta: Pergunta em linguagem natural.
+    :param colunas: Nomes das colunas do DataFrame.
+    :return: Série {coluna: pontuação}, da mais para a menos relevante
+        (empates mantêm a ordem original).
+    """
+    termos = {t for t in _termos(pergunta) if len(t) > 2 or t in ALTERNATIVAS_TRIBUTOS}
+    intencoes = detectar_intencoes(pergunta)
+
+    alvos = {}
+    for intencao in intencoes:
+        for tipo in COLUNAS_POR_INTENCAO.get(intencao, []):
+            for nome in ALTERNATIVAS_COLUNAS[tipo]:
+                alvos[nome.lower()] = max(alvos.get(nome.lower(), 0), 2)
+    for tributo, nomes in ALTERNATIVAS_TRIBUTOS.items():
+        if tributo in termos:
+            for nome in nomes:
+                alvos[nome.lower()] = 4
+    principais = {nome.lower() for nomes in ALTERNATIVAS_COLUNAS.values() for nome in nomes}
+
+    pontos = {}
+    for coluna in colunas:
+        nome = str(coluna).lower()
+        pontos[coluna] = (
+            3 * len(termos & _termos(nome))
+            + alvos.get(nome, 0)
+            + (1 if nome in principais else 0)
+        )
+    serie = pd.Series(pontos, dtype="int64")
+    return serie.sort_values(ascending=False, kind="stable")
+
+
+def _contar_valores(df, coluna, fingerprint):
+    chave = (fingerprint, coluna)
+    with _lock:
+        if chave in _contagens:
+            _contagens.move_to_end(chave)
+            return _contagens[chave]
+    contagem = df[coluna].value_counts(dropna=True)
+    resultado = (int(len(contagem)), contagem.head(TOP_K_VALORES))
+    with _lock:
+        _contagens[chave] = resultado
+        while len(_contagens) > MAXIMO_CONTAGENS:
+            _contagens.popitem(last=False)
+    return resultado
+
+
+def _formatar_numero(valor):
+    return "NaN" if pd.isna(valor) else f"{valor:.2f}"
+
+
+def _linha_coluna(df, coluna, dtype, descricao, fingerprint):
+    if coluna in descricao.columns:
+        d = descricao[coluna]
+        return (
+            f"- {coluna} ({dtype}): preenchidos {d['count']:.0f}, média {_formatar_numero(d['mean'])}, "
+            f"desvio {_formatar_numero(d['std'])}, mín {_formatar_numero(d['min'])}, "
+            f"mediana {_formatar_numero(d['50%'])}, máx {_formatar_numero(d['max'])}"
+        )
+    distintos, frequentes = _contar_valores(df, coluna, fingerprint)
+    if distintos <= LIMITE_CARDINALIDADE:
+        valores = ", ".join(f"{valor} ({n})" for valor, n in frequentes.items())
+        return f"- {coluna} ({dtype}): {distintos} valores; mais frequentes: {valores}"
+    return f"- {coluna} ({dtype}): {distintos} valores distintos"
+
+
+def _correlacoes_significativas(perfil, colunas):
+    numericas = [c for c in perfil.colunas if c in set(colunas)]
+    if len(numericas) < 2:
+        return []
+    corr = perfil.correlacao().loc[numericas, numericas].to_numpy()
+    i, j = np.triu_indices(len(numericas), k=1)
+    valores = corr[i, j]
+    significativas = np.flatnonzero(np.abs(np.nan_to_num(valores)) >= LIMIAR_CORRELACAO)
+    ordem = significativas[np.argsort(-np.abs(valores[significativas]), kind="stable")]
+    return [
+        f"- {numericas[i[k]]} × {numericas[j[k]]}: {valores[k]:+.2f}"
+        for k in ordem[:MAX_CORRELACOES]
+    ]
+
+
+class ContextoPrompt:
+    """
+    Resumo dos dados ajustado ao orçamento de tokens: o texto (`texto`), a
+    estimativa de tokens (`tokens`) e as colunas incluídas e omitidas.
+    """
+
+    def __init__(self, texto, tokens, colunas_incluidas, colunas_omitidas):
+        self.texto = texto
+        self.tokens = tokens
+        self.colunas_incluidas = colunas_incluidas
+        self.colunas_omitidas = colunas_omitidas
+
+
+def montar_contexto(
+    pergunta: str, df: pd.DataFrame, orcamento_tokens=ORCAMENTO_PADRAO
+) -> ContextoPrompt:
+    """
+    Monta o resumo dos dados para o prompt dentro de um orçamento de tokens.
+
+    As colunas entram em ordem de relevância para a pergunta até o orçamento
+    acabar; colunas numéricas trazem estatísticas descritivas, colunas de baixa
+    cardinalidade trazem os valores mais frequentes e apenas as correlações
+    significativas entre as colunas incluídas são listadas.
+    :param pergunta: Pergunta em linguagem natural.
+    :param df: DataFrame carregado.
+    :param orcamento_tokens: Tokens estimados disponíveis para o resumo.
+    :return: ContextoPrompt.
+    """
+    perfil = obter_perfil(df)
+    descricao = perfil.descrever() if perfil.colunas else pd.DataFrame()
+    cabecalho = f"Total de registros: {len(df)} | Total de colunas: {len(df.columns)}"
+    usados = estimar_tokens(cabecalho) + estimar_tokens("Colunas (mais relevantes primeiro):")
+    # Reserva para a lista de colunas omitidas e as correlações
+    disponivel = orcamento_tokens - usados - orcamento_tokens // 5
+
+    linhas, incluidas, omitidas = [], [], []
+    for coluna in relevancia_colunas(pergunta, df.columns).index:
+        if omitidas:
+            omitidas.append(coluna)
+            continue
+        linha = _linha_coluna(df, coluna, df[coluna].dtype, descricao, perfil.fingerprint)
+        custo = estimar_tokens(linha) + 1
+        if custo > disponivel:
+            omitidas.append(coluna)
+            continue
+        linhas.append(linha)
+        incluidas.append(coluna)
+        disponivel -= custo
+
+    blocos = [cabecalho, "Colunas (mais relevantes primeiro):\n" + "\n".join(linhas)]
+    if omitidas:
+        nomes = ", ".join(map(str, omitidas[:MAX_NOMES_OMITIDOS]))
+        if len(omitidas) > MAX_NOMES_OMITIDOS:
+            nomes += ", ..."
+        blocos.append(f"Colunas omitidas por relevância ({len(omitidas)}): {nomes}")
+
+    correlacoes = []
+    disponivel = orcamento_tokens - estimar_tokens("\n\n".join(blocos))
+    for linha in _correlacoes_significativas(perfil, incluidas):
+        custo = estimar_tokens(linha) + 1
+        if custo > disponivel - 20:
+            break
+        correlacoes.append(linha)
+        disponivel -= custo
+    if correlacoes:
+        blocos.append(
+            f"Correlações significativas (|r| ≥ {LIMIAR_CORRELACAO}):\n" + "\n".join(correlacoes)
+        )
+
+    texto = "\n\n".join(blocos)
+    return ContextoPrompt(texto, estimar_tokens(texto), incluidas, omitidas)
@@ -0,0 +1,240 @@
+# query_planner.py
+
+import re
+import unicodedata
+import pandas as pd
+from conversores import converter_data_br, converter_decimal_br
+
+
+# Nomes alternativos das colunas fiscais, em ordem de preferência
+ALTERNATIVAS_COLUNAS = {
+    "valor": [
+        "valor",
+        "valor_total",
+        "vl_total",
+        "valor_total_nota",
+        "vNF",
+        "valor_tributavel",
+        "valor_servico",
+        "total",
+    ],
+    "emitente": [
+        "emitente",
+        "nome_emitente",
+        "razao_social_emitente",
+        "xNome",
+        "prestador",
+        "prestador_cpfcnpj",
+        "emitente_cnpj",
+    ],
+    "cfop": ["cfop"],
+    "uf": ["uf", "uf_emitente", "estado", "tomador_estado", "uf_destinatario"],
+    "data": ["data", "data_emissao", "data_nfse", "dhEmi", "dEmi", "data_fato"],
+    "chave": ["chave_acesso", "chave_acesso_nfse_nacional", "chave"],
+    "numero": ["numero", "numero_nfse", "nNF"],
+    "serie": ["serie", "serie_nfse"],
+}
+
+# Colunas que distinguem os itens de uma nota (número do item ou código do produto)
+ALTERNATIVAS_ITEM = ["item", "nItem", "numero_item", "codigo_produto", "cProd"]
+
+# Colunas de cada tributo, para perguntas como "qual o total de ISS?"
+ALTERNATIVAS_TRIBUTOS = {
+    "iss": ["valor_iss", "valor_issrf", "vISS"],
+    "pis": ["valor_pis", "vPIS"],
+    "cofins": ["valor_cofins", "vCOFINS"],
+    "icms": ["valor_icms", "vICMS"],
+    "ipi": ["valor_ipi", "vIPI"],
+    "ir": ["valor_ir", "vIR"],
+    "inss": ["valor_inss", "vINSS"],
+    "csll": ["valor_contribuicao_social", "vCSLL"],
+}
+
+# Expressões que indicam cada intenção (comparadas sem acentos, em minúsculas)
+INTENCOES = {
+    "total": [r"total", r"faturamento", r"soma", r"somatorio", r"quanto", r"montante"],
+    "media": [r"media", r"medio"],
+    "emitente": [r"emitentes?", r"fornecedor(es)?", r"prestador(es)?", r"empresas?"],
+    "cfop": [r"cfops?"],
+    "uf": [r"ufs?", r"estados?"],
+    "periodo": [r"mes(es)?", r"mensal", r"periodo", r"dias?", r"diario", r"anos?", r"anual"],
+    "duplicidade": [r"duplicad\w*", r"repetid\w*", r"duplicidade"],
+    "frequencia": [r"utilizad\w*", r"usad\w*", r"frequente\w*", r"quantidade", r"quantas"],
+    "crescente": [r"menor(es)?"],
+}
+
+TOP_N_PADRAO = 5
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Remove acentos e converte para minúsculas.
+    """
+    sem_acento = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in sem_acento if not unicodedata.combining(c)).lower()
+
+
+def detectar_coluna(df: pd.DataFrame, alternativas):
+    """
+    Detecta a coluna do DataFrame entre nomes alternativos (sem diferenciar
+    maiúsculas e minúsculas).
+    :param df: DataFrame carregado.
+    :param alternativas: Nomes possíveis, em ordem de preferência.
+    :return: Nome da coluna encontrada ou None.
+    """
+    colunas = {str(c).lower(): c for c in df.columns}
+    for nome in alternativas:
+        if nome.lower() in colunas:
+            return colunas[nome.lower()]
+    return None
+
+
+def _menciona(texto, expressoes):
+    return any(re.search(rf"\b(?:{e})\b", texto) for e in expressoes)
+
+
+def detectar_intencoes(pergunta: str) -> set:
+    """
+    Reconhece as intenções fiscais mencionadas na pergunta.
+    :return: Conjunto de nomes de INTENCOES.
+    """
+    texto = normalizar_texto(pergunta)
+    return {nome for nome, expressoes in INTENCOES.items() if _menciona(texto, expressoes)}
+
+
+def _top_n(texto):
+    numero = re.search(r"\b(\d{1,3})\b", texto)
+    if numero and 0 < int(numero.group(1)) <= 100:
+        return int(numero.group(1))
+    return TOP_N_PADRAO
+
+
+def _numerica(df, coluna):
+    return converter_decimal_br(df[coluna])
+
+
+def _ranking(df, coluna_grupo, coluna_valor, n, por_quantidade, crescente):
+    grupos = df[coluna_grupo].astype("string")
+    if coluna_valor is None:
+        tabela = grupos.value_counts().rename("quantidade").to_frame()
+    else:
+        tabela = _numerica(df, coluna_valor).groupby(grupos).agg(["sum", "count"])
+        tabela.columns = ["valor_total", "quantidade"]
+    ordem = "quantidade" if por_quantidade or coluna_valor is None else "valor_total"
+    tabela = tabela.sort_values(ordem, ascending=crescente).head(n)
+    tabela.index.name = coluna_grupo
+    return tabela
+
+
+def executar_consultas(pergunta: str, df: pd.DataFrame):
+    """
+    Reconhece as intenções fiscais comuns na pergunta e calcula localmente os
+    resultados exatos com group-bys vetorizados.
+    :param pergunta: Pergunta em linguagem natural.
+    :param df: DataFrame carregado.
+    :return: Lista de (título, DataFrame de resultado); vazia se nenhuma
+        intenção for reconhecida ou as colunas necessárias não existirem.
+    """
+    texto = normalizar_texto(pergunta)
+    colunas = {nome: detectar_coluna(df, alt) for nome, alt in ALTERNATIVAS_COLUNAS.items()}
+    intencoes = detectar_intencoes(pergunta)
+    coluna_valor = colunas["valor"]
+    resultados = []
+
+    tributos = {
+        nome: coluna
+        for nome, alternativas in ALTERNATIVAS_TRIBUTOS.items()
+        if re.search(rf"\b{nome}\b", texto)
+        and (coluna := detectar_coluna(df, alternativas)) is not None
+    }
+    if tributos:
+        coluna_valor = next(iter(tributos.values()))
+        totais = pd.DataFrame(
+            {
+                "tributo": [nome.upper() for nome in tributos],
+                "valor_total": [_numerica(df, c).sum() for c in tributos.values()],
+            }
+        )
+        resultados.append(("Total por tributo", totais.set_index("tributo")))
+
+    agrupamentos = [
+        (nome, colunas[nome]) for nome in ("emitente", "cfop", "uf") if nome in intencoes
+    ]
+    agrupamentos = [(nome, coluna) for nome, coluna in agrupamentos if coluna is not None]
+    n = _top_n(texto)
+    crescente = "crescente" in intencoes
+
+    for nome, coluna in agrupamentos:
+        tabela = _ranking(
+            df, coluna, coluna_valor, n, "frequencia" in intencoes, crescente
+        )
+        ordem = "Menores" if crescente else "Maiores"
+        resultados.append((f"{ordem} {n} por {nome} ({coluna})", tabela))
+
+    if "periodo" in intencoes and colunas["data"] is not None:
+        frequencia, rotulo = "M", "mês"
+        if _menciona(texto, [r"dias?", r"diario"]):
+            frequencia, rotulo = "D", "dia"
+        elif _menciona(texto, [r"anos?", r"anual"]):
+            frequencia, rotulo = "Y", "ano"
+        periodos = converter_data_br(df[colunas["data"]]).dt.to_period(frequencia)
+        if coluna_valor is not None:
+            tabela = _numerica(df, coluna_valor).groupby(periodos).agg(["sum", "count"])
+            tabela.columns = ["valor_total", "quantidade"]
+        else:
+            tabela = periodos.value_counts().sort_index().rename("quantidade").to_frame()
+        tabela.index.name = rotulo
+        resultados.append((f"Totais por {rotulo}", tabela))
+
+    if "duplicidade" in intencoes:
+        if colunas["chave"] is not None:
+            chave = [colunas["chave"]]
+        elif colunas["numero"] is not None:
+            chave = [c for c in (colunas["numero"], colunas["serie"], colunas["emitente"]) if c]
+        else:
+            chave = list(df.columns)
+        # Com uma linha por item, a nota se repete quando o mesmo item se repete
+        item = detectar_coluna(df, ALTERNATIVAS_ITEM)
+        itens = [item] if item is not None and item not in chave else []
+        duplicadas = df[df.duplicated(subset=chave + itens, keep=False)]
+        ocorrencias = duplicadas.groupby(chave + itens, dropna=False).size()
+        if itens:
+            ocorrencias = ocorrencias.groupby(level=list(range(len(chave))), dropna=False).max()
+        tabela = (
+            ocorrencias
+            .rename("ocorrencias")
+            .sort_values(ascending=False)
+            .head(10)
+            .to_frame()
+        )
+        titulo = (
+            f"Notas duplicadas por {', '.join(map(str, chave))}: "
+            f"{len(duplicadas)} linhas em {len(tabela)} grupos exibidos"
+        )
+        resultados.append((titulo, tabela))
+
+    somente_total = not agrupamentos and "periodo" not in intencoes and not tributos
+    if somente_total and coluna_valor is not None and intencoes & {"total", "media"}:
+        valores = _numerica(df, coluna_valor)
+        tabela = pd.DataFrame(
+            {
+                "valor_total": [valores.sum()],
+                "valor_medio": [valores.mean()],
+                "quantidade_notas": [int(valores.count())],
+            },
+            index=[coluna_valor],
+        )
+        resultados.append((f"Totais de {coluna_valor}", tabela))
+
+    return resultados
+
+
+def formatar_resultados(resultados) -> str:
+    """
+    Formata os resultados calculados como texto para o prompt.
+    """
+    blocos = [
+        f"{titulo}:\n{tabela.to_string(float_format=lambda v: f'{v:.2f}')}"
+        for titulo, tabela in resultados
+    ]
+    return "\n\n".join(blocos)
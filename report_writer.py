@@ -0,0 +1,194 @@
+# report_writer.py
+
+from io import BytesIO
+import os
+import zipfile
+import pandas as pd
+from instrumentation import etapa
+
+# O python-docx é importado dentro das funções, só ao gerar um relatório
+
+# Acima disso a tabela é cortada e o relatório ganha uma seção de resumo;
+# o Word fica lento para abrir e paginar tabelas com dezenas de milhares de linhas
+LIMITE_LINHAS_WORD = 5_000
+
+# Linhas convertidas para XML por vez (limita a memória em tabelas grandes)
+LINHAS_POR_BLOCO = 20_000
+
+_MARCADOR = "@@LINHAS_DA_TABELA@@"
+
+# Caracteres de controle não são permitidos em XML
+_CONTROLE = r"[\x00-\x08\x0b\x0c\x0e-\x1f]"
+
+
+def _texto_celulas(serie: pd.Series) -> pd.Series:
+    """
+    Converte a coluna para o texto das células, já escapado para XML.
+    Valores ausentes ficam em branco; quebras de linha viram <w:br/>.
+    """
+    texto = serie.astype(object).map(str).where(serie.notna().to_numpy(), "")
+    texto = texto.astype("str")
+    texto = (
+        texto.str.replace(_CONTROLE, "", regex=True)
+        .str.replace("&", "&amp;", regex=False)
+        .str.replace("<", "&lt;", regex=False)
+        .str.replace(">", "&gt;", regex=False)
+        .str.replace("\r\n", "\n", regex=False)
+        .str.replace("\n", '</w:t><w:br/><w:t xml:space="preserve">', regex=False)
+    )
+    return texto
+
+
+def _linhas_xml(df: pd.DataFrame, larguras):
+    """
+    Gera o XML das linhas da tabela (<w:tr>), em blocos de LINHAS_POR_BLOCO.
+    As células são montadas coluna a coluna, com operações vetorizadas de texto.
+    """
+    for inicio in range(0, len(df), LINHAS_POR_BLOCO):
+        bloco = df.iloc[inicio:inicio + LINHAS_POR_BLOCO]
+        linhas = pd.Series("<w:tr>", index=bloco.index, dtype="str")
+        for posicao, largura in enumerate(larguras):
+            abertura = (
+                f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{largura}"/></w:tcPr>'
+                '<w:p><w:r><w:t xml:space="preserve">'
+            )
+            linhas = linhas + abertura + _texto_celulas(bloco.iloc[:, posicao])
+            linhas = linhas + "</w:t></w:r></w:p></w:tc>"
+        yield "".join(linhas + "</w:tr>")
+
+
+def _adicionar_resumo(doc, df: pd.DataFrame, exibidas: int):
+    """
+    Seção com o tamanho do conjunto e os totais das colunas numéricas,
+    usada quando a tabela é cortada.
+    """
+    doc.add_heading("Resumo", level=2)
+    doc.add_paragraph(
+        f"O conjunto tem {len(df):,} linhas e {len(df.columns)} colunas. "
+        f"A tabela abaixo mostra as primeiras {exibidas:,} linhas; "
+        "exporte em CSV ou JSON para obter os dados completos."
+    )
+    numericas = df.select_dtypes("number")
+    if numericas.empty:
+        return
+    estatisticas = numericas.agg(["sum", "mean", "min", "max"]).T
+    tabela = doc.add_table(rows=1, cols=5)
+    tabela.style = "Table Grid"
+    for i, titulo in enumerate(["Coluna", "Soma", "Média", "Mínimo", "Máximo"]):
+        tabela.cell(0, i).text = titulo
+    for coluna, valores in estatisticas.iterrows():
+        celulas = tabela.add_row().cells
+        celulas[0].text = str(coluna)
+        for i, valor in enumerate(valores, 1):
+            celulas[i].text = f"{valor:,.2f}"
+
+
+def _repetir_cabecalho(linha):
+    """
+    Marca a linha como cabeçalho, repetido no topo de cada página.
+    """
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    propriedades = linha._tr.get_or_add_trPr()
+    cabecalho = OxmlElement("w:tblHeader")
+    cabecalho.set(qn("w:val"), "true")
+    propriedades.append(cabecalho)
+
+
+def escrever_relatorio_word(
+    destino,
+    df: pd.DataFrame,
+    titulo: str = "Relatório de Dados",
+    limite_linhas=LIMITE_LINHAS_WORD,
+):
+    """
+    Grava o DataFrame como tabela em um documento Word (.docx).
+
+    O python-docx monta apenas o esqueleto do documento (título, resumo e
+    cabeçalho da tabela); as linhas são geradas em bloco como XML e gravadas
+    direto no pacote .docx, sem criar um objeto por célula.
+    :param destino: Caminho do arquivo ou objeto binário gravável (ex.: BytesIO).
+    :param df: DataFrame a exportar.
+    :param titulo: Título do relatório.
+    :param limite_linhas: Máximo de linhas na tabela; None grava todas.
+    """
+    with etapa("exportar", formato="docx") as medida:
+        _escrever_relatorio_word(destino, df, titulo, limite_linhas)
+        if isinstance(destino, (str, os.PathLike)):
+            tamanho = os.path.getsize(destino)
+        else:
+            tamanho = destino.tell() if hasattr(destino, "tell") else None
+        medida.registrar(linhas=len(df), tamanho_bytes=tamanho)
+
+
+def _escrever_relatorio_word(destino, df, titulo, limite_linhas):
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading(titulo, level=1)
+
+    exibidas = len(df) if limite_linhas is None else min(len(df), limite_linhas)
+    if exibidas < len(df):
+        _adicionar_resumo(doc, df, exibidas)
+        doc.add_heading("Dados", level=2)
+
+    tabela = doc.add_table(rows=1, cols=len(df.columns))
+    tabela.style = "Table Grid"
+    for i, coluna in enumerate(df.columns):
+        tabela.cell(0, i).text = str(coluna)
+    _repetir_cabecalho(tabela.rows[0])
+    larguras = [coluna.w for coluna in tabela._tbl.tblGrid.gridCol_lst]
+    tabela.add_row().cells[0].text = _MARCADOR
+
+    esqueleto = BytesIO()
+    doc.save(esqueleto)
+    linhas = _linhas_xml(df.iloc[:exibidas], larguras)
+
+    with zipfile.ZipFile(esqueleto) as origem, zipfile.ZipFile(
+        destino, "w", zipfile.ZIP_DEFLATED
+    ) as saida:
+        for item in origem.infolist():
+            conteudo = origem.read(item)
+            if item.filename != "word/document.xml":
+                saida.writestr(item, conteudo)
+                continue
+            # Substitui a linha marcadora pelas linhas geradas
+            xml = conteudo.decode("utf-8")
+            marcador = xml.index(_MARCADOR)
+            antes = xml.rindex("<w:tr>", 0, marcador)
+            depois = xml.index("</w:tr>", marcador) + len("</w:tr>")
+            with saida.open("word/document.xml", "w", force_zip64=True) as documento:
+                documento.write(xml[:antes].encode("utf-8"))
+                for bloco in linhas:
+                    documento.write(bloco.encode("utf-8"))
+                documento.write(xml[depois:].encode("utf-8"))
+
+
+def relatorio_word(df: pd.DataFrame, titulo: str = "Relatório de Dados",
+                   limite_linhas=LIMITE_LINHAS_WORD) -> bytes:
+    """
+    Mesmo que `escrever_relatorio_word`, retornando o conteúdo do .docx.
+    """
+    buffer = BytesIO()
+    escrever_relatorio_word(buffer, df, titulo, limite_linhas)
+    return buffer.getvalue()
+
+
+def historico_para_word(historico) -> bytes:
+    """
+    Relatório de perguntas e respostas do chat.
+    :param historico: Lista de (pergunta, resposta).
+    :return: Conteúdo do arquivo .docx.
+    """
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("Relatório de Perguntas e Respostas", level=1)
+    for i, (pergunta, resposta) in enumerate(historico, 1):
+        doc.add_paragraph(f"{i}. Pergunta: {pergunta}")
+        doc.add_paragraph(f"   Resposta: {resposta}")
+        doc.add_paragraph("")
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
@@ -1,4 +1,7 @@
+import subprocess
+import sys
 import unittest
+import pandas as pd
 from agent_manager import AgentManager
 
 
@@ -14,12 +17,34 @@ class TestAgentManager(unittest.TestCase):
         self.assertIsNotNone(df)
         self.assertFalse(df.empty)
 
+    def test_carregar_arquivos_isola_erros(self):
+        progresso = []
+        resultado = self.manager.carregar_arquivos(
+            ["data/exemplo.csv", "data/inexistente.csv", "data/exemplo.csv"],
+            max_workers=2,
+            ao_progredir=lambda nome, feitos, total, erro: progresso.append(feitos),
+        )
+        self.assertEqual(resultado.arquivos, ["exemplo.csv", "exemplo.csv"])
+        self.assertIn("inexistente.csv", resultado.erros)
+        self.assertEqual(len(resultado.df), 4)
+        self.assertEqual(resultado.inicios, [0, 2])
+        self.assertEqual(sorted(progresso), [1, 2, 3])
+        pd.testing.assert_frame_equal(self.manager.memoria.obter("arquivo_carregado"), resultado.df)
+
     def test_validar_arquivo(self):
-        # Simula a validação de um arquivo carregado
-        with open("data/exemplo.csv", "r") as arquivo:
+        # Simula a validação de um arquivo carregado com notas inválidas
+        with open("data/exemplo_invalido.csv", "r") as arquivo:
             self.manager.carregar_arquivo(arquivo)
         relatorio = self.manager.validar_arquivo()
         self.assertIn("validation error", relatorio)
+        self.assertIn("Linha 3", relatorio)
+
+    def test_validar_arquivo_valido(self):
+        # Com cfop lido como texto e data como data, o exemplo é válido
+        with open("data/exemplo.csv", "r") as arquivo:
+            self.manager.carregar_arquivo(arquivo)
+        relatorio = self.manager.validar_arquivo()
+        self.assertIn("sem erros", relatorio)
 
     def test_gerar_resposta(self):
         # Simula a geração de uma resposta baseada nos dados
@@ -28,6 +53,19 @@ class TestAgentManager(unittest.TestCase):
         resposta = self.manager.gerar_resposta("Qual o faturamento total?")
         self.assertIsInstance(resposta, str)
 
+    def test_importacao_nao_carrega_bibliotecas_pesadas(self):
+        # PDF, OCR, Gemini, Word e gráficos só são carregados no primeiro uso
+        codigo = (
+            "import sys, agent_manager, exporter, visualization\n"
+            "pesadas = ['PyPDF2', 'pytesseract', 'PIL', 'google.generativeai', 'docx',"
+            " 'matplotlib', 'seaborn', 'plotly']\n"
+            "print([m for m in pesadas if m in sys.modules])"
+        )
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(saida.strip(), "[]")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+import pandas as pd
+from anomaly_detector import detectar_anomalias, indice_hash
+from main.dicas_corujito import SEM_INCONSISTENCIAS, gerar_dica_corujito
+
+
+def gerar_df(linhas=200, semente=1):
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame(
+        {
+            "chave_acesso": [f"4125{i:040d}" for i in range(linhas)],
+            "numero": [str(i + 1) for i in range(linhas)],
+            "serie": "1",
+            "emitente": rng.choice(["Empresa A", "Empresa B"], linhas),
+            "data_emissao": pd.Timestamp("2025-01-01")
+            + pd.to_timedelta(np.arange(linhas) % 30, unit="D"),
+            "valor_total_nota": np.round(rng.uniform(900, 1100, linhas), 2) + np.arange(linhas) * 0.05,
+        }
+    )
+
+
+class TestDetectorAnomalias(unittest.TestCase):
+
+    def tipos(self, achados):
+        return {achado.tipo: achado for achado in achados}
+
+    def test_sem_achados(self):
+        self.assertEqual(detectar_anomalias(gerar_df()), [])
+        self.assertEqual(gerar_dica_corujito(gerar_df()), SEM_INCONSISTENCIAS)
+
+    def test_itens_da_mesma_nota_nao_sao_duplicidade(self):
+        df = gerar_df()
+        itens = df.loc[df.index.repeat(3)].reset_index(drop=True)
+        itens["item"] = np.tile(["1", "2", "3"], len(df))
+        self.assertEqual(detectar_anomalias(itens), [])
+
+    def test_copias_consecutivas_sao_duplicidade(self):
+        df = pd.DataFrame({"chave_acesso": ["111", "111", "222"], "valor_total_nota": 100.0})
+        achados = self.tipos(detectar_anomalias(df))
+        self.assertEqual(sorted(achados["chave_duplicada"].linhas), [0, 1])
+        reordenado = df.iloc[[0, 2, 1]].reset_index(drop=True)
+        self.assertEqual(sorted(self.tipos(detectar_anomalias(reordenado))["chave_duplicada"].linhas), [0, 2])
+
+        # Com coluna de item: a nota de dois itens repetida em seguida
+        itens = pd.DataFrame(
+            {"chave_acesso": ["111"] * 4 + ["222"], "item": ["1", "2", "1", "2", "1"], "valor": 50.0}
+        )
+        self.assertEqual(sorted(self.tipos(detectar_anomalias(itens))["chave_duplicada"].linhas), [0, 2])
+        self.assertEqual(detectar_anomalias(itens.iloc[[0, 1, 4]]), [])
+
+    def test_chave_duplicada_entre_arquivos(self):
+        df = gerar_df()
+        lote = pd.concat([df, df.iloc[[5]], df.iloc[[5]]], ignore_index=True)
+        achados = self.tipos(detectar_anomalias(lote, inicios_arquivos=[0, 200, 201]))
+        self.assertEqual(sorted(achados["chave_duplicada"].linhas), [5, 200, 201])
+        self.assertNotIn("numero_duplicado", achados)
+        self.assertNotIn("quase_duplicada", achados)
+
+    def test_numero_repetido_com_outra_chave(self):
+        df = gerar_df()
+        # Emitente com outra grafia: comparado sem maiúsculas e espaços nas pontas
+        repetida = df.iloc[[7]].assign(
+            chave_acesso="4125" + "9" * 40, emitente=df.loc[7, "emitente"].lower() + " "
+        )
+        achados = self.tipos(detectar_anomalias(pd.concat([df, repetida], ignore_index=True)))
+        self.assertEqual(sorted(achados["numero_duplicado"].linhas), [7, 200])
+        self.assertIn("1 número de nota se repete", achados["numero_duplicado"].mensagem)
+
+    def test_quase_duplicada(self):
+        df = gerar_df()
+        reemitida = df.iloc[[9]].assign(chave_acesso="4125" + "8" * 40, numero="999")
+        reemitida["valor_total_nota"] += 0.01
+        achados = detectar_anomalias(pd.concat([df, reemitida], ignore_index=True))
+        self.assertEqual(achados[0].tipo, "quase_duplicada")
+        self.assertEqual(sorted(achados[0].linhas), [9, 200])
+
+    def test_valor_atipico_por_emitente(self):
+        df = gerar_df()
+        df.loc[3, "valor_total_nota"] = 950_000.0
+        achados = self.tipos(detectar_anomalias(df))
+        self.assertEqual(list(achados["valor_atipico_emitente"].linhas), [3])
+
+    def test_ordem_por_gravidade_e_dica(self):
+        df = gerar_df()
+        df.loc[3, "valor_total_nota"] = 950_000.0
+        lote = pd.concat([df, df.iloc[[5]]], ignore_index=True)
+        achados = detectar_anomalias(lote, inicios_arquivos=[0, 200])
+        self.assertEqual([a.tipo for a in achados], ["chave_duplicada", "valor_atipico_emitente"])
+        dica = gerar_dica_corujito(lote, [0, 200])
+        self.assertEqual(dica.splitlines(), [a.mensagem for a in achados])
+
+    def test_indice_hash_categorico(self):
+        df = gerar_df()
+        categorico = df.astype({"emitente": "category", "serie": "category"})
+        np.testing.assert_array_equal(
+            indice_hash(df, ["numero", "serie", "emitente"]),
+            indice_hash(categorico, ["numero", "serie", "emitente"]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
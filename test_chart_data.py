@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import chart_data
+from chart_data import EspecGrafico, dados_grafico, dimensoes_disponiveis, espec_por_dimensao, lttb
+
+
+class TestDadosGrafico(unittest.TestCase):
+
+    def setUp(self):
+        n = 5000
+        rng = np.random.default_rng(3)
+        self.df = pd.DataFrame(
+            {
+                "emitente": [f"Empresa {i % 50:02d}" for i in range(n)],
+                "cfop": ["5102", "6101"] * (n // 2),
+                "valor": rng.gamma(2.0, 100.0, n).round(2),
+                "data_emissao": pd.Timestamp("2025-01-01")
+                + pd.to_timedelta(rng.integers(0, 365 * 24, n), unit="h"),
+            }
+        )
+
+    def test_lttb_mantem_extremos(self):
+        x = np.arange(10_000, dtype=float)
+        y = np.sin(x / 500)
+        y[4321] = 50.0
+        escolhidos = lttb(x, y, 200)
+        self.assertEqual(len(escolhidos), 200)
+        self.assertEqual((escolhidos[0], escolhidos[-1]), (0, 9999))
+        self.assertIn(4321, escolhidos)
+        self.assertTrue((np.diff(escolhidos) > 0).all())
+
+    def test_categorias_com_outros(self):
+        dados = dados_grafico(self.df, EspecGrafico("emitente", "valor", pontos=10))
+        self.assertEqual(len(dados), 10)
+        self.assertEqual(dados["emitente"].iloc[-1], "Outros")
+        self.assertAlmostEqual(dados["valor_total"].sum(), self.df["valor"].sum(), places=4)
+
+    def test_contagem_por_mes(self):
+        dados = dados_grafico(self.df, EspecGrafico("data_emissao", None, "count", "M"))
+        self.assertEqual(len(dados), 12)
+        self.assertEqual(dados["quantidade"].sum(), len(self.df))
+
+    def test_serie_respeita_orcamento(self):
+        dados = dados_grafico(self.df, EspecGrafico("data_emissao", "valor", pontos=300))
+        self.assertEqual(len(dados), 300)
+        self.assertTrue(dados["data_emissao"].is_monotonic_increasing)
+        self.assertEqual(dados["valor_total"].max(), self.df["valor"].max())
+
+    def test_memoizado_por_conjunto_e_especificacao(self):
+        espec = EspecGrafico("cfop", "valor")
+        primeira = dados_grafico(self.df, espec)
+        with mock.patch.object(chart_data, "_calcular") as calcular:
+            segunda = dados_grafico(self.df.copy(), espec)  # Mesmo conteúdo, outro objeto
+        calcular.assert_not_called()
+        pd.testing.assert_frame_equal(primeira, segunda)
+
+    def test_dimensoes(self):
+        self.assertEqual(
+            dimensoes_disponiveis(self.df),
+            {
+                "emitente": ("emitente", None),
+                "cfop": ("cfop", None),
+                "dia": ("data_emissao", "D"),
+                "mês": ("data_emissao", "M"),
+            },
+        )
+        self.assertEqual(
+            espec_por_dimensao(self.df, "mês", por_quantidade=True),
+            EspecGrafico("data_emissao", None, "count", "M"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
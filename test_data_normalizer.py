@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+import pandas as pd
+from agent_manager import _alinhar_tipos
+from data_normalizer import normalizar_dataframe
+from file_reader import FileReader
+
+
+class TestNormalizacao(unittest.TestCase):
+
+    def setUp(self):
+        n = 1000
+        self.df = pd.DataFrame(
+            {
+                "emitente": [f"Empresa {i % 7}" for i in range(n)],
+                "cfop": ["5102", "6101"] * (n // 2),
+                "cnpj": [f"{i:014d}" for i in range(n)],
+                "valor_total": [f"{i},50" for i in range(n)],
+                "valor_pis": ["0,00"] * n,
+                "data_emissao": ["01/09/2025"] * n,
+                "descricao": [f"Serviço {i}" for i in range(n)],
+                "quantidade": np.arange(n, dtype="int64"),
+            },
+            dtype=object,
+        ).astype({"quantidade": "int64"})
+
+    def test_tipos_compactos(self):
+        resultado = normalizar_dataframe(self.df)
+        tipos = resultado.df.dtypes
+        self.assertIsInstance(tipos["emitente"], pd.CategoricalDtype)
+        self.assertIsInstance(tipos["cfop"], pd.CategoricalDtype)
+        self.assertEqual(tipos["valor_total"], np.float64)
+        self.assertEqual(tipos["valor_pis"], np.float64)
+        self.assertTrue(pd.api.types.is_datetime64_dtype(tipos["data_emissao"]))
+        self.assertEqual(tipos["quantidade"], np.int32)
+        # Códigos e textos com muitos valores distintos continuam texto
+        self.assertTrue(pd.api.types.is_string_dtype(tipos["cnpj"]))
+        self.assertEqual(resultado.df["cnpj"].iloc[1], "00000000000001")
+        self.assertTrue(pd.api.types.is_string_dtype(tipos["descricao"]))
+        self.assertEqual(resultado.df["valor_total"].iloc[3], 3.5)
+
+    def test_identificadores_so_com_digitos_continuam_texto(self):
+        df = FileReader.carregar_xml("data/exemplo.xml")
+        normalizado = normalizar_dataframe(df).df
+        pd.testing.assert_series_equal(
+            normalizado["cod_verificador_autenticidade"],
+            df["cod_verificador_autenticidade"],
+            check_dtype=False,
+        )
+        self.assertEqual(
+            normalizado["cod_verificador_autenticidade"].iloc[0],
+            "7657290925110258330025589752099999999991",
+        )
+        # Sem trecho de código no nome: longo demais ou com zero à esquerda
+        avulsos = pd.DataFrame(
+            {"registro": ["12345678901234567"], "ref": ["0123"]},
+            dtype=object,
+        )
+        normalizado = normalizar_dataframe(avulsos).df
+        self.assertEqual(normalizado["registro"].iloc[0], "12345678901234567")
+        self.assertEqual(normalizado["ref"].iloc[0], "0123")
+
+    def test_aritmetica_com_inteiros_normalizados(self):
+        df = pd.DataFrame({"quantidade": [1, 2, 5], "desconto": [5, 3, 3], "itens": ["200"] * 3})
+        normalizado = normalizar_dataframe(df).df
+        self.assertEqual((normalizado["desconto"] - normalizado["quantidade"]).tolist(), [4, 1, -2])
+        self.assertEqual((normalizado["itens"] + normalizado["itens"]).tolist(), [400] * 3)
+
+    def test_relatorio_de_memoria(self):
+        resultado = normalizar_dataframe(self.df)
+        self.assertLess(resultado.memoria_depois * 3, resultado.memoria_antes)
+        self.assertIn("MB", resultado.relatorio())
+        self.assertIn("- emitente: object -> category", resultado.relatorio())
+
+    def test_arrow(self):
+        resultado = normalizar_dataframe(self.df, arrow=True)
+        self.assertIsInstance(resultado.df["valor_total"].dtype, pd.ArrowDtype)
+        self.assertIsInstance(resultado.df["emitente"].dtype, pd.CategoricalDtype)
+        self.assertEqual(resultado.df["valor_total"].sum(), self.df.shape[0] ** 2 / 2)
+
+    def test_concatenacao_mantem_categorias(self):
+        partes = [
+            normalizar_dataframe(self.df.iloc[:500]).df,
+            normalizar_dataframe(self.df.iloc[500:].assign(cfop="1102")).df,
+        ]
+        df = pd.concat(_alinhar_tipos(partes), ignore_index=True)
+        self.assertIsInstance(df["cfop"].dtype, pd.CategoricalDtype)
+        self.assertEqual(sorted(df["cfop"].cat.categories), ["1102", "5102", "6101"])
+        self.assertEqual(df["quantidade"].dtype, np.int32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+import pandas as pd
+from agent_manager import AgentManager
+from data_profile import PerfilDados, obter_perfil
+from parse_cache import CacheLeitura
+
+
+class TestPerfilDados(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.df = pd.DataFrame(
+            {
+                "valor": rng.gamma(2.0, 500.0, 500).round(2),
+                "numero": np.arange(1_000_000, 1_000_500),
+                "aliquota": rng.normal(2.0, 0.1, 500),
+                "emitente": ["Empresa A"] * 500,
+            }
+        )
+        self.df.loc[rng.choice(500, 50, replace=False), "aliquota"] = np.nan
+        self.numericas = self.df.select_dtypes(include="number")
+
+    def test_resumo_igual_ao_pandas(self):
+        perfil = PerfilDados.de_dataframe(self.df)
+        self.assertEqual(perfil.descrever().to_string(), self.numericas.describe().to_string())
+        self.assertEqual(perfil.correlacao().to_string(), self.numericas.corr().to_string())
+
+    def test_combinar_partes_independentes(self):
+        partes = [self.df.iloc[:120], self.df.iloc[120:]]
+        perfis = [PerfilDados.de_dataframe(parte) for parte in partes]
+        perfil = PerfilDados.combinar(perfis, self.df.dtypes, "combinado")
+        pd.testing.assert_frame_equal(perfil.descrever(), self.numericas.describe())
+        pd.testing.assert_frame_equal(perfil.correlacao(), self.numericas.corr())
+
+    def test_obter_perfil_reutiliza_calculo(self):
+        self.assertIs(obter_perfil(self.df), obter_perfil(self.df))
+
+    def test_manager_registra_perfil_na_carga(self):
+        manager = AgentManager(cache=CacheLeitura())
+        arquivos = ["data/exemplo.csv", "data/exemplo_invalido.csv"]
+        manager.carregar_arquivos(arquivos[:1], max_workers=1)
+        df = manager.carregar_arquivos(arquivos, max_workers=1).df
+        perfil = obter_perfil(df)
+        self.assertEqual(
+            perfil.descrever().to_string(),
+            df.select_dtypes(include="number").describe().to_string(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_validator import DataValidator
+
+
+class TestDataValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "valor": [100.0, -5.0, 250.5, np.nan, 10.0],
+                "cfop": ["5102", "51A2", "6101", "5102", None],
+                "emitente": ["Empresa A", "Empresa B", None, "Empresa D", "Empresa E"],
+                "data": ["2025-10-01", "2025-10-02", "2025-10-03", None, "2025-10-05"],
+            }
+        )
+
+    def test_relatorio_igual_ao_modo_linha(self):
+        resultado = DataValidator.validar_dados_vetorizado(self.df)
+        self.assertEqual(resultado.mensagens(), DataValidator.validar_dados(self.df))
+
+    def test_relatorio_igual_com_cfop_numerico(self):
+        with open("data/exemplo.csv", "r") as arquivo:
+            df = pd.read_csv(arquivo)
+        resultado = DataValidator.validar_dados_vetorizado(df)
+        self.assertEqual(resultado.mensagens(), DataValidator.validar_dados(df))
+
+    def test_erros_estruturados(self):
+        erros = DataValidator.validar_dados_vetorizado(self.df).erros
+        self.assertEqual(
+            list(erros.itertuples(index=False, name=None)),
+            [
+                (1, "valor", "greater_than"),
+                (1, "cfop", "string_pattern_mismatch"),
+                (2, "emitente", "string_type"),
+                (3, "valor", "greater_than"),
+                (3, "data", "string_type"),
+                (4, "cfop", "string_type"),
+            ],
+        )
+
+    def test_relatorio_igual_com_datas_tipadas(self):
+        df = self.df.assign(
+            data=pd.to_datetime(
+                ["2025-10-01", "2025-10-02T10:30", None, "2025-10-04", "2025-10-05"],
+                format="ISO8601",
+            )
+        )
+        resultado = DataValidator.validar_dados_vetorizado(df)
+        self.assertEqual(resultado.mensagens(), DataValidator.validar_dados(df))
+        # Datas convertidas pelo leitor (com ou sem horário) continuam aceitas
+        self.assertEqual(resultado.erros[resultado.erros["campo"] == "data"]["linha"].tolist(), [2])
+
+    def test_data_aceita_qualquer_texto(self):
+        df = self.df.iloc[[0]].assign(data=["01/10/2025"])
+        self.assertEqual(DataValidator.validar_dados(df), [])
+        self.assertEqual(len(DataValidator.validar_dados_vetorizado(df)), 0)
+        df = self.df.iloc[[0]].assign(data=["2025-10-01T10:30:00"])
+        self.assertEqual(DataValidator.validar_dados(df), [])
+
+    def test_sem_erros(self):
+        resultado = DataValidator.validar_dados_vetorizado(self.df.iloc[[0]])
+        self.assertEqual(len(resultado), 0)
+        self.assertEqual(resultado.mensagens(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
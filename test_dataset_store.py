@@ -0,0 +1,134 @@
+import gc
+import tempfile
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+from dataset_store import ArmazemDados
+from data_profile import PerfilDados, obter_perfil, registrar_perfil
+from memory_module import MemoriaCompartilhada
+
+
+def gerar_df(semente, linhas=1000):
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame(
+        {
+            "valor": rng.gamma(2.0, 500.0, linhas),
+            "cfop": rng.choice(["5102", "6101"], linhas),
+            "data": pd.date_range("2025-01-01", periods=linhas, freq="h"),
+        }
+    )
+
+
+class TestArmazemDados(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+
+    def test_sessoes_separadas_e_deduplicacao(self):
+        armazem = ArmazemDados(diretorio=self.pasta.name)
+        a = MemoriaCompartilhada(armazem=armazem)
+        b = MemoriaCompartilhada(armazem=armazem)
+        a.salvar("arquivo_carregado", gerar_df(1))
+        b.salvar("arquivo_carregado", gerar_df(1))
+        b.salvar("resumo", "texto")
+
+        self.assertIsNone(a.obter("resumo"))
+        self.assertEqual(b.obter("resumo"), "texto")
+        estatisticas = armazem.estatisticas()
+        self.assertEqual(estatisticas["conjuntos"], 1)
+        self.assertEqual(estatisticas["deduplicados"], 1)
+        self.assertEqual(estatisticas["sessoes"], 2)
+
+    def test_visao_nao_altera_o_conjunto_guardado(self):
+        armazem = ArmazemDados(diretorio=self.pasta.name)
+        df = gerar_df(2)
+        armazem.salvar("s1", "dados", df)
+        visao = armazem.obter("s1", "dados")
+        self.assertTrue(np.shares_memory(visao["valor"].to_numpy(), df["valor"].to_numpy()))
+
+        visao.loc[0, "valor"] = -1.0
+        self.assertNotEqual(armazem.obter("s1", "dados").loc[0, "valor"], -1.0)
+
+    def test_edicao_do_chamador_depois_de_salvar(self):
+        armazem = ArmazemDados(diretorio=self.pasta.name)
+        df = pd.DataFrame({"v": [1.0, 2.0]})
+        armazem.salvar("s1", "k", df)
+        df.loc[0, "v"] = 99
+        armazem.salvar("s3", "k", pd.DataFrame({"v": [1.0, 2.0]}))
+        self.assertEqual(armazem.estatisticas()["deduplicados"], 1)
+        self.assertEqual(armazem.obter("s3", "k")["v"].tolist(), [1.0, 2.0])
+        self.assertEqual(armazem.obter("s1", "k")["v"].tolist(), [1.0, 2.0])
+
+    def test_despejo_em_disco_e_recarga(self):
+        df1, df2 = gerar_df(3), gerar_df(4)
+        tamanho = int(df1.memory_usage(deep=True).sum())
+        armazem = ArmazemDados(limite_bytes=int(tamanho * 1.5), diretorio=self.pasta.name)
+        armazem.salvar("s1", "dados", df1)
+        armazem.salvar("s2", "dados", df2)
+
+        estatisticas = armazem.estatisticas()
+        self.assertEqual(estatisticas["residentes"], 1)
+        self.assertLessEqual(estatisticas["bytes_residentes"], armazem.limite_bytes)
+        self.assertEqual(estatisticas["despejos"], 1)
+
+        pd.testing.assert_frame_equal(armazem.obter("s1", "dados"), df1)
+        self.assertEqual(armazem.estatisticas()["recarregamentos"], 1)
+
+    def test_perfil_acompanha_a_visao(self):
+        armazem = ArmazemDados(diretorio=self.pasta.name)
+        df = gerar_df(5)
+        perfil = PerfilDados.de_dataframe(df)
+        registrar_perfil(df, perfil)
+        armazem.salvar("s1", "dados", df)
+        self.assertIs(obter_perfil(armazem.obter("s1", "dados")), perfil)
+
+    def test_sessao_liberada_ao_descartar_memoria(self):
+        armazem = ArmazemDados(diretorio=self.pasta.name)
+        memoria = MemoriaCompartilhada(armazem=armazem)
+        memoria.salvar("arquivo_carregado", gerar_df(6))
+        del memoria
+        gc.collect()
+        self.assertEqual(armazem.estatisticas()["conjuntos"], 0)
+        self.assertEqual(armazem.estatisticas()["bytes_residentes"], 0)
+
+    def test_versoes(self):
+        memoria = MemoriaCompartilhada(armazem=ArmazemDados(diretorio=self.pasta.name))
+        self.assertIsNone(memoria.versao("dados"))
+        v1 = memoria.salvar("dados", gerar_df(7))
+        self.assertEqual(memoria.versao("dados"), v1)
+        df, versao = memoria.obter_com_versao("dados")
+        self.assertEqual(versao, v1)
+        v2 = memoria.salvar("dados", gerar_df(8))
+        self.assertGreater(v2, v1)
+        self.assertEqual(memoria.versao("dados"), v2)
+
+    def test_leituras_concorrentes_com_escritas(self):
+        armazem = ArmazemDados(diretorio=self.pasta.name)
+        quadros = [gerar_df(s, linhas=50) for s in range(4)]
+        armazem.salvar("s", "dados", quadros[0])
+        erros = []
+
+        def ler():
+            for _ in range(300):
+                df, versao = armazem.obter_com_versao("s", "dados")
+                if df is None or versao is None or len(df) != 50:
+                    erros.append(versao)
+
+        def escrever():
+            for i in range(100):
+                armazem.salvar("s", "dados", quadros[i % 4])
+
+        threads = [threading.Thread(target=ler) for _ in range(4)]
+        threads.append(threading.Thread(target=escrever))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(erros, [])
+        self.assertEqual(armazem.estatisticas()["conjuntos"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
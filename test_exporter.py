@@ -0,0 +1,70 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from exporter import Exporter, formatos_disponiveis
+
+
+class TestExporter(unittest.TestCase):
+
+    def setUp(self):
+        n = 25
+        self.df = pd.DataFrame(
+            {
+                "valor": np.arange(n, dtype=float),
+                "cfop": pd.Categorical(["5102", "6101"] * 12 + ["5102"]),
+                "emitente": [f"Empresa \"{i}\"" for i in range(n)],
+            }
+        )
+
+    def test_csv_em_blocos_igual_ao_pandas(self):
+        buffer = io.BytesIO()
+        Exporter.exportar_para_csv(self.df, buffer, tamanho_bloco=7)
+        self.assertEqual(buffer.getvalue().decode("utf-8"), self.df.to_csv(index=False))
+
+    def test_json_em_blocos_igual_ao_pandas(self):
+        buffer = io.BytesIO()
+        Exporter.exportar_para_json(self.df, buffer, tamanho_bloco=7)
+        esperado = self.df.to_json(orient="records", force_ascii=False)
+        self.assertEqual(buffer.getvalue().decode("utf-8"), esperado)
+
+    def test_jsonl_gzip_pela_extensao(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "notas.jsonl.gz")
+            Exporter.exportar_para_jsonl(self.df, caminho, tamanho_bloco=10)
+            with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+                lido = pd.read_json(arquivo, lines=True, dtype={"cfop": str})
+        self.assertEqual(len(lido), len(self.df))
+        self.assertEqual(lido["emitente"].tolist(), self.df["emitente"].tolist())
+
+    def test_parquet_e_feather(self):
+        for formato in ("parquet", "feather"):
+            arquivo = Exporter.arquivo_temporario(self.df, formato)
+            with arquivo:
+                lido = getattr(pd, f"read_{formato}")(arquivo)
+            pd.testing.assert_frame_equal(lido, self.df)
+
+    def test_zstd_nao_fecha_destino(self):
+        buffer = io.BytesIO()
+        Exporter.exportar_para_csv(self.df, buffer, compressao="zstd")
+        self.assertFalse(buffer.closed)
+        conteudo = pa.input_stream(pa.py_buffer(buffer.getvalue()), compression="zstd").read()
+        self.assertEqual(conteudo.decode("utf-8"), self.df.to_csv(index=False))
+
+    def test_formatos_sem_pyarrow(self):
+        self.assertIn("parquet", formatos_disponiveis())
+        with mock.patch("importlib.util.find_spec", return_value=None):
+            self.assertEqual(list(formatos_disponiveis()), ["csv", "json", "jsonl"])
+
+    def test_formato_invalido(self):
+        with self.assertRaises(ValueError):
+            Exporter.exportar(self.df, io.BytesIO(), "xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()
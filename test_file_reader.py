@@ -1,7 +1,9 @@
 # test_file_reader.py
 
 from file_reader import FileReader
+import io
 import os
+import pandas as pd
 import xml.etree.ElementTree as ET
 
 
@@ -35,6 +37,65 @@ def test_carregar_xml():
         print(f"Erro ao carregar XML: {e}")
 
 
+def test_carregar_xml_em_blocos_igual_ao_completo():
+    caminho = os.path.join("data", "exemplo.xml")
+    esperado = FileReader.carregar_xml(caminho)
+    blocos = list(FileReader.carregar_xml_em_blocos(caminho, tamanho_bloco=1))
+    pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), esperado)
+
+
+def test_carregar_xml_em_blocos_tamanho_e_aninhamento():
+    xml = (
+        b"<lote><NFSe><Nota><numero>1</numero></Nota><valor>10,00</valor></NFSe>"
+        b"<NFSe id='2'><numero>2</numero></NFSe><NFSe><numero>3</numero></NFSe></lote>"
+    )
+    esperado = FileReader.carregar_xml(io.BytesIO(xml))
+    blocos = list(FileReader.carregar_xml_em_blocos(io.BytesIO(xml), tamanho_bloco=2))
+    assert [len(bloco) for bloco in blocos] == [2, 1]
+    pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), esperado)
+
+
+def test_carregar_xml_tipado_nfe():
+    df = FileReader.carregar_xml_tipado(os.path.join("data", "exemplo_nfe.xml"))
+    assert len(df) == 2  # Uma linha por <det>
+    assert list(df["item"]) == ["1", "2"]
+    assert (df["emitente"] == "Empresa A Comercio Ltda").all()
+    assert df["valor"].dtype == "float64"
+    assert list(df["valor"]) == [1000.50, 144.63]
+    assert df["data_emissao"].iloc[0] == pd.Timestamp("2025-10-01 10:15:00")
+    assert df["chave_acesso"].iloc[0].startswith("3525")
+
+
+def test_carregar_xml_tipado_nfse():
+    df = FileReader.carregar_xml_tipado(os.path.join("data", "exemplo.xml"))
+    assert df["valor_total"].iloc[0] == 144.63
+    assert df["aliquota_item_lista_servico"].iloc[0] == 2.0
+    assert pd.api.types.is_datetime64_any_dtype(df["data_nfse"])
+
+
+def test_carregar_csv_identificadores_como_texto():
+    csv = (
+        b"chave_acesso,numero,serie,emitente_cnpj,valor\n"
+        b"35251012345678000195550010000012341000012345,000123,001,01234567000189,10.5\n"
+    )
+    df = FileReader.carregar_csv(io.BytesIO(csv))
+    assert df["chave_acesso"].iloc[0] == "35251012345678000195550010000012341000012345"
+    assert (df["numero"].iloc[0], df["serie"].iloc[0]) == ("000123", "001")
+    assert df["emitente_cnpj"].iloc[0] == "01234567000189"
+    assert df["valor"].iloc[0] == 10.5
+
+
+def test_carregar_csv_latin1_depois_da_amostra():
+    # Primeiro caractere acentuado além da amostra usada na detecção
+    linhas = [f"{i},Empresa {i},10.5" for i in range(20_000)] + ["20000,São Paulo,7.25"]
+    csv = ("numero,emitente,valor\n" + "\n".join(linhas) + "\n").encode("latin1")
+    df = FileReader.carregar_csv(io.BytesIO(csv))
+    assert len(df) == 20_001
+    assert df["emitente"].iloc[-1] == "São Paulo"
+    blocos = list(FileReader.carregar_csv_em_blocos(io.BytesIO(csv), tamanho_bloco=15_000))
+    pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), df)
+
+
 def testar_xml(arquivo_xml):
     try:
         tree = ET.parse(arquivo_xml)
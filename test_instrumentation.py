@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+import instrumentation
+from agent_manager import AgentManager
+from exporter import Exporter
+from instrumentation import GravadorEventos, Instrumentacao, INSTRUMENTACAO, etapa
+from parse_cache import CacheLeitura
+
+
+class TestInstrumentacao(unittest.TestCase):
+
+    def test_desligada_nao_registra(self):
+        instrumentacao = Instrumentacao()
+        with instrumentacao.etapa("ler") as medida:
+            medida.registrar(linhas=10)
+        self.assertIs(medida, instrumentation._INATIVA)
+        self.assertEqual(instrumentacao.eventos(), [])
+
+    def test_etapas_aninhadas_com_memoria(self):
+        instrumentacao = Instrumentacao(ativa=True, memoria=True)
+        try:
+            with instrumentacao.etapa("carregar", formato="csv") as externa:
+                with instrumentacao.etapa("ler") as interna:
+                    dados = bytearray(2_000_000)
+                    interna.registrar(linhas=5, tamanho_bytes=len(dados))
+                del dados
+                externa.registrar(linhas=5, arquivos=1)
+            with self.assertRaises(ValueError):
+                with instrumentacao.etapa("ler"):
+                    raise ValueError("falha")
+        finally:
+            instrumentacao.configurar(memoria=False)
+
+        ler, carregar, falha = instrumentacao.eventos()
+        self.assertEqual((ler.nome, ler.pai, ler.linhas, ler.bytes), ("ler", "carregar", 5, 2_000_000))
+        self.assertIsNone(carregar.pai)
+        self.assertEqual(carregar.atributos, {"formato": "csv", "arquivos": 1})
+        # O pico da etapa interna também conta para a que a contém
+        self.assertGreaterEqual(ler.memoria_bytes, 2_000_000)
+        self.assertGreaterEqual(carregar.memoria_bytes, 2_000_000)
+        self.assertEqual(falha.erro, "ValueError")
+
+        agregados = instrumentacao.agregados()
+        self.assertEqual(agregados["ler"]["chamadas"], 2)
+        self.assertEqual(agregados["ler"]["erros"], 1)
+        self.assertEqual(agregados["carregar"]["medidas"], {"arquivos": 1})
+
+    def test_texto_prometheus_e_fluxo_de_eventos(self):
+        instrumentacao = Instrumentacao(ativa=True)
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "eventos.jsonl")
+            instrumentacao.assinar(GravadorEventos(caminho))
+            for _ in range(2):
+                with instrumentacao.etapa('exportar "x"') as medida:
+                    medida.registrar(linhas=3, tamanho_bytes=100, prompt_tokens=7)
+            with open(caminho, encoding="utf-8") as arquivo:
+                registros = [json.loads(linha) for linha in arquivo]
+
+        self.assertEqual(len(registros), 2)
+        self.assertEqual(registros[0]["atributos"], {"prompt_tokens": 7})
+        texto = instrumentacao.texto_prometheus()
+        self.assertIn('chatfiscal_etapa_segundos_count{etapa="exportar \\"x\\""} 2', texto)
+        self.assertIn('chatfiscal_etapa_linhas_total{etapa="exportar \\"x\\""} 6', texto)
+        self.assertIn('chatfiscal_etapa_bytes_total{etapa="exportar \\"x\\""} 200', texto)
+        self.assertIn(
+            'chatfiscal_etapa_medida_total{etapa="exportar \\"x\\"",medida="prompt_tokens"} 14', texto
+        )
+        self.assertTrue(texto.endswith("\n"))
+
+
+class TestEtapasDoPipeline(unittest.TestCase):
+
+    def setUp(self):
+        INSTRUMENTACAO.limpar()
+        INSTRUMENTACAO.configurar(ativa=True)
+
+    def tearDown(self):
+        INSTRUMENTACAO.configurar(ativa=False)
+        INSTRUMENTACAO.limpar()
+
+    def test_carregar_validar_e_exportar(self):
+        manager = AgentManager(cache=CacheLeitura())
+        df = manager.carregar_arquivos(["data/exemplo.csv"], max_workers=1).df
+        manager.validar_arquivo()
+        with tempfile.TemporaryDirectory() as diretorio:
+            destino = os.path.join(diretorio, "saida.csv")
+            Exporter.exportar_para_csv(df, destino)
+            tamanho = os.path.getsize(destino)
+
+        eventos = {evento.nome: evento for evento in INSTRUMENTACAO.eventos()}
+        self.assertEqual(eventos["carregar_arquivos"].linhas, len(df))
+        self.assertEqual(eventos["carregar_arquivos"].atributos["arquivos"], 1)
+        self.assertEqual(eventos["ler_arquivo"].pai, "carregar_arquivos")
+        self.assertEqual(eventos["ler_arquivo"].linhas, len(df))
+        self.assertEqual(eventos["validar_arquivo"].linhas, len(df))
+        self.assertEqual(eventos["exportar"].atributos["formato"], "csv")
+        self.assertEqual(eventos["exportar"].bytes, tamanho)
+        self.assertIsInstance(eventos["carregar_arquivos"].segundos, float)
+
+    def test_atalho_desligado(self):
+        INSTRUMENTACAO.configurar(ativa=False)
+        self.assertIs(etapa("qualquer"), instrumentation._INATIVA)
+        Exporter.exportar_para_jsonl(pd.DataFrame({"a": [1]}), os.devnull)
+        self.assertEqual(INSTRUMENTACAO.eventos(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from agent_manager import AgentManager
+from kpi_rollup import SEM_INFORMACAO, CuboKPI, chave_cubo
+from parse_cache import CacheLeitura
+from partition_index import IndiceParticoes
+
+
+def gerar_notas(linhas, semente):
+    rng = np.random.default_rng(semente)
+    valores = np.round(rng.uniform(100, 1000, linhas), 2)
+    return pd.DataFrame(
+        {
+            "emitente": rng.choice(["Empresa A", "Empresa B", None], linhas),
+            "cfop": rng.choice(["5102", "6102"], linhas),
+            "data_emissao": pd.Timestamp("2025-01-01")
+            + pd.to_timedelta(rng.integers(0, 120, linhas), unit="D"),
+            "valor_total_nota": valores,
+            "valor_iss": np.round(valores * 0.05, 2),
+            "valor_pis": np.round(valores * 0.0065, 2),
+        }
+    )
+
+
+class TestCuboKPI(unittest.TestCase):
+
+    def setUp(self):
+        self.df = gerar_notas(2000, semente=5)
+
+    def test_fatias_conferem_com_as_notas(self):
+        cubo = CuboKPI.de_dataframe(self.df)
+        self.assertEqual(cubo.dimensoes, ["emitente", "cfop", "mes"])
+        self.assertEqual(cubo.medidas, ["linhas", "valor", "iss", "pis"])
+
+        por_cfop = cubo.fatiar("cfop", {"emitente": "Empresa A"}).set_index("cfop")
+        notas = self.df[self.df["emitente"] == "Empresa A"].groupby("cfop")
+        np.testing.assert_allclose(por_cfop["iss"].sort_index(), notas["valor_iss"].sum())
+        np.testing.assert_array_equal(por_cfop["linhas"].sort_index(), notas.size())
+
+        meses = cubo.fatiar("mes")
+        self.assertEqual(meses["mes"].tolist(), ["2025-01", "2025-02", "2025-03", "2025-04"])
+        self.assertEqual(cubo.fatiar("emitente")["emitente"].isin([SEM_INFORMACAO]).sum(), 1)
+
+        totais = cubo.totais({"mes": ["2025-01", "2025-02"]})
+        no_periodo = self.df[self.df["data_emissao"] < "2025-03-01"]
+        self.assertEqual(totais["linhas"], len(no_periodo))
+        self.assertAlmostEqual(totais["valor"], no_periodo["valor_total_nota"].sum(), places=4)
+
+    def test_combinar_equivale_ao_consolidado(self):
+        partes = [self.df.iloc[:700], self.df.iloc[700:].drop(columns="valor_pis")]
+        combinado = CuboKPI.combinar([CuboKPI.de_dataframe(p) for p in partes])
+        # PIS ausente no segundo arquivo conta como zero
+        sem_pis = self.df.assign(valor_pis=self.df["valor_pis"].where(self.df.index < 700, 0))
+        direto = CuboKPI.de_dataframe(sem_pis)
+        for por in [["emitente"], ["cfop", "mes"]]:
+            pd.testing.assert_frame_equal(
+                combinado.fatiar(por).sort_values(por).reset_index(drop=True),
+                direto.fatiar(por).sort_values(por).reset_index(drop=True),
+            )
+
+    def test_cubo_persistido_no_cache(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            indice = IndiceParticoes(CacheLeitura(diretorio=diretorio))
+            indice.sincronizar([("arquivo-a", self.df)])
+            esperado = indice.cubo().fatiar(["emitente", "mes"])
+
+            # Outro processo: o cubo vem do disco, sem as notas
+            cache = CacheLeitura(diretorio=diretorio)
+            self.assertIsNotNone(cache.obter(chave_cubo("arquivo-a")))
+            indice = IndiceParticoes(cache)
+            indice.sincronizar([("arquivo-a", self.df.iloc[:0])])
+            pd.testing.assert_frame_equal(indice.cubo().fatiar(["emitente", "mes"]), esperado)
+
+    def test_manager_atualiza_kpis_com_novos_arquivos(self):
+        manager = AgentManager(cache=CacheLeitura())
+        self.assertIsNone(manager.kpis())
+        manager.carregar_arquivos(["data/exemplo.csv"], max_workers=1)
+        um = manager.kpis().totais()["linhas"]
+        df = manager.carregar_arquivos(["data/exemplo.csv", "data/exemplo.csv"], max_workers=1).df
+        self.assertEqual(manager.kpis().totais()["linhas"], 2 * um)
+        self.assertEqual(manager.kpis().totais()["linhas"], len(df))
+        self.assertEqual(manager.particoes.calculadas, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import threading
+import time
+import unittest
+import pandas as pd
+from llm_cache import CacheRespostas, chave_resposta
+from llm_client import BackendFalso, ClienteLLM
+from llm_utils import gerar_resposta_llm
+
+
+class TestCacheRespostas(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = BackendFalso(latencia=0)
+        self.cliente = ClienteLLM(self.backend)
+        self.df = pd.DataFrame({"valor": [10.0, 20.0], "cfop": ["5102", "6101"]})
+
+    def tearDown(self):
+        self.cliente.fechar()
+
+    def test_mesma_pergunta_usa_cache(self):
+        cache = CacheRespostas()
+        primeira = gerar_resposta_llm("Qual o total?", self.df, self.cliente, cache)
+        segunda = gerar_resposta_llm("qual  o TOTAL?", self.df, self.cliente, cache)
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(self.backend.chamadas, 1)
+        self.assertEqual(cache.estatisticas()["acertos"], 1)
+        self.assertEqual(cache.estatisticas()["falhas"], 1)
+
+    def test_outro_conjunto_de_dados_nao_usa_cache(self):
+        cache = CacheRespostas()
+        gerar_resposta_llm("Qual o total?", self.df, self.cliente, cache)
+        outro = self.df.assign(valor=[10.0, 30.0])
+        gerar_resposta_llm("Qual o total?", outro, self.cliente, cache)
+        self.assertEqual(self.backend.chamadas, 2)
+
+    def test_ttl_e_limite_de_entradas(self):
+        agora = [0.0]
+        cache = CacheRespostas(ttl_segundos=10, max_entradas=2, relogio=lambda: agora[0])
+        for chave in ("a", "b", "c"):
+            cache.obter_ou_gerar(chave, lambda: chave)
+        self.assertEqual(list(cache.entradas), ["b", "c"])
+
+        agora[0] = 11.0
+        self.assertEqual(cache.obter_ou_gerar("b", lambda: "nova"), "nova")
+        self.assertEqual(cache.estatisticas()["expiradas"], 1)
+
+    def test_agrupa_pedidos_simultaneos(self):
+        cache = CacheRespostas()
+        liberar = threading.Event()
+        chamadas = []
+
+        def gerar():
+            chamadas.append(1)
+            liberar.wait(5)
+            return "ok"
+
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda: resultados.append(cache.obter_ou_gerar("k", gerar)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        while cache.estatisticas()["agrupadas"] < 4:
+            time.sleep(0.01)
+        liberar.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(resultados, ["ok"] * 5)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_falha_nao_fica_em_cache(self):
+        cache = CacheRespostas()
+
+        def falhar():
+            raise RuntimeError("cota excedida")
+
+        with self.assertRaises(RuntimeError):
+            cache.obter_ou_gerar("k", falhar)
+        self.assertEqual(cache.obter_ou_gerar("k", lambda: "ok"), "ok")
+        self.assertEqual(cache.em_andamento, {})
+
+    def test_chave_normaliza_prompt(self):
+        self.assertEqual(
+            chave_resposta("m", "Total  de\nISS", "fp"), chave_resposta("m", "total de iss", "fp")
+        )
+        self.assertNotEqual(chave_resposta("m", "x", "fp1"), chave_resposta("m", "x", "fp2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import unittest
+import pandas as pd
+from llm_cache import CacheRespostas
+from llm_client import BackendFalso, ClienteLLM, ErroLimiteTaxa
+from llm_utils import gerar_resposta_llm, gerar_respostas_llm
+
+
+class TestClienteLLM(unittest.TestCase):
+
+    def criar_cliente(self, backend, **opcoes):
+        cliente = ClienteLLM(backend, **opcoes)
+        self.addCleanup(cliente.fechar)
+        return cliente
+
+    def test_lote_respeita_limite_de_concorrencia(self):
+        backend = BackendFalso(latencia=0.02)
+        cliente = self.criar_cliente(backend, max_concorrentes=3)
+        inicio = time.perf_counter()
+        respostas = cliente.gerar_lote_sync([f"pergunta {i}" for i in range(12)])
+        duracao = time.perf_counter() - inicio
+
+        self.assertEqual(respostas, [f"Resposta: pergunta {i}" for i in range(12)])
+        self.assertEqual(backend.max_em_execucao, 3)
+        self.assertLess(duracao, 12 * 0.02)
+
+    def test_repete_erro_de_limite_de_taxa(self):
+        backend = BackendFalso(latencia=0, falhas_limite_taxa=2)
+        cliente = self.criar_cliente(backend, espera_base=0.001)
+        self.assertEqual(cliente.gerar_sync("oi"), "Resposta: oi")
+        self.assertEqual(cliente.estatisticas()["retentativas"], 2)
+
+    def test_desiste_apos_tentativas(self):
+        backend = BackendFalso(latencia=0, falhas_limite_taxa=5)
+        cliente = self.criar_cliente(backend, tentativas=2, espera_base=0.001)
+        with self.assertRaises(ErroLimiteTaxa):
+            cliente.gerar_sync("oi")
+        self.assertEqual(backend.chamadas, 2)
+
+    def test_timeout(self):
+        cliente = self.criar_cliente(BackendFalso(latencia=1), timeout_segundos=0.01)
+        with self.assertRaises(TimeoutError):
+            cliente.gerar_sync("oi")
+        self.assertEqual(cliente.estatisticas()["timeouts"], 1)
+
+    def test_api_assincrona_em_outro_loop(self):
+        cliente = self.criar_cliente(BackendFalso(latencia=0))
+
+        async def perguntar():
+            return await cliente.gerar("a"), await cliente.gerar_lote(["b", "c"])
+
+        self.assertEqual(
+            asyncio.run(perguntar()), ("Resposta: a", ["Resposta: b", "Resposta: c"])
+        )
+
+    def test_gerar_respostas_em_lote_usa_cache(self):
+        backend = BackendFalso(latencia=0)
+        cliente = self.criar_cliente(backend)
+        cache = CacheRespostas()
+        df = pd.DataFrame({"valor": [1.0, 2.0]})
+
+        primeiras = gerar_respostas_llm(["Qual o total?", "Qual a média?"], df, cliente, cache)
+        segundas = gerar_respostas_llm(["Qual o total?", "Qual a média?"], df, cliente, cache)
+        self.assertEqual(primeiras, segundas)
+        self.assertEqual(backend.chamadas, 2)
+
+    def test_stream_entrega_trechos_antes_do_fim(self):
+        backend = BackendFalso(latencia=0, latencia_trecho=0.05)
+        cliente = self.criar_cliente(backend)
+        inicio = time.perf_counter()
+        trechos = cliente.gerar_stream_sync("um dois tres")
+        primeiro = next(trechos)
+        tempo_primeiro = time.perf_counter() - inicio
+
+        self.assertEqual(primeiro + "".join(trechos), "Resposta: um dois tres")
+        self.assertLess(tempo_primeiro, 0.05)
+        self.assertIsNotNone(cliente.estatisticas()["tempo_primeiro_trecho"])
+
+    def test_stream_assincrono(self):
+        cliente = self.criar_cliente(BackendFalso(latencia=0))
+
+        async def consumir():
+            return [trecho async for trecho in cliente.gerar_stream("a b")]
+
+        self.assertEqual(asyncio.run(consumir()), ["Resposta: ", "a ", "b"])
+
+    def test_stream_repete_limite_de_taxa_antes_do_primeiro_trecho(self):
+        backend = BackendFalso(latencia=0, falhas_limite_taxa=1)
+        cliente = self.criar_cliente(backend, espera_base=0.001)
+        self.assertEqual("".join(cliente.gerar_stream_sync("oi")), "Resposta: oi")
+        self.assertEqual(cliente.estatisticas()["retentativas"], 1)
+
+    def test_resposta_em_stream_vai_para_o_historico_e_cache(self):
+        backend = BackendFalso(latencia=0)
+        cliente = self.criar_cliente(backend)
+        cache = CacheRespostas()
+        df = pd.DataFrame({"valor": [1.0, 2.0]})
+
+        completa = "".join(gerar_resposta_llm("Qual o total?", df, cliente, cache, stream=True))
+        self.assertGreater(len(completa), 0)
+        self.assertEqual(gerar_resposta_llm("Qual o total?", df, cliente, cache), completa)
+        self.assertEqual(backend.chamadas, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from agent_manager import AgentManager
+from parse_cache import CacheLeitura, chave_conteudo
+
+
+class TestCacheLeitura(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({"valor": range(1000)})
+        self.tamanho = int(self.df.memory_usage(deep=True).sum())
+
+    def test_chave_depende_do_conteudo_e_da_versao(self):
+        self.assertEqual(chave_conteudo("a.csv", b"x", 1), chave_conteudo("b.csv", b"x", 1))
+        self.assertNotEqual(chave_conteudo("a.csv", b"x", 1), chave_conteudo("a.csv", b"y", 1))
+        self.assertNotEqual(chave_conteudo("a.csv", b"x", 1), chave_conteudo("a.csv", b"x", 2))
+        self.assertNotEqual(chave_conteudo("a.csv", b"x", 1), chave_conteudo("a.xml", b"x", 1))
+
+    def test_descarte_lru_por_orcamento(self):
+        cache = CacheLeitura(limite_bytes=2 * self.tamanho)
+        cache.salvar("a", self.df)
+        cache.salvar("b", self.df)
+        cache.obter("a")  # "b" passa a ser o menos recente
+        cache.salvar("c", self.df)
+        self.assertIsNone(cache.obter("b"))
+        self.assertIsNotNone(cache.obter("a"))
+        self.assertLessEqual(cache.estatisticas()["bytes_em_uso"], 2 * self.tamanho)
+
+    def test_persistencia_em_disco(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            CacheLeitura(diretorio=pasta).salvar("a", self.df)
+            novo = CacheLeitura(diretorio=pasta)
+            pd.testing.assert_frame_equal(novo.obter("a"), self.df)
+
+    def test_manager_reutiliza_leituras(self):
+        cache = CacheLeitura()
+        caminho = os.path.join("data", "exemplo.csv")
+        primeiro = AgentManager(cache=cache).carregar_arquivos([caminho])
+        manager = AgentManager(cache=cache)
+        segundo = manager.carregar_arquivos([caminho])
+        # O arquivo lido e o seu cubo de KPIs
+        self.assertEqual(cache.estatisticas()["acertos"], 2)
+        pd.testing.assert_frame_equal(primeiro.df, segundo.df)
+        terceiro = manager.carregar_arquivos([caminho])
+        self.assertEqual(cache.estatisticas()["acertos"], 2)
+        pd.testing.assert_frame_equal(terceiro.df, segundo.df)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+import pandas as pd
+from agent_manager import AgentManager
+from anomaly_detector import detectar_anomalias
+from data_validator import DataValidator
+from parse_cache import CacheLeitura
+from partition_index import IndiceParticoes
+from test_anomaly_detector import gerar_df
+
+
+def gerar_arquivos():
+    base = gerar_df(300, semente=2)
+    a, b, c = base.iloc[:100], base.iloc[100:200].copy(), base.iloc[200:].copy()
+    # b repete uma nota de a; c reemite um número de b com outra chave
+    b = pd.concat([b, a.iloc[[4]]])
+    c.iloc[0, c.columns.get_loc("numero")] = b["numero"].iloc[10]
+    c.iloc[0, c.columns.get_loc("emitente")] = b["emitente"].iloc[10]
+    c.iloc[1, c.columns.get_loc("valor_total_nota")] = -5.0
+    return {"a": a, "b": b, "c": c}
+
+
+class TestIndiceParticoes(unittest.TestCase):
+
+    def setUp(self):
+        self.arquivos = gerar_arquivos()
+
+    def consolidar(self, chaves):
+        return pd.concat([self.arquivos[c] for c in chaves], ignore_index=True)
+
+    def exatos(self, achados):
+        return {
+            a.tipo: (sorted(a.linhas), a.grupos)
+            for a in achados
+            if a.tipo in ("chave_duplicada", "numero_duplicado")
+        }
+
+    def conferir(self, indice, chaves):
+        df = self.consolidar(chaves)
+        esperado = detectar_anomalias(df, indice.inicios)
+        self.assertEqual(self.exatos(indice.achados()), self.exatos(esperado))
+        self.assertEqual(
+            indice.validacao(df).mensagens(),
+            DataValidator.validar_dados_vetorizado(df).mensagens(),
+        )
+
+    def test_inclusao_incremental(self):
+        indice = IndiceParticoes()
+        indice.sincronizar([("a", self.arquivos["a"])])
+        self.assertEqual(indice.achados(), [])
+        indice.sincronizar([(c, self.arquivos[c]) for c in "ab"])
+        self.conferir(indice, "ab")
+        indice.sincronizar([(c, self.arquivos[c]) for c in "abc"])
+        self.conferir(indice, "abc")
+        self.assertEqual(set(self.exatos(indice.achados())), {"chave_duplicada", "numero_duplicado"})
+        self.assertEqual(indice.calculadas, 3)
+
+    def test_remocao_recalcula_so_o_necessario(self):
+        indice = IndiceParticoes()
+        indice.sincronizar([(c, self.arquivos[c]) for c in "abc"])
+        indice.sincronizar([(c, self.arquivos[c]) for c in "bc"])
+        self.conferir(indice, "bc")
+        self.assertNotIn("chave_duplicada", self.exatos(indice.achados()))
+        self.assertEqual(indice.calculadas, 3)
+        self.assertNotIn("a", indice.particoes)
+
+    def test_mesmo_arquivo_duas_vezes(self):
+        indice = IndiceParticoes()
+        indice.sincronizar([(c, self.arquivos[c]) for c in "aa"])
+        self.conferir(indice, "aa")
+        self.assertEqual(indice.calculadas, 1)
+        chaves = self.exatos(indice.achados())["chave_duplicada"]
+        self.assertEqual(chaves[1], 100)
+        indice.sincronizar([("a", self.arquivos["a"])])
+        self.assertEqual(indice.achados(), [])
+
+    def test_perfil_combinado(self):
+        indice = IndiceParticoes()
+        indice.sincronizar([(c, self.arquivos[c]) for c in "abc"])
+        df = self.consolidar("abc")
+        self.assertEqual(
+            indice.perfil(df).descrever().to_string(),
+            df.select_dtypes(include="number").describe().to_string(),
+        )
+        np.testing.assert_array_equal(indice.inicios, [0, 100, 201])
+
+    def test_manager_processa_so_o_arquivo_novo(self):
+        manager = AgentManager(cache=CacheLeitura())
+        manager.carregar_arquivos(["data/exemplo.csv"], max_workers=1)
+        arquivos = ["data/exemplo.csv", "data/exemplo_invalido.csv", "data/exemplo.csv"]
+        df = manager.carregar_arquivos(arquivos, max_workers=1).df
+        self.assertEqual(manager.particoes.calculadas, 2)
+        self.assertEqual(
+            manager.validar_arquivo(),
+            "Erros encontrados na validação:\n"
+            + "\n".join(DataValidator.validar_dados_vetorizado(df).mensagens()),
+        )
+        self.assertEqual(
+            self.exatos(manager.detectar_anomalias()),
+            self.exatos(detectar_anomalias(df, [0, 2, 4])),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
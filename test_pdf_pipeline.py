@@ -0,0 +1,113 @@
+import io
+import unittest
+import numpy as np
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+from file_reader import FileReader
+from pdf_pipeline import CachePaginas, extrair_paginas, notas_de_paginas
+from xml_profiles import PERFIL_NFE
+
+DANFE = (
+    "No. 000.001.234 SERIE 1\n"
+    "CHAVE DE ACESSO 4125 0912 3456 7800 0190 5500 1000 0012 3410 0000 0014\n"
+    "RAZAO SOCIAL: Empresa Teste LTDA\n"
+    "CNPJ 12.345.678/0001-90\n"
+    "DATA DA EMISSAO 01/09/2025\n"
+    "DESTINATARIO CNPJ 98.765.432/0001-10\n"
+    "CFOP 5102\n"
+    "VALOR TOTAL DA NOTA R$ 1.234,56"
+)
+
+chamadas_ocr = []
+
+
+def ocr_falso(imagem):
+    chamadas_ocr.append(imagem.size)
+    return "TEXTO RECONHECIDO"
+
+
+def gerar_pdf(paginas):
+    """
+    :param paginas: Lista de textos; None gera uma página só com imagem.
+    """
+    escritor = PdfWriter()
+    fonte = escritor._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for texto in paginas:
+        pagina = PageObject.create_blank_page(None, 595, 842)
+        recursos = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): fonte})})
+        if texto is None:
+            imagem = DecodedStreamObject()
+            imagem.set_data(np.full((8, 8), 200, dtype=np.uint8).tobytes())
+            imagem.update({
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(8),
+                NameObject("/Height"): NumberObject(8),
+                NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            })
+            recursos[NameObject("/XObject")] = DictionaryObject({NameObject("/Im0"): escritor._add_object(imagem)})
+            desenho = b"q 595 0 0 842 0 0 cm /Im0 Do Q"
+        else:
+            linhas = " T* ".join(f"({linha}) Tj" for linha in texto.split("\n"))
+            desenho = f"BT /F1 9 Tf 11 TL 40 800 Td {linhas} ET".encode("latin-1")
+        conteudo = DecodedStreamObject()
+        conteudo.set_data(desenho)
+        pagina[NameObject("/Resources")] = recursos
+        pagina[NameObject("/Contents")] = escritor._add_object(conteudo)
+        escritor.add_page(pagina)
+    buffer = io.BytesIO()
+    escritor.write(buffer)
+    return buffer.getvalue()
+
+
+class TestPipelinePdf(unittest.TestCase):
+
+    def setUp(self):
+        chamadas_ocr.clear()
+
+    def test_ocr_apenas_sem_camada_de_texto(self):
+        pdf = gerar_pdf(["Pagina um", None, "Pagina tres"])
+        paginas = sorted(extrair_paginas(pdf, max_workers=1, ocr=ocr_falso, cache=None))
+        self.assertEqual([p.origem for p in paginas], ["texto", "ocr", "texto"])
+        self.assertEqual(paginas[1].texto, "TEXTO RECONHECIDO")
+        self.assertEqual(chamadas_ocr, [(8, 8)])
+
+    def test_cache_por_pagina(self):
+        cache = CachePaginas()
+        list(extrair_paginas(gerar_pdf(["A", None]), max_workers=1, ocr=ocr_falso, cache=cache))
+        # Outro PDF com as mesmas páginas (em outra ordem) e uma nova
+        paginas = sorted(
+            extrair_paginas(gerar_pdf([None, "B", "A"]), max_workers=1, ocr=ocr_falso, cache=cache)
+        )
+        self.assertEqual([p.do_cache for p in paginas], [True, False, True])
+        self.assertEqual(paginas[0].texto, "TEXTO RECONHECIDO")
+        self.assertEqual(len(chamadas_ocr), 1)
+
+    def test_pool_igual_ao_processo_atual(self):
+        pdf = gerar_pdf([f"Pagina {i}" for i in range(10)])
+        sequencial = FileReader.carregar_pdf(pdf, max_workers=1)
+        paralelo = sorted(extrair_paginas(pdf, max_workers=2, ocr=None, cache=None))
+        self.assertEqual("".join(p.texto for p in paralelo), sequencial)
+        self.assertEqual(sequencial, "".join(f"Pagina {i}" for i in range(10)))
+
+    def test_campos_do_danfe(self):
+        df = notas_de_paginas([DANFE, "FOLHA 2/2\nITEM 001", DANFE.replace("0014", "0022")])
+        self.assertEqual(len(df), 2)
+        self.assertTrue(set(df.columns) <= set(PERFIL_NFE.colunas))
+        nota = df.iloc[0]
+        self.assertEqual(nota["chave_acesso"], "41250912345678000190550010000012341000000014")
+        self.assertEqual(nota["numero"], "1234")
+        self.assertEqual(nota["emitente_cnpj"], "12345678000190")
+        self.assertEqual(nota["destinatario_cnpj"], "98765432000110")
+        self.assertEqual(nota["cfop"], "5102")
+        self.assertEqual(nota["valor_total_nota"], 1234.56)
+        self.assertEqual(str(nota["data_emissao"].date()), "2025-09-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_profile import obter_perfil
+from prompt_builder import estimar_tokens, montar_contexto, relevancia_colunas
+
+
+class TestPromptBuilder(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 2000
+        valor = rng.gamma(2.0, 500.0, n)
+        dados = {
+            "emitente": rng.choice([f"Empresa {i}" for i in range(100)], n),
+            "cfop": rng.choice(["5102", "6101", "1102"], n, p=[0.6, 0.3, 0.1]),
+            "valor": valor,
+        }
+        for i in range(80):
+            dados[f"tributo_{i}"] = rng.normal(0, 1, n)
+        dados["valor_iss"] = valor * 0.02
+        self.df = pd.DataFrame(dados)
+
+    def test_respeita_orcamento(self):
+        completo = estimar_tokens(obter_perfil(self.df).resumo())
+        contexto = montar_contexto("Qual o total de ISS?", self.df, orcamento_tokens=800)
+        self.assertLessEqual(contexto.tokens, 800)
+        self.assertLess(contexto.tokens, completo / 10)
+        self.assertTrue(contexto.colunas_omitidas)
+        self.assertEqual(
+            len(contexto.colunas_incluidas) + len(contexto.colunas_omitidas), len(self.df.columns)
+        )
+
+    def test_colunas_relevantes_primeiro(self):
+        ranking = relevancia_colunas("Qual o total de ISS por emitente?", self.df.columns)
+        self.assertEqual(list(ranking.index[:3]), ["valor_iss", "emitente", "valor"])
+
+    def test_baixa_cardinalidade_com_valores_frequentes(self):
+        contexto = montar_contexto("Qual CFOP mais utilizado?", self.df)
+        linha = next(l for l in contexto.texto.splitlines() if l.startswith("- cfop"))
+        self.assertIn("3 valores; mais frequentes: 5102", linha)
+        self.assertIn("- emitente (str): 100 valores distintos", contexto.texto)
+
+    def test_apenas_correlacoes_significativas(self):
+        contexto = montar_contexto("Qual o total de ISS?", self.df)
+        correlacoes = contexto.texto.split("Correlações significativas")[1].splitlines()[1:]
+        self.assertEqual(correlacoes, ["- valor × valor_iss: +1.00"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import pandas as pd
+from query_planner import executar_consultas, formatar_resultados
+
+
+class TestQueryPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "valor": ["1.000,00", "250,50", "300,00", "1.000,00", "50,00"],
+                "cfop": ["5102", "5102", "6101", "5102", "6101"],
+                "emitente": ["Empresa A", "Empresa B", "Empresa A", "Empresa A", "Empresa C"],
+                "data": ["05/01/2025", "20/01/2025", "03/02/2025", "05/01/2025", "10/03/2025"],
+                "valor_iss": [20.0, 5.01, 6.0, 20.0, 1.0],
+            }
+        )
+
+    def test_ranking_por_emitente(self):
+        (titulo, tabela), = executar_consultas("Quais os 2 maiores fornecedores?", self.df)
+        self.assertIn("emitente", titulo)
+        self.assertEqual(list(tabela.index), ["Empresa A", "Empresa B"])
+        self.assertAlmostEqual(tabela.loc["Empresa A", "valor_total"], 2300.0)
+        self.assertEqual(tabela.loc["Empresa A", "quantidade"], 3)
+
+    def test_cfop_mais_utilizado_ordena_por_quantidade(self):
+        (_, tabela), = executar_consultas("Qual o CFOP mais utilizado?", self.df)
+        self.assertEqual(tabela.index[0], "5102")
+        self.assertEqual(tabela.iloc[0]["quantidade"], 3)
+
+    def test_totais_por_mes(self):
+        (_, tabela), = executar_consultas("Qual o faturamento por mês?", self.df)
+        self.assertEqual([str(p) for p in tabela.index], ["2025-01", "2025-02", "2025-03"])
+        self.assertAlmostEqual(tabela["valor_total"].sum(), 2600.5)
+
+    def test_total_de_tributo(self):
+        (_, tabela), = executar_consultas("Qual o total de ISS?", self.df)
+        self.assertAlmostEqual(tabela.loc["ISS", "valor_total"], 52.01)
+
+    def test_duplicadas(self):
+        (titulo, tabela), = executar_consultas("Existem notas duplicadas?", self.df)
+        self.assertIn("2 linhas", titulo)
+        self.assertEqual(tabela["ocorrencias"].tolist(), [2])
+
+    def test_duplicadas_com_varios_itens(self):
+        itens = pd.DataFrame(
+            {
+                "chave_acesso": ["K1", "K1", "K2", "K2", "K2", "K2"],
+                "item": ["1", "2", "1", "2", "1", "2"],
+                "valor": [10.0, 20.0, 30.0, 40.0, 30.0, 40.0],
+            }
+        )
+        # K1 tem dois itens; K2 (dois itens) aparece duas vezes
+        (titulo, tabela), = executar_consultas("Há notas duplicadas?", itens)
+        self.assertIn("4 linhas", titulo)
+        self.assertEqual(list(tabela.index), ["K2"])
+        self.assertEqual(tabela["ocorrencias"].tolist(), [2])
+        (titulo, tabela), = executar_consultas("Há notas duplicadas?", itens.iloc[:2])
+        self.assertIn("0 linhas", titulo)
+        self.assertTrue(tabela.empty)
+
+    def test_pergunta_sem_intencao(self):
+        self.assertEqual(executar_consultas("Qual é o clima hoje?", self.df), [])
+
+    def test_formatar_resultados(self):
+        texto = formatar_resultados(executar_consultas("Qual o faturamento total?", self.df))
+        self.assertIn("2600.50", texto)
+
+
+if __name__ == "__main__":
+    unittest.main()
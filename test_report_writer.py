@@ -0,0 +1,54 @@
+import io
+import unittest
+import numpy as np
+import pandas as pd
+from docx import Document
+from exporter import Exporter
+from report_writer import historico_para_word, relatorio_word
+
+
+class TestRelatorioWord(unittest.TestCase):
+
+    def test_tabela_completa(self):
+        df = pd.DataFrame(
+            {
+                "valor": [1.5, np.nan, 3.0],
+                "emitente": ["A & <B>", "linha 1\nlinha 2", "\x01C"],
+                "cfop": ["5102", "6101", None],
+            }
+        )
+        doc = Document(io.BytesIO(relatorio_word(df)))
+        linhas = [[c.text for c in linha.cells] for linha in doc.tables[0].rows]
+        self.assertEqual(
+            linhas,
+            [
+                ["valor", "emitente", "cfop"],
+                ["1.5", "A & <B>", "5102"],
+                ["", "linha 1\nlinha 2", "6101"],
+                ["3.0", "C", ""],
+            ],
+        )
+
+    def test_tabela_limitada_com_resumo(self):
+        df = pd.DataFrame({"valor": np.arange(50, dtype=float), "cfop": ["5102"] * 50})
+        doc = Document(io.BytesIO(relatorio_word(df, limite_linhas=10)))
+        resumo, dados = doc.tables
+        self.assertEqual(len(dados.rows), 11)
+        self.assertEqual([c.text for c in resumo.rows[1].cells][:2], ["valor", "1,225.00"])
+        self.assertIn("50 linhas", "\n".join(p.text for p in doc.paragraphs))
+
+    def test_exporter(self):
+        df = pd.DataFrame({"valor": [10.0], "cfop": ["5102"]})
+        buffer = io.BytesIO()
+        Exporter.exportar_para_word(df, buffer)
+        buffer.seek(0)
+        self.assertEqual(Document(buffer).tables[0].cell(1, 1).text, "5102")
+
+    def test_historico(self):
+        doc = Document(io.BytesIO(historico_para_word([("Qual o total?", "R$ 10,00")])))
+        textos = [p.text for p in doc.paragraphs]
+        self.assertIn("1. Pergunta: Qual o total?", textos)
+
+
+if __name__ == "__main__":
+    unittest.main()
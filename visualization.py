@@ -1,31 +1,46 @@
 # visualization.py
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
+from chart_data import EspecGrafico, dados_grafico
+
+# matplotlib, seaborn e plotly são importados no primeiro gráfico de cada tipo:
+# juntos, levam segundos para carregar e não são usados na maioria das sessões
 
 
 class Visualization:
     """
     Classe responsável por gerar gráficos e visualizações interativas.
+
+    Os gráficos recebem os dados já agregados e reduzidos por `chart_data`
+    (no máximo ORCAMENTO_PONTOS pontos), e não as linhas do DataFrame.
     """
 
     @staticmethod
-    def gerar_grafico_barras(df: pd.DataFrame, x: str, y: str):
+    def gerar_grafico_barras(df: pd.DataFrame, x: str, y: str, agregacao="sum"):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        dados = dados_grafico(df, EspecGrafico(x, y, agregacao))
         plt.figure(figsize=(10, 6))
-        sns.barplot(data=df, x=x, y=y)
+        sns.barplot(data=dados, x=x, y=dados.columns[1], errorbar=None)
         plt.title("Gráfico de Barras")
         plt.show()
 
     @staticmethod
-    def gerar_grafico_linhas(df: pd.DataFrame, x: str, y: str):
+    def gerar_grafico_linhas(df: pd.DataFrame, x: str, y: str, agregacao="sum", periodo=None):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        dados = dados_grafico(df, EspecGrafico(x, y, agregacao, periodo))
         plt.figure(figsize=(10, 6))
-        sns.lineplot(data=df, x=x, y=y)
+        sns.lineplot(data=dados, x=x, y=dados.columns[1], errorbar=None)
         plt.title("Gráfico de Linhas")
         plt.show()
 
     @staticmethod
-    def gerar_grafico_interativo(df: pd.DataFrame, x: str, y: str):
-        fig = px.bar(df, x=x, y=y, title="Gráfico Interativo de Barras")
+    def gerar_grafico_interativo(df: pd.DataFrame, x: str, y: str, agregacao="sum"):
+        import plotly.express as px
+
+        dados = dados_grafico(df, EspecGrafico(x, y, agregacao))
+        fig = px.bar(dados, x=x, y=dados.columns[1], title="Gráfico Interativo de Barras")
         fig.show()
@@ -0,0 +1,221 @@
+# xml_profiles.py
+
+import os
+import xml.etree.ElementTree as ET
+import pandas as pd
+from conversores import CONVERSORES
+
+
+class PerfilExtracao:
+    """
+    Perfil compilado de extração para um layout de XML fiscal.
+
+    Cada registro (nota) gera uma linha por item; os campos do cabeçalho são
+    repetidos em cada item. Os caminhos são escritos sem namespace, no formato
+    "grupo/campo", "grupo/*/campo" ou "grupo/@atributo", com alternativas
+    separadas por "|", e são convertidos uma única vez para o formato
+    "{namespace}tag" usado pelo ElementTree.
+    """
+
+    def __init__(self, nome, registro, item, cabecalho, campos_item, namespace=None):
+        """
+        :param nome: Nome do perfil.
+        :param registro: Tag do elemento que representa uma nota.
+        :param item: Caminho, relativo ao registro, dos itens da nota.
+        :param cabecalho: {coluna: (caminho, tipo)} relativos ao registro.
+        :param campos_item: {coluna: (caminho, tipo)} relativos ao item.
+        :param namespace: URI do namespace do layout, se houver.
+        """
+        self.nome = nome
+        self.namespace = namespace
+        self.tag_registro = self._qualificar(registro)
+        self.caminho_item = self._qualificar(item)
+        self.cabecalho = self._compilar(cabecalho)
+        self.campos_item = self._compilar(campos_item)
+        self.tipos = {
+            coluna: tipo
+            for coluna, (_, tipo) in {**cabecalho, **campos_item}.items()
+        }
+
+    def _qualificar(self, caminho):
+        if not self.namespace:
+            return caminho
+        return "/".join(
+            parte if parte in ("*", ".") else f"{{{self.namespace}}}{parte}"
+            for parte in caminho.split("/")
+        )
+
+    def _compilar(self, campos):
+        compilados = []
+        for coluna, (caminhos, _) in campos.items():
+            alternativas = []
+            for caminho in caminhos.split("|"):
+                caminho, _, atributo = caminho.partition("@")
+                caminho = caminho.rstrip("/")
+                caminho = self._qualificar(caminho) if caminho else "."
+                alternativas.append((caminho, atributo or None))
+            compilados.append((coluna, alternativas))
+        return compilados
+
+    @staticmethod
+    def _ler(elem, alternativas):
+        for caminho, atributo in alternativas:
+            alvo = elem.find(caminho)
+            if alvo is None:
+                continue
+            valor = alvo.get(atributo) if atributo else alvo.text
+            if valor is not None and valor.strip():
+                return valor.strip()
+        return None
+
+    def extrair_registro(self, registro):
+        """
+        Extrai as linhas (uma por item) de um elemento de nota.
+        :return: Lista de tuplas de valores, na ordem de `colunas`.
+        """
+        cabecalho = tuple(self._ler(registro, alt) for _, alt in self.cabecalho)
+        itens = registro.findall(self.caminho_item)
+        if not itens:
+            return [cabecalho + (None,) * len(self.campos_item)]
+        return [
+            cabecalho + tuple(self._ler(item, alt) for _, alt in self.campos_item)
+            for item in itens
+        ]
+
+    @property
+    def colunas(self):
+        return [coluna for coluna, _ in self.cabecalho + self.campos_item]
+
+    def tipar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte as colunas extraídas para os tipos declarados no perfil.
+        """
+        for coluna, tipo in self.tipos.items():
+            df[coluna] = CONVERSORES[tipo](df[coluna])
+        return df
+
+
+PERFIL_NFE = PerfilExtracao(
+    nome="NF-e",
+    namespace="http://www.portalfiscal.inf.br/nfe",
+    registro="infNFe",
+    item="det",
+    cabecalho={
+        "chave_acesso": ("@Id", "chave"),
+        "numero": ("ide/nNF", "texto"),
+        "serie": ("ide/serie", "texto"),
+        "modelo": ("ide/mod", "texto"),
+        "data_emissao": ("ide/dhEmi|ide/dEmi", "data"),
+        "natureza_operacao": ("ide/natOp", "texto"),
+        "emitente_cnpj": ("emit/CNPJ|emit/CPF", "texto"),
+        "emitente": ("emit/xNome", "texto"),
+        "uf_emitente": ("emit/enderEmit/UF", "texto"),
+        "municipio_emitente": ("emit/enderEmit/xMun", "texto"),
+        "destinatario_cnpj": ("dest/CNPJ|dest/CPF", "texto"),
+        "destinatario": ("dest/xNome", "texto"),
+        "uf_destinatario": ("dest/enderDest/UF", "texto"),
+        "valor_total_nota": ("total/ICMSTot/vNF", "decimal"),
+    },
+    campos_item={
+        "item": ("@nItem", "texto"),
+        "codigo_produto": ("prod/cProd", "texto"),
+        "descricao": ("prod/xProd", "texto"),
+        "ncm": ("prod/NCM", "texto"),
+        "cfop": ("prod/CFOP", "texto"),
+        "unidade": ("prod/uCom", "texto"),
+        "quantidade": ("prod/qCom", "decimal"),
+        "valor_unitario": ("prod/vUnCom", "decimal"),
+        "valor": ("prod/vProd", "decimal"),
+        "valor_icms": ("imposto/ICMS/*/vICMS", "decimal"),
+        "valor_ipi": ("imposto/IPI/IPITrib/vIPI", "decimal"),
+        "valor_pis": ("imposto/PIS/*/vPIS", "decimal"),
+        "valor_cofins": ("imposto/COFINS/*/vCOFINS", "decimal"),
+    },
+)
+
+# Layout municipal (ex.: data/exemplo.xml). As colunas da nota mantêm o nome das
+# tags, como em FileReader.carregar_xml, mas já tipadas.
+PERFIL_NFSE = PerfilExtracao(
+    nome="NFS-e",
+    registro="nfse",
+    item="itens/lista",
+    cabecalho={
+        "numero_nfse": ("nf/numero_nfse", "texto"),
+        "serie_nfse": ("nf/serie_nfse", "texto"),
+        "data_nfse": ("nf/data_nfse", "data"),
+        "data_fato": ("nf/data_fato", "data"),
+        "situacao_descricao_nfse": ("nf/situacao_descricao_nfse", "texto"),
+        "chave_acesso_nfse_nacional": ("nf/chave_acesso_nfse_nacional", "chave"),
+        "valor_total": ("nf/valor_total", "decimal"),
+        "valor_desconto": ("nf/valor_desconto", "decimal"),
+        "valor_ir": ("nf/valor_ir", "decimal"),
+        "valor_inss": ("nf/valor_inss", "decimal"),
+        "valor_contribuicao_social": ("nf/valor_contribuicao_social", "decimal"),
+        "valor_pis": ("nf/valor_pis", "decimal"),
+        "valor_cofins": ("nf/valor_cofins", "decimal"),
+        "observacao": ("nf/observacao", "texto"),
+        "prestador_cpfcnpj": ("prestador/cpfcnpj", "texto"),
+        "prestador_cidade": ("prestador/cidade", "texto"),
+        "tomador_cpfcnpj": ("tomador/cpfcnpj", "texto"),
+        "tomador_nome_razao_social": ("tomador/nome_razao_social", "texto"),
+        "tomador_estado": ("tomador/estado", "texto"),
+        "tomador_cidade": ("tomador/cidade", "texto"),
+    },
+    campos_item={
+        "codigo_item_lista_servico": ("codigo_item_lista_servico", "texto"),
+        "descritivo": ("descritivo", "texto"),
+        "aliquota_item_lista_servico": ("aliquota_item_lista_servico", "decimal"),
+        "valor_tributavel": ("valor_tributavel", "decimal"),
+        "valor_deducao": ("valor_deducao", "decimal"),
+        "valor_issrf": ("valor_issrf", "decimal"),
+        "unidade_quantidade": ("unidade_quantidade", "decimal"),
+        "unidade_valor_unitario": ("unidade_valor_unitario", "decimal"),
+    },
+)
+
+PERFIS = [PERFIL_NFE, PERFIL_NFSE]
+
+
+def detectar_perfil(arquivo, limite_elementos=500):
+    """
+    Identifica o perfil pelo primeiro registro encontrado no início do arquivo.
+    :param arquivo: Caminho ou arquivo binário posicionável (é reposicionado).
+    :param limite_elementos: Quantidade máxima de elementos inspecionados.
+    :return: PerfilExtracao ou None se o layout não for reconhecido.
+    """
+    registros = {perfil.tag_registro: perfil for perfil in PERFIS}
+    inicio = None if isinstance(arquivo, (str, os.PathLike)) else arquivo.tell()
+    try:
+        for i, (_, elem) in enumerate(ET.iterparse(arquivo, events=("start",))):
+            if elem.tag in registros:
+                return registros[elem.tag]
+            if i >= limite_elementos:
+                break
+        return None
+    except ET.ParseError:
+        return None
+    finally:
+        if inicio is not None:
+            arquivo.seek(inicio)
+
+
+def extrair_xml_tipado(arquivo, perfil=None) -> pd.DataFrame:
+    """
+    Extrai um XML fiscal com um perfil compilado: uma linha por item, cabeçalho
+    repetido em cada item e colunas já convertidas (float64, datetime64, string).
+    :param arquivo: Caminho ou arquivo binário posicionável.
+    :param perfil: PerfilExtracao a usar; se None, é detectado automaticamente.
+    :return: DataFrame tipado.
+    """
+    perfil = perfil or detectar_perfil(arquivo)
+    if perfil is None:
+        raise ValueError("Layout de XML fiscal não reconhecido.")
+
+    linhas = []
+    for _, elem in ET.iterparse(arquivo, events=("end",)):
+        if elem.tag == perfil.tag_registro:
+            linhas.extend(perfil.extrair_registro(elem))
+            elem.clear()
+
+    df = pd.DataFrame.from_records(linhas, columns=perfil.colunas)
+    return perfil.tipar(df)